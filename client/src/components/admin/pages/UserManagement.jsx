@@ -165,13 +165,38 @@ const UserManagement = () => {
         setToast({ message: 'Data exported successfully', type: 'success' });
     };
 
-    const filteredAndSortedUsers = users
-        .filter(u => {
-            const matchesSearch = u.email.toLowerCase().includes(searchTerm.toLowerCase());
-            const matchesRole = filterRole === 'all' || u.role === filterRole;
-            return matchesSearch && matchesRole;
-        })
+    // Name/email search runs on the server (substring and fuzzy, ranked), debounced;
+    // it needs three characters, the shortest term the trigram index can use
+    const { request: searchReq } = useApi();
+    const [searchResults, setSearchResults] = useState(null);
+    useEffect(() => {
+        const query = searchTerm.trim();
+        if (query.length < 3) {
+            setSearchResults(null);
+            return undefined;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const data = await searchReq('get', `/admin/users/search?q=${encodeURIComponent(query)}&limit=50`);
+                if (!cancelled) setSearchResults(data.users);
+            } catch (err) {
+                console.error('User search failed', err);
+            }
+        }, 250);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchTerm, searchReq]);
+
+    // Search results keep their relevance order (showing local edits); the full list is sorted
+    const usersById = new Map(users.map(u => [u.id, u]));
+    const visibleUsers = searchResults ? searchResults.map(u => usersById.get(u.id) ?? u) : users;
+    const filteredAndSortedUsers = visibleUsers
+        .filter(u => filterRole === 'all' || u.role === filterRole)
         .sort((a, b) => {
+            if (searchResults) return 0;
             let aVal = a[sortBy];
             let bVal = b[sortBy];
 
@@ -72,7 +72,8 @@ const QuizList = () => {
     useEffect(() => {
         const fetchQuizzes = async () => {
             try {
-                const data = await request('get', '/quizzes');
+                // Cards only need quiz columns, not every question and option
+                const data = await request('get', '/quizzes?view=summary');
                 setQuizzes(data);
             } catch (err) {
                 console.error('Failed to load quizzes', err);
@@ -81,10 +82,30 @@ const QuizList = () => {
         fetchQuizzes();
     }, [request]);
 
-    const filteredQuizzes = quizzes.filter(quiz =>
-        quiz.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        quiz.description.toLowerCase().includes(searchTerm.toLowerCase())
-    );
+    // Searches run on the server (ranked over question text too), debounced
+    const [searchResults, setSearchResults] = useState(null);
+    useEffect(() => {
+        const query = searchTerm.trim();
+        if (!query) {
+            setSearchResults(null);
+            return undefined;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            try {
+                const data = await request('get', `/quizzes/search?q=${encodeURIComponent(query)}&per_page=50`);
+                if (!cancelled) setSearchResults(data.quizzes);
+            } catch (err) {
+                console.error('Quiz search failed', err);
+            }
+        }, 250);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [searchTerm, request]);
+
+    const filteredQuizzes = searchResults ?? quizzes;
 
     return (
         <div className="p-6 sm:p-10 max-w-7xl mx-auto perspective-container">
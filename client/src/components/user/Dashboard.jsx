@@ -5,6 +5,7 @@ import { Award, Zap, TrendingUp, BookOpen, CheckSquare, ChevronRight, RefreshCw,
 import { useTilt } from '../../hooks/useTilt';
 import { useAccessibility } from '../../contexts/AccessibilityContext';
 import { useApi } from '../../hooks/useApi';
+import { useEventStream, applyLeaderboardDelta } from '../../hooks/useEventStream';
 import StatsCard from '../common/StatsCard';
 import { SkeletonCard, SkeletonLeaderboard } from '../common/SkeletonLoaders';
 
@@ -23,16 +24,16 @@ const Dashboard = () => {
     const fetchData = async (manual = false) => {
         if (manual) setIsRefreshing(true);
         try {
-            const [lbData, progressData] = await Promise.all([
-                request('get', '/leaderboard'),
-                request('get', '/progress')
-            ]);
+            // One round trip for profile, progress and leaderboard
+            const { me, progress: progressData, leaderboard: lbData } =
+                await request('get', '/dashboard?include=me,progress,leaderboard');
 
             setLeaderboard(lbData);
             setProgress(progressData);
 
             // Sync local storage
-            const updatedUser = { ...user, gamification: { ...user.gamification, points: progressData.totalPoints } };
+            const updatedUser = { ...user, ...me, gamification: { ...me.gamification, points: progressData.totalPoints } };
+            setUser(updatedUser);
             localStorage.setItem('user', JSON.stringify(updatedUser));
 
         } catch (err) {
@@ -46,6 +47,14 @@ const Dashboard = () => {
         fetchData();
     }, []);
 
+    // Live updates instead of polling
+    useEventStream({
+        leaderboard: setLeaderboard,
+        'leaderboard-delta': (delta) => setLeaderboard(board => applyLeaderboardDelta(board, delta)),
+        progress: () => request('get', '/progress').then(setProgress).catch(() => {}),
+        resync: () => fetchData()
+    });
+
     // Mock stats based on local user + leaderboard
     const myStats = leaderboard.find(u => u.email === user.email) || {
         points: user.gamification?.points || 0,
@@ -138,7 +138,7 @@ const ProgressDashboard = () => {
                                         </h3>
                                         <p className="text-sm text-gray-500 font-medium">
                                             {activity.completedAt ? new Date(activity.completedAt).toLocaleDateString() : 'N/A'}
-                                            {activity.timeSpent && ` • ${formatTime(activity.timeSpent)}`}
+                                            {activity.timeSpent > 0 && ` • ${formatTime(activity.timeSpent)}`}
                                         </p>
                                     </div>
                                 </div>
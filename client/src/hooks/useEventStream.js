@@ -0,0 +1,61 @@
+import { useEffect, useRef } from 'react';
+
+/**
+ * Apply a 'leaderboard-delta' event ({ size, changes: [{ rank, ...entry }] })
+ * to the current leaderboard array.
+ * @param {Array} board - Current leaderboard entries.
+ * @param {object} delta - Changed positions and the new board size.
+ * @returns {Array} The updated leaderboard.
+ */
+export const applyLeaderboardDelta = (board, { size, changes }) => {
+    const next = board.slice(0, size);
+    changes.forEach(({ rank, ...entry }) => {
+        next[rank] = entry;
+    });
+    return next;
+};
+
+// Wait before retrying a stream the server refused (e.g. 503 when its worker is full)
+const REFUSED_RETRY_MS = 30000;
+
+/**
+ * Subscribe to the server's /api/stream Server-Sent Events.
+ * EventSource reconnects on its own; the token goes in the query string
+ * because EventSource cannot set an Authorization header. If the server
+ * refuses the stream, the 'resync' handler is called and the stream is
+ * retried after REFUSED_RETRY_MS, so the page degrades to polling.
+ * @param {object} handlers - Map of event name to callback(data).
+ */
+export const useEventStream = (handlers) => {
+    const handlersRef = useRef(handlers);
+    handlersRef.current = handlers;
+
+    useEffect(() => {
+        const token = localStorage.getItem('token');
+        if (!token || typeof EventSource === 'undefined') return undefined;
+
+        let source = null;
+        let retryTimer = null;
+
+        const connect = () => {
+            source = new EventSource(`/api/stream?jwt=${encodeURIComponent(token)}`);
+            Object.keys(handlersRef.current).forEach((name) => {
+                source.addEventListener(name, (event) => handlersRef.current[name]?.(JSON.parse(event.data)));
+            });
+            source.onerror = () => {
+                // CLOSED means EventSource gave up (non-200 response) and won't reconnect itself
+                if (source.readyState !== EventSource.CLOSED) return;
+                retryTimer = setTimeout(() => {
+                    handlersRef.current.resync?.({});
+                    connect();
+                }, REFUSED_RETRY_MS);
+            };
+        };
+        connect();
+
+        return () => {
+            clearTimeout(retryTimer);
+            source.close();
+        };
+    }, []);
+};
@@ -0,0 +1,101 @@
+"""
+JSON serialization benchmark.
+
+Compares Flask's default provider (stdlib json, hand-converted UUIDs and
+datetimes) against FastJSONProvider on payloads shaped like the real
+quiz catalog, admin user list and progress responses.
+
+Usage:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --users 5000 --quizzes 100 --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from utils.json_provider import FastJSONProvider
+
+
+def quiz_catalog(n_quizzes, n_questions=10, n_options=4):
+    return [{
+        'id': f'quiz-{i}',
+        'title': f'Quiz {i}: Accessibility Fundamentals',
+        'description': 'Test your knowledge of WCAG principles and basic accessibility concepts. ' * 2,
+        'timeLimit': 300,
+        'points_reward': 100,
+        'questions': [{
+            'id': f'q{j}',
+            'text': f"Question {j}: What does the 'POUR' acronym stand for in WCAG?",
+            'options': [{'id': chr(97 + k), 'text': f'Option {k} - Perceivable, Operable, Understandable'}
+                        for k in range(n_options)]
+        } for j in range(n_questions)]
+    } for i in range(n_quizzes)]
+
+
+def user_list(n_users, native):
+    now = datetime.utcnow()
+    users = []
+    for i in range(n_users):
+        uid = uuid.uuid4()
+        created = now - timedelta(minutes=i)
+        users.append({
+            'id': uid if native else str(uid),
+            'email': f'user{i}@example.com',
+            'role': 'student',
+            'name': f'User {i}',
+            'gamification': {'points': i * 10, 'badges': [f'quiz-{b}' for b in range(i % 5)], 'streak': i % 7},
+            'created_at': created if native else created.isoformat()
+        })
+    return users
+
+
+def bench(label, provider, payload, repeat):
+    provider.response(payload)  # warm up
+    best = min(timeit.repeat(lambda: provider.response(payload), number=1, repeat=repeat))
+    size = len(provider.response(payload).get_data())
+    print(f'  {label:<34} {best * 1000:>9.3f} ms   {size / 1024:>9.1f} KiB')
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--quizzes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app = Flask('bench')
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    fast.pretty = False
+    fast_pretty = FastJSONProvider(app)
+    fast_pretty.pretty = True
+    fast_std = FastJSONProvider(app)
+    fast_std.use_orjson = False
+
+    payloads = {
+        f'quiz catalog ({args.quizzes} quizzes)': (quiz_catalog(args.quizzes), quiz_catalog(args.quizzes)),
+        f'admin users ({args.users} users)': (user_list(args.users, native=False), user_list(args.users, native=True)),
+    }
+
+    with app.app_context():
+        for name, (converted, native) in payloads.items():
+            print(name)
+            base = bench('flask default (pre-converted)', default, converted, args.repeat)
+            for label, provider in (('fast, stdlib fallback', fast_std),
+                                    (f'fast, {fast.encoder_name}', fast),
+                                    (f'fast, {fast.encoder_name}, pretty', fast_pretty)):
+                elapsed = bench(label, provider, native, args.repeat)
+                print(f'  {"":<34} {base / elapsed:>8.1f}x vs default')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Worker cold-start benchmark.
+
+Measures, in fresh interpreter processes, how long it takes to import the
+app module and run create_app(), i.e. what every gunicorn worker fork and
+every test setUp pays before serving the first request.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 20 --database-url sqlite://
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+print(json.dumps({'import': t1 - t0, 'create_app': t2 - t1, 'total': t2 - t0}))
+"""
+
+
+def run_once(env):
+    output = subprocess.check_output([sys.executable, '-c', PROBE], cwd=SERVER_DIR, env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--database-url', help='Override DATABASE_URL for the probe processes')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.database_url:
+        env['DATABASE_URL'] = args.database_url
+
+    samples = [run_once(env) for _ in range(args.runs)]
+
+    summary = {}
+    for phase in ('import', 'create_app', 'total'):
+        values = sorted(s[phase] * 1000 for s in samples)
+        summary[phase] = {
+            'min_ms': round(values[0], 2),
+            'median_ms': round(statistics.median(values), 2),
+            'max_ms': round(values[-1], 2)
+        }
+
+    if args.json:
+        print(json.dumps({'runs': args.runs, 'phases': summary}, indent=2))
+        return
+
+    print(f'Cold start over {args.runs} runs')
+    for phase, stats in summary.items():
+        print(f"  {phase:<11} min {stats['min_ms']:>8.2f} ms   "
+              f"median {stats['median_ms']:>8.2f} ms   max {stats['max_ms']:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""
+HTTP load driver for the EnableU API.
+
+Runs a weighted mix of login, quiz list, submit, progress and leaderboard
+calls from concurrent virtual users and reports p50/p95/p99 latency and
+throughput per endpoint. Results can be saved as a JSON baseline and
+compared against a previous run.
+
+Seed data first with benchmarks/seed_data.py, then either point at a
+running server or let the driver start one:
+
+    python benchmarks/load_test.py --base-url http://localhost:5001
+    python benchmarks/load_test.py --start-server --concurrency 32 --duration 60 \\
+        --save benchmarks/results/baseline.json
+    python benchmarks/load_test.py --start-server --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MANIFEST = os.path.join(SERVER_DIR, 'benchmarks', 'results', 'manifest.json')
+DEFAULT_MIX = 'login=1,quizzes=4,submit=2,progress=3,leaderboard=3'
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(OPERATIONS)
+    if unknown:
+        raise SystemExit(f'Unknown operations in mix: {", ".join(sorted(unknown))}')
+    return mix
+
+
+class Client:
+    """One keep-alive HTTP connection per virtual user"""
+
+    def __init__(self, base_url):
+        url = urlparse(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        self.token = None
+
+    def request(self, method, path, body=None):
+        headers = {'Accept-Encoding': 'gzip', 'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect once on a dropped keep-alive connection
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        return response.status, data
+
+
+# --- Operations: each returns the HTTP status ---
+
+def op_login(client, ctx, rng):
+    status, data = client.request('POST', '/api/auth/login',
+                                  {'email': rng.choice(ctx['users']), 'password': ctx['password']})
+    if status == 200:
+        client.token = json.loads(data)['token']
+    return status
+
+
+def op_quizzes(client, ctx, rng):
+    return client.request('GET', '/api/quizzes')[0]
+
+
+def op_submit(client, ctx, rng):
+    quiz = rng.choice(ctx['catalog'])
+    answers = {q['id']: rng.choice(q['options'])['id'] for q in quiz['questions']}
+    return client.request('POST', f"/api/quizzes/{quiz['id']}/submit", {'answers': answers})[0]
+
+
+def op_progress(client, ctx, rng):
+    return client.request('GET', '/api/progress')[0]
+
+
+def op_leaderboard(client, ctx, rng):
+    return client.request('GET', '/api/leaderboard')[0]
+
+
+OPERATIONS = {
+    'login': op_login,
+    'quizzes': op_quizzes,
+    'submit': op_submit,
+    'progress': op_progress,
+    'leaderboard': op_leaderboard
+}
+
+
+def load_catalog(base_url, ctx):
+    import gzip
+    client = Client(base_url)
+    if op_login(client, ctx, random.Random(0)) != 200:
+        raise SystemExit('Login failed; did you run benchmarks/seed_data.py against this database?')
+    client.conn.request('GET', '/api/quizzes', headers={'Authorization': f'Bearer {client.token}'})
+    response = client.conn.getresponse()
+    data = response.read()
+    if response.getheader('Content-Encoding') == 'gzip':
+        data = gzip.decompress(data)
+    catalog = [q for q in json.loads(data) if q['questions']]
+    if not catalog:
+        raise SystemExit('No quizzes with questions found')
+    return catalog
+
+
+def worker(base_url, ctx, mix, deadline, max_requests, samples, lock, seed):
+    rng = random.Random(seed)
+    client = Client(base_url)
+    op_login(client, ctx, rng)
+    names, weights = zip(*mix.items())
+    local = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+
+    count = 0
+    while time.perf_counter() < deadline and (max_requests is None or count < max_requests):
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            status = OPERATIONS[name](client, ctx, rng)
+        except Exception:
+            status = 0
+        local[name].append(time.perf_counter() - start)
+        if status >= 400 or status == 0:
+            errors[name] += 1
+        count += 1
+
+    with lock:
+        for name in names:
+            samples[name]['latencies'].extend(local[name])
+            samples[name]['errors'] += errors[name]
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex((host, port)) == 0:
+                return
+        time.sleep(0.2)
+    raise SystemExit(f'Server did not start on {host}:{port}')
+
+
+def start_server(port, server, workers):
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=str(workers))
+    if server == 'gunicorn':
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    else:
+        cmd = [sys.executable, '-c',
+               'from werkzeug.serving import run_simple; from wsgi import app; '
+               f'run_simple("127.0.0.1", {port}, app, threaded=True)']
+    process = subprocess.Popen(cmd, cwd=SERVER_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    wait_for_port('127.0.0.1', port)
+    return process
+
+
+def summarize(samples, elapsed):
+    report = {}
+    for name, data in samples.items():
+        values = sorted(data['latencies'])
+        if not values:
+            continue
+        report[name] = {
+            'requests': len(values),
+            'errors': data['errors'],
+            'throughput_rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2)
+        }
+    return report
+
+
+def print_report(report, baseline=None):
+    print(f"{'endpoint':<12} {'reqs':>7} {'errors':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in report.items():
+        line = (f"{name:<12} {stats['requests']:>7} {stats['errors']:>6} {stats['throughput_rps']:>8.1f} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+        base = (baseline or {}).get(name)
+        if base:
+            delta = (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0.0
+            line += f"   p95 {delta:+.1f}% vs baseline"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--start-server', action='store_true', help='Start a local server for the run')
+    parser.add_argument('--server', choices=['gunicorn', 'werkzeug'], default='gunicorn')
+    parser.add_argument('--server-workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+    parser.add_argument('--requests', type=int, help='Stop each virtual user after this many requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Operation weights (default {DEFAULT_MIX})')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', help='Write results as JSON to this path')
+    parser.add_argument('--compare', help='Compare against a saved JSON baseline')
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        ctx = json.load(f)
+    mix = parse_mix(args.mix)
+
+    process = None
+    if args.start_server:
+        port = urlparse(args.base_url).port or 5001
+        process = start_server(port, args.server, args.server_workers)
+
+    try:
+        ctx['catalog'] = load_catalog(args.base_url, ctx)
+        samples = {name: {'latencies': [], 'errors': 0} for name in mix}
+        lock = threading.Lock()
+        start = time.perf_counter()
+        deadline = start + args.duration
+        threads = [threading.Thread(target=worker,
+                                    args=(args.base_url, ctx, mix, deadline, args.requests, samples, lock,
+                                          args.seed + i))
+                   for i in range(args.concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        if process:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=30)
+
+    report = summarize(samples, elapsed)
+    total = sum(s['requests'] for s in report.values())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['endpoints']
+
+    print(f'{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s) with {args.concurrency} virtual users')
+    print_report(report, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'created_at': datetime.utcnow().isoformat(),
+                'config': {'concurrency': args.concurrency, 'duration': args.duration, 'mix': mix,
+                           'server': args.server if args.start_server else args.base_url},
+                'elapsed_s': round(elapsed, 3),
+                'endpoints': report
+            }, f, indent=2)
+        print(f'Results saved to {args.save}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Admin analytics aggregation and password validation hot paths"""
+
+from datetime import datetime
+
+import pytest
+
+from datagen import SIZES, make_badge_counts, make_growth_counts, make_passwords
+from utils.analytics import badge_distribution, fill_growth_series
+from utils.security import validate_password_strength
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_fill_growth_series(benchmark, size):
+    """Series spanning ``size`` days with signups on every other day"""
+    end = datetime(2026, 1, 1)
+    start, counts = make_growth_counts(size, end)
+    benchmark.group = 'fill_growth_series'
+    benchmark.extra_info['size'] = size
+
+    series = benchmark(fill_growth_series, counts, start, end, 0)
+    assert len(series) == size + 1
+    assert series[-1]['users'] == sum(counts.values())
+
+
+@pytest.mark.parametrize('size', SIZES + [100000])
+def test_badge_distribution(benchmark, size):
+    badge_counts = make_badge_counts(size)
+    benchmark.group = 'badge_distribution'
+    benchmark.extra_info['size'] = size
+
+    buckets = benchmark(badge_distribution, badge_counts)
+    assert sum(b['value'] for b in buckets) == size
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_validate_password_strength(benchmark, size):
+    passwords = make_passwords(size)
+    benchmark.group = 'validate_password_strength'
+    benchmark.extra_info['size'] = size
+
+    results = benchmark(lambda: [validate_password_strength(p) for p in passwords])
+    assert len(results) == size
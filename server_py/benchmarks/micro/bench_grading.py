@@ -0,0 +1,42 @@
+"""Quiz scoring, feedback and catalog assembly hot paths"""
+
+import pytest
+
+from datagen import SIZES, make_answers, make_catalog_rows, make_questions
+from utils.grading import build_feedback, grade_quiz
+from utils.quiz_content import assemble_catalog
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_grade_quiz(benchmark, size):
+    questions = make_questions(size)
+    answers = make_answers(questions)
+    benchmark.group = 'grade_quiz'
+    benchmark.extra_info['size'] = size
+
+    correct, points = benchmark(grade_quiz, questions, answers, 100)
+    assert 0 <= correct <= size
+    assert 0 <= points <= 100
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_build_feedback(benchmark, size):
+    questions = make_questions(size)
+    answers = make_answers(questions)
+    benchmark.group = 'build_feedback'
+    benchmark.extra_info['size'] = size
+
+    feedback = benchmark(build_feedback, questions, answers)
+    assert len(feedback) == size
+
+
+@pytest.mark.parametrize('size', SIZES[:3])
+def test_assemble_catalog(benchmark, size):
+    """Catalog of ``size`` quizzes with 10 questions each, as in get_quizzes"""
+    rows = make_catalog_rows(size)
+    benchmark.group = 'assemble_catalog'
+    benchmark.extra_info['size'] = size
+
+    catalog = benchmark(assemble_catalog, rows)
+    assert len(catalog) == size
+    assert 'correctOptionId' not in catalog[0]['questions'][0]
@@ -0,0 +1,67 @@
+"""
+Shared fixtures for the micro-benchmarks.
+
+Run with:
+    python -m pytest benchmarks/micro
+
+When pytest-benchmark is installed its ``benchmark`` fixture is used
+(compare runs with --benchmark-autosave / --benchmark-compare). Otherwise
+a small timeit-based fallback with the same call signature is provided
+and results are printed as a table grouped by benchmark, one row per
+input size, so scaling is visible at a glance.
+"""
+
+import os
+import sys
+import timeit
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAVE_PYTEST_BENCHMARK = True
+except ImportError:
+    HAVE_PYTEST_BENCHMARK = False
+
+
+# --- Fallback benchmark fixture ---
+
+_results = []
+
+
+class FallbackBenchmark:
+    """Subset of pytest-benchmark's fixture API backed by timeit"""
+
+    def __init__(self, name):
+        self.name = name
+        self.group = None
+        self.extra_info = {}
+
+    def __call__(self, fn, *args, **kwargs):
+        timer = timeit.Timer(lambda: fn(*args, **kwargs))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=3, number=number)) / number
+        _results.append((self.group or self.name, self.extra_info.get('size'), best, self.name))
+        return fn(*args, **kwargs)
+
+    def pedantic(self, fn, args=(), kwargs=None, rounds=1, iterations=1, **_):
+        return self(fn, *args, **(kwargs or {}))
+
+
+if not HAVE_PYTEST_BENCHMARK:
+    @pytest.fixture
+    def benchmark(request):
+        return FallbackBenchmark(request.node.name)
+
+    def pytest_terminal_summary(terminalreporter):
+        if not _results:
+            return
+        terminalreporter.section('micro-benchmarks (best of 3)')
+        for group in sorted({r[0] for r in _results}):
+            terminalreporter.write_line(f'{group}')
+            rows = sorted((r for r in _results if r[0] == group), key=lambda r: (r[1] or 0))
+            for _, size, best, name in rows:
+                per_item = f'{best / size * 1e9:>10.1f} ns/item' if size else ''
+                terminalreporter.write_line(f'  n={size!s:<7} {best * 1e6:>12.2f} us   {per_item}')
@@ -0,0 +1,55 @@
+"""Deterministic input builders for the micro-benchmarks"""
+
+import random
+from datetime import timedelta
+
+SIZES = [10, 100, 1000, 10000]
+
+
+def make_questions(n, rng=None):
+    rng = rng or random.Random(n)
+    questions = []
+    for i in range(n):
+        options = [{'id': chr(97 + k), 'text': f'Option {k} for question {i}'} for k in range(4)]
+        questions.append({
+            'id': f'q{i}',
+            'text': f'Question {i}: which practice improves accessibility?',
+            'options': options,
+            'correctOptionId': rng.choice(options)['id'],
+            'explanation': 'Synthetic explanation.'
+        })
+    return questions
+
+
+def make_answers(questions, rng=None):
+    rng = rng or random.Random(len(questions))
+    return {q['id']: rng.choice(q['options'])['id'] for q in questions}
+
+
+def make_catalog_rows(n_quizzes, n_questions=10):
+    """Flat (quiz, question, option) rows as returned by the catalog query"""
+    rows = []
+    for i in range(n_quizzes):
+        for question in make_questions(n_questions, random.Random(i)):
+            for option in question['options']:
+                rows.append((f'quiz-{i}', f'Quiz {i}', 'Synthetic quiz', 300, 50,
+                             question['id'], question['text'], option['id'], option['text']))
+    return rows
+
+
+def make_growth_counts(n_days, end):
+    rng = random.Random(n_days)
+    start = end - timedelta(days=n_days)
+    return start, {(start + timedelta(days=d)).date().isoformat(): rng.randint(0, 50)
+                   for d in range(0, n_days, 2)}
+
+
+def make_badge_counts(n_users):
+    rng = random.Random(n_users)
+    return [rng.randint(0, 6) for _ in range(n_users)]
+
+
+def make_passwords(n):
+    rng = random.Random(n)
+    alphabet = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%'
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(6, 24))) for _ in range(n)]
@@ -0,0 +1,187 @@
+"""
+Generate synthetic data at scale for load tests and benchmarks.
+
+Creates N users, M quizzes and K results with bulk inserts, then writes a
+manifest (user emails, shared password, quiz ids) for load_test.py.
+Synthetic rows use the ``@loadtest.enableu`` email domain and ``load-``
+quiz ids, so --reset only removes data created by this tool.
+
+Usage:
+    python benchmarks/seed_data.py --users 1000 --quizzes 50 --results 20000
+    DATABASE_URL=sqlite:////tmp/enableu-bench.db python benchmarks/seed_data.py --reset
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVER_DIR)
+
+DEFAULT_MANIFEST = os.path.join(SERVER_DIR, 'benchmarks', 'results', 'manifest.json')
+EMAIL_DOMAIN = 'loadtest.enableu'
+QUIZ_PREFIX = 'load-'
+BATCH_SIZE = 1000
+
+
+def build_quiz(index, n_questions, rng):
+    questions = []
+    for q in range(n_questions):
+        options = [{'id': chr(97 + o), 'text': f'Option {chr(65 + o)} for question {q + 1} of quiz {index}'}
+                   for o in range(4)]
+        questions.append({
+            'id': f'q{q + 1}',
+            'text': f'Synthetic question {q + 1}: which option best describes accessible design practice {index}?',
+            'options': options,
+            'correctOptionId': rng.choice(options)['id'],
+            'explanation': 'Generated for load testing.'
+        })
+    return {
+        'id': f'{QUIZ_PREFIX}{index:05d}',
+        'title': f'Load Test Quiz {index}',
+        'description': 'Synthetic quiz generated by benchmarks/seed_data.py for performance testing.',
+        'time_limit': 300,
+        'points_reward': rng.choice([50, 100, 120]),
+        'questions': questions
+    }
+
+
+def chunks(rows, size=BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def reset(db, models):
+    user_ids = db.session.query(models.User.id).filter(models.User.email.like(f'%@{EMAIL_DOMAIN}'))
+    quiz_ids = db.session.query(models.Quiz.id).filter(models.Quiz.id.like(f'{QUIZ_PREFIX}%'))
+    for model in (models.Result, models.ResultSummary, models.UserProgress):
+        model.query.filter(model.user_id.in_(user_ids) | model.quiz_id.in_(quiz_ids)).delete(synchronize_session=False)
+    for model in (models.AuditLog, models.UserBadge):
+        model.query.filter(model.user_id.in_(user_ids)).delete(synchronize_session=False)
+    for model in (models.AnswerKey, models.QuestionOption, models.QuizQuestion):
+        model.query.filter(model.quiz_id.like(f'{QUIZ_PREFIX}%')).delete(synchronize_session=False)
+    models.User.query.filter(models.User.email.like(f'%@{EMAIL_DOMAIN}')).delete(synchronize_session=False)
+    models.Quiz.query.filter(models.Quiz.id.like(f'{QUIZ_PREFIX}%')).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def seed(n_users, n_quizzes, n_results, n_questions, password, seed_value):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from extensions import db
+    import models
+
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    # Hash once: every synthetic account shares the same password
+    password_hash = generate_password_hash(password)
+
+    quizzes = [build_quiz(i, n_questions, rng) for i in range(n_quizzes)]
+    users = [{
+        'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+        'email': f'user{i:06d}@{EMAIL_DOMAIN}',
+        'name': f'Load User {i}',
+        'password_hash': password_hash,
+        'role': 'student',
+        'is_verified': True,
+        'accessibility_settings': {'highContrast': False, 'reduceMotion': False},
+        'points': 0,
+        'created_at': now - timedelta(days=rng.randint(0, 60))
+    } for i in range(n_users)]
+
+    results = []
+    badges = {}
+    for _ in range(n_results):
+        user = rng.choice(users)
+        quiz = rng.choice(quizzes)
+        total = len(quiz['questions'])
+        correct = rng.randint(0, total)
+        score = quiz['points_reward'] if correct == total else int(correct / total * quiz['points_reward'])
+        user['points'] += score
+        if correct == total:
+            badges.setdefault((user['id'], quiz['id']), {'user_id': user['id'], 'badge_id': quiz['id'], 'awarded_at': now})
+        results.append({
+            'id': uuid.UUID(int=rng.getrandbits(128), version=4),
+            'user_id': user['id'],
+            'quiz_id': quiz['id'],
+            'score': score,
+            'correct_count': correct,
+            'total_questions': total,
+            'completed_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+        })
+
+    timings = {}
+    from utils.quiz_content import content_rows, normalize_questions
+    quiz_rows = [{k: v for k, v in q.items() if k != 'questions'} for q in quizzes]
+    question_rows, option_rows, key_rows = [], [], []
+    for quiz in quizzes:
+        rows = content_rows(quiz['id'], normalize_questions(quiz['questions']))
+        question_rows.extend(rows[0])
+        option_rows.extend(rows[1])
+        key_rows.extend(rows[2])
+
+    for name, model, rows in (('quizzes', models.Quiz, quiz_rows),
+                              ('questions', models.QuizQuestion, question_rows),
+                              ('options', models.QuestionOption, option_rows),
+                              ('answers', models.AnswerKey, key_rows),
+                              ('users', models.User, users),
+                              ('badges', models.UserBadge, list(badges.values())),
+                              ('results', models.Result, results)):
+        start = time.perf_counter()
+        for batch in chunks(rows):
+            db.session.execute(insert(model), batch)
+        db.session.commit()
+        timings[name] = time.perf_counter() - start
+
+    return {
+        'password': password,
+        'users': [u['email'] for u in users],
+        'quizzes': [q['id'] for q in quizzes],
+        'timings': timings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--quizzes', type=int, default=50)
+    parser.add_argument('--results', type=int, default=20000)
+    parser.add_argument('--questions', type=int, default=10, help='Questions per quiz')
+    parser.add_argument('--password', default='LoadTest@Password1')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible data')
+    parser.add_argument('--reset', action='store_true', help='Remove previously generated synthetic data first')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST)
+    parser.add_argument('--database-url', help='Override DATABASE_URL')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    from app import create_app
+    from extensions import db
+    import migrations
+    import models
+
+    app = create_app()
+    with app.app_context():
+        migrations.upgrade(db.engine)
+        if args.reset:
+            reset(db, models)
+        manifest = seed(args.users, args.quizzes, args.results, args.questions, args.password, args.seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, 'w') as f:
+        json.dump({k: v for k, v in manifest.items() if k != 'timings'}, f)
+
+    for name, seconds in manifest['timings'].items():
+        print(f'Inserted {name:<9} in {seconds:.2f}s')
+    print(f'Manifest written to {args.manifest}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Flask CLI commands.
+
+Usage:
+    flask --app app db upgrade
+    flask --app app db status
+    flask --app app db compact-results [--keep-months N] [--drop]
+    flask --app app quizzes export [FILE] [--id QUIZ_ID ...]
+    flask --app app quizzes import FILE
+"""
+
+import os
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+
+db_cli = AppGroup('db', help='Database schema management.')
+quiz_cli = AppGroup('quizzes', help='Quiz bundle import and export.')
+
+
+@db_cli.command('upgrade')
+def db_upgrade():
+    """Apply pending schema migrations."""
+    import migrations
+    from extensions import db
+
+    applied = migrations.upgrade(db.engine, log=click.echo)
+    click.echo(f'Applied {len(applied)} migration(s).' if applied else 'Database is up to date.')
+
+
+@db_cli.command('status')
+def db_status():
+    """List migrations that have not been applied yet."""
+    import migrations
+    from extensions import db
+
+    pending = migrations.pending(db.engine)
+    if not pending:
+        click.echo('Database is up to date.')
+    for module in pending:
+        click.echo(f'pending: {module.__name__.rsplit(".", 1)[-1]} - {module.description}')
+
+
+@db_cli.command('compact-results')
+@click.option('--keep-months', type=int, default=lambda: int(os.getenv('RESULTS_RETENTION_MONTHS', 6)),
+              show_default='RESULTS_RETENTION_MONTHS or 6', help='Months of raw results to keep.')
+@click.option('--drop', is_flag=True, help='Drop old partitions instead of keeping them as archive tables.')
+def db_compact_results(keep_months, drop):
+    """Roll old results into per-user, per-quiz summaries."""
+    from extensions import db
+    from utils.result_compaction import add_months, compact_results, month_start
+
+    cutoff = add_months(month_start(datetime.utcnow()), -keep_months)
+    with db.engine.begin() as connection:
+        stats = compact_results(connection, cutoff, drop=drop)
+    click.echo(f'Compacted {stats["results"]} results before {cutoff:%Y-%m-%d} into '
+               f'{stats["summaries"]} summaries ({stats["partitions"]} partition(s) '
+               f'{"dropped" if drop else "archived"}, {stats["deleted"]} row(s) deleted).')
+
+
+@quiz_cli.command('export')
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--id', 'quiz_ids', multiple=True, help='Quiz to export (repeatable); all by default.')
+def quizzes_export(output, quiz_ids):
+    """Write quizzes as a JSON-lines quiz bundle."""
+    from utils.quiz_bundle import export_documents, write_bundle
+
+    for line in write_bundle(export_documents(quiz_ids or None)):
+        output.write(line)
+
+
+@quiz_cli.command('import')
+@click.argument('bundle', type=click.File('r', encoding='utf-8-sig'))
+def quizzes_import(bundle):
+    """Load a quiz bundle; unchanged quizzes are skipped."""
+    from utils.quiz_bundle import import_documents, read_bundle
+
+    try:
+        report = import_documents(read_bundle(bundle))
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for item in report['quizzes']:
+        if item['status'] == 'error':
+            click.echo(f"line {item.get('line')}: {item['id']}: {item['message']}", err=True)
+    click.echo(f"{report['created']} created, {report['updated']} updated, "
+               f"{report['unchanged']} unchanged, {report['failed']} failed.")
+
+
+def register_commands(app):
+    app.cli.add_command(db_cli)
+    app.cli.add_command(quiz_cli)
@@ -0,0 +1,64 @@
+"""
+Gunicorn configuration for production serving.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Environment variables:
+- HOST / PORT: bind address (default 0.0.0.0:5001)
+- WEB_CONCURRENCY: worker processes (default 2 * CPUs + 1)
+- GUNICORN_THREADS: threads per worker in the default gthread mode (default 4)
+- SERVER_ASYNC: set to True to use gevent workers, so long-polling and
+  streaming endpoints hold a greenlet instead of a thread
+- GUNICORN_WORKER_CONNECTIONS: concurrent connections per gevent worker (default 1000)
+- GUNICORN_KEEPALIVE: seconds to hold idle keep-alive connections (default 5)
+- GUNICORN_TIMEOUT: seconds before a silent worker is restarted (default 30)
+- GUNICORN_GRACEFUL_TIMEOUT: seconds to drain in-flight requests on shutdown (default 30)
+- GUNICORN_MAX_REQUESTS: recycle workers after this many requests (default 0, disabled)
+- GUNICORN_ACCESS_LOG: access log file (default '-', stdout); query strings are never logged
+"""
+
+import multiprocessing
+import os
+
+
+def _env_bool(name, default=False):
+    return os.getenv(name, str(default)).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5001')}"
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+if _env_bool('SERVER_ASYNC'):
+    worker_class = 'gevent'
+    worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+else:
+    worker_class = 'gthread'
+    threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+# The default format minus the query string: /api/stream takes the access token as ?jwt=
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        # Make psycopg2 cooperative so a slow query yields to other greenlets
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning('psycogreen not installed; database calls will block gevent workers')
+
+
+def worker_exit(server, worker):
+    # Runs after gunicorn has drained in-flight requests (graceful_timeout)
+    from utils.lifecycle import run_shutdown_hooks
+    run_shutdown_hooks(log=server.log.error)
@@ -0,0 +1,134 @@
+"""
+Minimal schema migration runner.
+
+Each migration is a module in this package named ``m<NNNN>_<slug>.py`` that
+defines ``description`` and ``upgrade(connection)``. Applied revisions are
+recorded in the ``schema_migrations`` table. Migrations must be idempotent
+because ``m0001`` builds a fresh database from the current models.
+
+Migrations run in a single transaction unless the module sets
+``transactional = False``; those receive a plain connection and commit in
+batches themselves, so long backfills don't hold locks for their duration.
+"""
+
+import importlib
+import json
+import pkgutil
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+
+def discover():
+    """Return migration modules sorted by revision"""
+    names = sorted(
+        name for _, name, _ in pkgutil.iter_modules(__path__)
+        if name.startswith('m') and name[1:5].isdigit()
+    )
+    return [importlib.import_module(f'{__name__}.{name}') for name in names]
+
+
+def _revision(module):
+    return module.__name__.rsplit('.', 1)[-1][1:5]
+
+
+def _ensure_table(connection):
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ('
+        'revision VARCHAR(16) PRIMARY KEY, '
+        'description VARCHAR(200), '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+
+
+def applied_revisions(connection):
+    _ensure_table(connection)
+    rows = connection.execute(text(f'SELECT revision FROM {MIGRATIONS_TABLE}'))
+    return {row[0] for row in rows}
+
+
+def pending(engine):
+    with engine.begin() as connection:
+        applied = applied_revisions(connection)
+    return [m for m in discover() if _revision(m) not in applied]
+
+
+def upgrade(engine, log=print):
+    """Apply all pending migrations, each in its own transaction"""
+    applied = []
+    for module in pending(engine):
+        revision = _revision(module)
+        log(f'Applying {revision}: {module.description}')
+        if getattr(module, 'transactional', True):
+            with engine.begin() as connection:
+                module.upgrade(connection)
+                _record(connection, revision, module)
+        else:
+            with engine.connect() as connection:
+                module.upgrade(connection)
+                _record(connection, revision, module)
+                connection.commit()
+        applied.append(revision)
+    return applied
+
+
+def _record(connection, revision, module):
+    connection.execute(
+        text(f'INSERT INTO {MIGRATIONS_TABLE} (revision, description, applied_at) '
+             'VALUES (:revision, :description, :applied_at)'),
+        {'revision': revision, 'description': module.description,
+         'applied_at': datetime.utcnow()}
+    )
+
+
+# --- Helpers for idempotent migrations ---
+
+def has_column(connection, table, column):
+    return column in {c['name'] for c in inspect(connection).get_columns(table)}
+
+
+def has_index(connection, table, index):
+    return index in {i['name'] for i in inspect(connection).get_indexes(table)}
+
+
+def add_column(connection, table, column, ddl):
+    """Add ``column`` to ``table`` using the given type/default DDL if missing"""
+    if not has_column(connection, table, column):
+        connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+
+
+def create_index(connection, name, table, columns, unique=False, concurrently=False, using=None):
+    """
+    Create an index if missing. ``concurrently`` avoids blocking writes on
+    PostgreSQL and requires an AUTOCOMMIT connection. ``using`` picks the
+    access method (e.g. 'gin'); ``columns`` may then be expressions.
+    """
+    if not has_index(connection, table, name):
+        kind = 'UNIQUE INDEX' if unique else 'INDEX'
+        if concurrently and connection.dialect.name == 'postgresql':
+            kind += ' CONCURRENTLY'
+        method = f' USING {using}' if using else ''
+        connection.execute(text(f'CREATE {kind} {name} ON {table}{method} ({columns})'))
+
+
+def create_index_online(connection, name, table, columns, unique=False, using=None):
+    """
+    Create an index without blocking writes, for ``transactional = False``
+    migrations: CONCURRENTLY on a separate AUTOCOMMIT connection on
+    PostgreSQL, a plain committed CREATE INDEX elsewhere.
+    """
+    if connection.dialect.name == 'postgresql':
+        with connection.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as autocommit:
+            create_index(autocommit, name, table, columns, unique=unique, concurrently=True, using=using)
+    else:
+        create_index(connection, name, table, columns, unique=unique, using=using)
+        connection.commit()
+
+
+def json_value(value):
+    """Decode a JSON column read through a lightweight table (str on SQLite, parsed on PostgreSQL)"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
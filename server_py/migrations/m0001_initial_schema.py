@@ -0,0 +1,10 @@
+"""Create every table defined in models.py"""
+
+description = 'Initial schema'
+
+
+def upgrade(connection):
+    from extensions import db
+    import models  # noqa: F401  (registers tables on db.metadata)
+
+    db.metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,109 @@
+"""
+Promote gamification stats from the users.gamification JSON document to
+typed columns (points, streak, level) and the user_badges table.
+
+Runs online: columns are added with constant defaults, their indexes are
+built concurrently on PostgreSQL and the backfill commits in batches keyed
+on users.id. The legacy JSON column is left in place (the new code never
+writes it; the backfill only adds a ``migrated`` marker) so the previous
+release can keep running during a deploy.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import Integer, column, func, select, table
+
+from migrations import add_column, create_index_online, has_column, json_value
+from utils.db_compat import GUID, JSONType
+
+description = 'Gamification columns and user_badges table'
+transactional = False
+
+BATCH_SIZE = 500
+MIGRATED = 'migrated'  # key set in the legacy JSON once its stats are in the columns
+
+logger = logging.getLogger('enableu.migrations')
+
+users = table(
+    'users',
+    column('id', GUID()),
+    column('gamification', JSONType),
+    column('points', Integer),
+    column('streak', Integer),
+    column('level', Integer)
+)
+results = table('results', column('user_id', GUID()), column('score', Integer))
+
+
+def upgrade(connection):
+    add_column(connection, 'users', 'points', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'users', 'streak', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'users', 'level', 'INTEGER NOT NULL DEFAULT 1')
+
+    from models import UserBadge
+    UserBadge.__table__.create(bind=connection, checkfirst=True)
+    connection.commit()
+
+    create_index_online(connection, 'ix_users_points', 'users', 'points')
+    create_index_online(connection, 'ix_users_streak', 'users', 'streak')
+    create_index_online(connection, 'ix_users_level', 'users', 'level')
+
+    if has_column(connection, 'users', 'gamification'):
+        backfill(connection)
+        connection.commit()
+
+
+def backfill(connection, batch_size=BATCH_SIZE):
+    """
+    Add each user's JSON stats to the new columns exactly once, one committed
+    batch at a time. Points are added in SQL rather than assigned, so
+    increments the new code commits before or during the backfill survive;
+    the JSON is marked MIGRATED in the same UPDATE so re-runs skip it.
+    """
+    badges = table('user_badges', column('user_id', GUID()), column('badge_id'), column('awarded_at'))
+    # The leaderboard used to fall back to SUM(results.score) when the JSON
+    # points were 0. Every submit under the new code adds a result and the
+    # same points, so for those users the sum is the whole correct total.
+    result_total = (select(func.coalesce(func.sum(results.c.score), 0))
+                    .where(results.c.user_id == users.c.id).scalar_subquery())
+    last_id = None
+    migrated = 0
+    while True:
+        query = select(users.c.id, users.c.gamification).order_by(users.c.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(users.c.id > last_id)
+        rows = connection.execute(query).all()
+        if not rows:
+            break
+
+        stats = {row.id: json_value(row.gamification) or {} for row in rows}
+        pending = {user_id: g for user_id, g in stats.items() if not g.get(MIGRATED)}
+
+        existing = set(connection.execute(
+            select(badges.c.user_id, badges.c.badge_id).where(badges.c.user_id.in_(list(pending)))
+        ).all()) if pending else set()
+        now = datetime.utcnow()
+        new_badges = []
+
+        for user_id, g in pending.items():
+            legacy_points = int(g.get('points') or 0)
+            connection.execute(
+                users.update().where(users.c.id == user_id).values(
+                    points=users.c.points + legacy_points if legacy_points else result_total,
+                    streak=int(g.get('streak') or 0),
+                    level=int(g.get('level') or 1),
+                    gamification={**g, MIGRATED: True}
+                )
+            )
+            for badge_id in dict.fromkeys(g.get('badges') or []):
+                if (user_id, badge_id) not in existing:
+                    new_badges.append({'user_id': user_id, 'badge_id': str(badge_id), 'awarded_at': now})
+
+        if new_badges:
+            connection.execute(badges.insert(), new_badges)
+        connection.commit()
+
+        migrated += len(pending)
+        last_id = rows[-1].id
+        logger.info('Backfilled gamification stats for %d users', migrated)
@@ -0,0 +1,61 @@
+"""
+Move quiz content from the quizzes.questions JSON column into
+quiz_questions, question_options and answer_keys.
+
+Also adds quizzes.position, the curriculum order quiz lists sort by.
+Existing quizzes are numbered in the order the old ``Quiz.query.all()``
+listing returned them (table order), so the catalog keeps its sequence
+instead of sorting ids as strings (quiz-1, quiz-10, quiz-2...).
+
+Quizzes that already have question rows or a position are skipped, so the
+migration can be re-run. Afterwards the legacy column is made nullable on PostgreSQL
+(kept for rollback) and dropped elsewhere, since SQLite cannot relax a
+NOT NULL constraint in place.
+"""
+
+from sqlalchemy import column, func, select, table, text
+
+from migrations import add_column, has_column, json_value
+from utils.db_compat import JSONType
+
+description = 'Normalized quiz questions, options and answer keys'
+
+
+def upgrade(connection):
+    from models import AnswerKey, QuestionOption, QuizQuestion
+    from utils.quiz_content import content_rows, normalize_questions
+
+    models = (QuizQuestion, QuestionOption, AnswerKey)
+    for model in models:
+        model.__table__.create(bind=connection, checkfirst=True)
+
+    number_quizzes(connection)
+
+    if not has_column(connection, 'quizzes', 'questions'):
+        return
+
+    quizzes = table('quizzes', column('id'), column('questions', JSONType))
+    migrated = set(connection.execute(select(QuizQuestion.quiz_id).distinct()).scalars())
+    for quiz_id, questions in connection.execute(select(quizzes.c.id, quizzes.c.questions)).all():
+        questions = json_value(questions)
+        if quiz_id in migrated or not questions:
+            continue
+        for model, rows in zip(models, content_rows(quiz_id, normalize_questions(questions, require_answer=False))):
+            if rows:
+                connection.execute(model.__table__.insert(), rows)
+
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('ALTER TABLE quizzes ALTER COLUMN questions DROP NOT NULL'))
+    else:
+        connection.execute(text('ALTER TABLE quizzes DROP COLUMN questions'))
+
+
+def number_quizzes(connection):
+    """Give quizzes without a position (0) the next ones, in table order"""
+    add_column(connection, 'quizzes', 'position', 'INTEGER NOT NULL DEFAULT 0')
+    quizzes = table('quizzes', column('id'), column('position'))
+    position = connection.execute(select(func.coalesce(func.max(quizzes.c.position), 0))).scalar_one()
+    # No ORDER BY on purpose: this is the order quiz lists had before positions existed
+    for quiz_id in connection.execute(select(quizzes.c.id).where(quizzes.c.position == 0)).scalars().all():
+        position += 1
+        connection.execute(quizzes.update().where(quizzes.c.id == quiz_id).values(position=position))
@@ -0,0 +1,62 @@
+"""
+Index results by (user_id, completed_at) and make user_progress unique per
+(user_id, quiz_id), the conflict target of the progress upserts.
+
+Existing duplicate progress rows are collapsed first, keeping a completed
+row if there is one, otherwise the most recently active. Indexes are built
+CONCURRENTLY on PostgreSQL.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import DateTime, String, column, func, select, table
+
+from migrations import create_index_online
+from utils.db_compat import GUID
+
+description = 'Results history index and unique user_progress rows'
+transactional = False
+
+logger = logging.getLogger('enableu.migrations')
+
+user_progress = table(
+    'user_progress',
+    column('id', GUID()),
+    column('user_id', GUID()),
+    column('quiz_id', String),
+    column('status', String),
+    column('last_activity', DateTime)
+)
+
+
+def upgrade(connection):
+    removed = dedupe_progress(connection)
+    if removed:
+        # A warning so the deleted rows show up without any logging setup
+        logger.warning('Removed %d duplicate user_progress rows', removed)
+    connection.commit()
+
+    create_index_online(connection, 'ix_results_user_completed', 'results', 'user_id, completed_at')
+    create_index_online(connection, 'uq_user_progress_user_quiz', 'user_progress', 'user_id, quiz_id', unique=True)
+
+
+def dedupe_progress(connection):
+    """Delete all but one row per (user_id, quiz_id); returns the number deleted"""
+    duplicates = connection.execute(
+        select(user_progress.c.user_id, user_progress.c.quiz_id)
+        .group_by(user_progress.c.user_id, user_progress.c.quiz_id)
+        .having(func.count() > 1)
+    ).all()
+
+    removed = 0
+    for user_id, quiz_id in duplicates:
+        rows = connection.execute(
+            select(user_progress.c.id, user_progress.c.status, user_progress.c.last_activity)
+            .where(user_progress.c.user_id == user_id, user_progress.c.quiz_id == quiz_id)
+        ).all()
+        keep = max(rows, key=lambda r: (r.status == 'completed', r.last_activity or datetime.min))
+        stale = [r.id for r in rows if r.id != keep.id]
+        connection.execute(user_progress.delete().where(user_progress.c.id.in_(stale)))
+        removed += len(stale)
+    return removed
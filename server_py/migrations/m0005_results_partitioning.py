@@ -0,0 +1,34 @@
+"""
+Add result_summaries and, on PostgreSQL, range-partition results by month.
+
+Fresh databases already get a partitioned results table from the models,
+so only the partitions are created; an existing plain table is swapped for
+a partitioned copy (see utils.result_compaction.convert_to_partitioned).
+
+Downtime: the swap and the copy run in this migration's single
+transaction, so ``results`` is locked (no reads or writes, including quiz
+submissions and progress pages) until every row has been copied. Expect
+roughly as long as ``INSERT ... SELECT`` of the whole table takes; run it
+in a maintenance window on large databases.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+description = 'Monthly results partitions and result_summaries'
+
+
+def upgrade(connection):
+    from models import Result, ResultSummary
+    from utils.result_compaction import convert_to_partitioned, ensure_partitions, is_partitioned
+
+    ResultSummary.__table__.create(bind=connection, checkfirst=True)
+
+    if connection.dialect.name != 'postgresql':
+        return
+    if not is_partitioned(connection):
+        convert_to_partitioned(connection)
+    else:
+        start = connection.execute(select(func.min(Result.completed_at))).scalar()
+        ensure_partitions(connection, start or datetime.utcnow())
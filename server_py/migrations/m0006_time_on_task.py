@@ -0,0 +1,20 @@
+"""
+Time-on-task columns: per-attempt and lifetime active seconds on
+user_progress, per-result time_spent and summarized totals.
+
+All columns have a constant default, so on PostgreSQL these are catalog-only
+changes (ALTER on the partitioned results parent reaches every partition).
+Existing rows start at zero; there was no real measurement to backfill.
+"""
+
+from migrations import add_column
+
+description = 'Active time columns on progress, results and summaries'
+
+
+def upgrade(connection):
+    add_column(connection, 'user_progress', 'active_seconds', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'user_progress', 'total_seconds', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'results', 'time_spent', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'result_summaries', 'total_time_spent', 'INTEGER NOT NULL DEFAULT 0')
+    add_column(connection, 'result_summaries', 'last_time_spent', 'INTEGER NOT NULL DEFAULT 0')
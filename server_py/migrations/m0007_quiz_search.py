@@ -0,0 +1,22 @@
+"""
+GIN indexes for quiz full-text search (utils.quiz_search) on PostgreSQL.
+
+The indexes are on expressions, not stored tsvector columns, so writers
+need no changes and the index can never drift from the text. Built
+CONCURRENTLY. Other databases search an in-memory index instead.
+"""
+
+from migrations import create_index_online
+
+description = 'Full-text search indexes on quizzes and questions'
+transactional = False
+
+
+def upgrade(connection):
+    if connection.dialect.name != 'postgresql':
+        return
+    from utils.quiz_search import QUESTION_VECTOR, QUIZ_VECTOR
+
+    create_index_online(connection, 'ix_quizzes_search', 'quizzes', f'({QUIZ_VECTOR})', using='gin')
+    create_index_online(connection, 'ix_quiz_questions_search', 'quiz_questions', f'({QUESTION_VECTOR})',
+                        using='gin')
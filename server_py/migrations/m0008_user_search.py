@@ -0,0 +1,26 @@
+"""
+Trigram GiST indexes for admin user search (utils.user_search) on PostgreSQL.
+
+Enables pg_trgm (a trusted extension from PostgreSQL 13, so the database
+owner can create it) and indexes users.email and users.name with
+gist_trgm_ops. GiST serves ILIKE and the ``%`` operator and also returns
+rows in ``<->`` distance order, which the search uses to bound its
+candidates. Built CONCURRENTLY. Other databases search with LIKE.
+"""
+
+from sqlalchemy import text
+
+from migrations import create_index_online
+
+description = 'Trigram indexes on user email and name'
+transactional = False
+
+
+def upgrade(connection):
+    if connection.dialect.name != 'postgresql':
+        return
+    connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    connection.commit()
+
+    create_index_online(connection, 'ix_users_email_trgm', 'users', 'email gist_trgm_ops', using='gist')
+    create_index_online(connection, 'ix_users_name_trgm', 'users', 'name gist_trgm_ops', using='gist')
@@ -0,0 +1,13 @@
+"""
+Content hash on quizzes, so bundle imports (utils.quiz_bundle) skip quizzes
+whose content is unchanged. Nullable: existing quizzes are rewritten by
+their first bundle load.
+"""
+
+from migrations import add_column
+
+description = 'Quiz bundle content hash'
+
+
+def upgrade(connection):
+    add_column(connection, 'quizzes', 'content_hash', 'VARCHAR(64)')
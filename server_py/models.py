@@ -1,21 +1,27 @@
 from extensions import db
 from datetime import datetime
 import uuid
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from utils.db_compat import GUID, JSONType
 
 class User(db.Model):
     __tablename__ = 'users'
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
     email = db.Column(db.String(120), unique=True, nullable=False)
     name = db.Column(db.String(100), nullable=True)
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), default='student')
     is_verified = db.Column(db.Boolean, default=False)
     
-    # JSONB for flexible settings and gamification stats
-    accessibility_settings = db.Column(JSONB, default=lambda: {'highContrast': False, 'reduceMotion': False})
-    gamification = db.Column(JSONB, default=lambda: {'points': 0, 'badges': [], 'streak': 0})
+    # JSON (JSONB on PostgreSQL) for flexible settings
+    accessibility_settings = db.Column(JSONType, default=lambda: {'highContrast': False, 'reduceMotion': False})
+    
+    # Gamification stats (formerly the ``gamification`` JSONB document; badges live in user_badges)
+    points = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    streak = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    level = db.Column(db.Integer, nullable=False, default=1, server_default='1', index=True)
+    badges = db.relationship('UserBadge', lazy=True, order_by='UserBadge.awarded_at',
+                             cascade='all, delete-orphan', backref='user')
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -27,6 +33,23 @@ class User(db.Model):
     requires_password_change = db.Column(db.Boolean, default=False)
     last_password_change = db.Column(db.DateTime, nullable=True)
 
+    @property
+    def gamification(self):
+        """Gamification stats in the legacy JSON response shape"""
+        return {
+            'points': self.points or 0,
+            'badges': [badge.badge_id for badge in self.badges],
+            'streak': self.streak or 0,
+            'level': self.level or 1
+        }
+
+class UserBadge(db.Model):
+    __tablename__ = 'user_badges'
+
+    user_id = db.Column(GUID(), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    badge_id = db.Column(db.String(50), primary_key=True) # currently the ID of the quiz completed with 100%
+    awarded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
 
@@ -35,24 +58,99 @@ class Quiz(db.Model):
     description = db.Column(db.Text)
     time_limit = db.Column(db.Integer) # in seconds
     points_reward = db.Column(db.Integer, default=50)
+    # Curriculum order: quiz lists sort by position, then id
+    position = db.Column(db.Integer, nullable=False, default=0)
+    # SHA-256 of the content last loaded from a quiz bundle (utils/quiz_bundle.py);
+    # cleared by admin edits so the next bundle load rewrites the quiz
+    content_hash = db.Column(db.String(64))
     
-    # Storing questions as JSON to avoid complex relational overhead for this MVP
-    questions = db.Column(JSONB, nullable=False) 
+    # Questions live in quiz_questions/question_options; correct answers in answer_keys
+    # (see utils/quiz_content.py). question_count is defined below QuizQuestion.
+
+class QuizQuestion(db.Model):
+    __tablename__ = 'quiz_questions'
+
+    quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id', ondelete='CASCADE'), primary_key=True)
+    question_id = db.Column(db.String(50), primary_key=True) # client-facing id, e.g. 'q1'
+    position = db.Column(db.Integer, nullable=False, default=0)
+    text = db.Column(db.Text, nullable=False)
+
+class QuestionOption(db.Model):
+    __tablename__ = 'question_options'
+    __table_args__ = (
+        db.ForeignKeyConstraint(['quiz_id', 'question_id'],
+                                ['quiz_questions.quiz_id', 'quiz_questions.question_id'],
+                                ondelete='CASCADE'),
+    )
+
+    quiz_id = db.Column(db.String(50), primary_key=True)
+    question_id = db.Column(db.String(50), primary_key=True)
+    option_id = db.Column(db.String(50), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)
+    text = db.Column(db.Text, nullable=False)
+
+class AnswerKey(db.Model):
+    """Correct option and explanation per question; read only when grading"""
+    __tablename__ = 'answer_keys'
+    __table_args__ = (
+        db.ForeignKeyConstraint(['quiz_id', 'question_id'],
+                                ['quiz_questions.quiz_id', 'quiz_questions.question_id'],
+                                ondelete='CASCADE'),
+    )
+
+    quiz_id = db.Column(db.String(50), primary_key=True)
+    question_id = db.Column(db.String(50), primary_key=True)
+    correct_option_id = db.Column(db.String(50))
+    explanation = db.Column(db.Text)
+
+Quiz.question_count = db.column_property(
+    db.select(db.func.count(QuizQuestion.question_id))
+    .where(QuizQuestion.quiz_id == Quiz.id)
+    .correlate_except(QuizQuestion)
+    .scalar_subquery(),
+    deferred=True
+)
 
 class Result(db.Model):
+    """
+    Raw quiz attempts. Range-partitioned by month on PostgreSQL (the partition
+    key must be part of the primary key); old months are rolled up into
+    ResultSummary by utils/result_compaction.py.
+    """
     __tablename__ = 'results'
+    __table_args__ = (
+        # Per-user history, newest first (progress page, recent activity)
+        db.Index('ix_results_user_completed', 'user_id', 'completed_at'),
+        {'postgresql_partition_by': 'RANGE (completed_at)'}
+    )
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id'), nullable=False)
     score = db.Column(db.Integer, nullable=False)
     correct_count = db.Column(db.Integer, nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
-    completed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Active seconds for this attempt, from progress heartbeats
+    time_spent = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_at = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow)
 
     user = db.relationship('User', backref=db.backref('results', lazy=True))
     quiz = db.relationship('Quiz', backref=db.backref('results', lazy=True))
 
+class ResultSummary(db.Model):
+    """Per-user, per-quiz totals of results compacted out of the raw table"""
+    __tablename__ = 'result_summaries'
+
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), primary_key=True)
+    quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    best_score = db.Column(db.Integer, nullable=False, default=0)
+    last_score = db.Column(db.Integer, nullable=False, default=0)
+    total_time_spent = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_time_spent = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    last_completed_at = db.Column(db.DateTime, nullable=False)
+
 class Task(db.Model):
     __tablename__ = 'tasks'
 
@@ -63,19 +161,27 @@ class Task(db.Model):
     priority = db.Column(db.String(20), default='medium')
     type = db.Column(db.String(20), default='development')
     
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=True) # Optional for now as tasks were global in legacy
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=True) # Optional for now as tasks were global in legacy
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class UserProgress(db.Model):
     __tablename__ = 'user_progress'
+    __table_args__ = (
+        # One row per user and quiz; also the conflict target for progress upserts
+        db.Index('uq_user_progress_user_quiz', 'user_id', 'quiz_id', unique=True),
+    )
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id'), nullable=False)
     status = db.Column(db.String(20), default='started') # started, in-progress, completed
     current_question_index = db.Column(db.Integer, default=0)
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_activity = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Active seconds (heartbeat gaps up to PROGRESS_IDLE_SECONDS) in the current
+    # attempt, moved to Result.time_spent on submit, and across all attempts
+    active_seconds = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_seconds = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     user = db.relationship('User', backref=db.backref('progress', lazy=True))
     quiz = db.relationship('Quiz', backref=db.backref('progress_records', lazy=True))
@@ -83,8 +189,8 @@ class UserProgress(db.Model):
 class AuditLog(db.Model):
     __tablename__ = 'audit_logs'
 
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     action = db.Column(db.String(100), nullable=False)  # LOGIN, LOGOUT, CREATE_QUIZ, DELETE_QUIZ, UPDATE_USER_ROLE, etc.
     details = db.Column(db.Text)  # Additional context about the action
     ip_address = db.Column(db.String(50))
@@ -95,11 +201,11 @@ class AuditLog(db.Model):
 
     def to_dict(self):
         return {
-            'id': str(self.id),
-            'user_id': str(self.user_id),
+            'id': self.id,
+            'user_id': self.user_id,
             'user_email': self.user.email if self.user else None,
             'action': self.action,
             'details': self.details,
             'ip_address': self.ip_address,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+            'timestamp': self.timestamp
         }
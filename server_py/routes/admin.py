@@ -1,10 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from extensions import db
-from models import User, Quiz, AuditLog
+from models import User, Quiz, AuditLog, UserBadge, UserProgress
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from functools import wraps
 from datetime import datetime
 from utils.security import validate_password_strength
+from utils.cache_bus import invalidate_on_commit
+from utils.analytics import badge_distribution, fill_growth_series
+from utils.db_compat import day_bucket, day_key
+from utils.projection import requested_fields
+from utils.quiz_bundle import export_documents, import_documents, read_bundle, write_bundle
+from utils.quiz_content import (delete_questions, next_quiz_position, normalize_questions, replace_questions,
+                                update_question)
+from utils.user_import import import_users
+from utils.user_search import MAX_QUERY_LENGTH, MIN_QUERY_LENGTH, search_user_ids
+from sqlalchemy.orm import load_only, selectinload
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -57,20 +67,99 @@ def admin_required(fn):
         return fn(*args, **kwargs)
     return wrapper
 
+# User list fields (?fields= names) and the columns each one needs
+USER_COLUMNS = {
+    'id': (User.id,),
+    'email': (User.email,),
+    'role': (User.role,),
+    'name': (User.name,),
+    'points': (User.points,),
+    'gamification': (User.points, User.streak, User.level),
+    'created_at': (User.created_at,)
+}
+USER_DEFAULT_FIELDS = ('id', 'email', 'role', 'name', 'gamification', 'created_at')
+USER_SUMMARY_FIELDS = ('id', 'email', 'role', 'name', 'points')
+
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_users():
-    users = User.query.all()
+    """All users; ?view=summary or ?fields=id,email,... load only those columns"""
+    try:
+        fields = requested_fields(request.args, USER_COLUMNS, USER_SUMMARY_FIELDS, USER_DEFAULT_FIELDS)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    users = users_query(fields).all()
+    # Serialize before logging: the audit commit expires every loaded user
+    payload = [{field: getattr(u, field) for field in fields} for u in users]
     log_admin_activity('VIEW_USERS', f'Viewed {len(users)} users')
     
-    return jsonify([{
-        'id': str(u.id),
-        'email': u.email,
-        'role': u.role,
-        'name': u.name,
-        'gamification': u.gamification,
-        'created_at': u.created_at.isoformat() if u.created_at else None
-    } for u in users])
+    return jsonify(payload)
+
+def users_query(fields):
+    """User query loading only the columns (and badges) behind ``fields``"""
+    columns = dict.fromkeys(column for field in fields for column in USER_COLUMNS[field])
+    options = [load_only(*columns)]
+    if 'gamification' in fields:
+        options.append(selectinload(User.badges))
+    return User.query.options(*options)
+
+@admin_bp.route('/users/import', methods=['POST'])
+@admin_required
+def import_users_csv():
+    """
+    Create users from a CSV upload (multipart field 'file', or a text/csv
+    body) with columns email, name, role, password. Returns a per-row report.
+    """
+    import csv
+    import io
+    upload = request.files.get('file')
+    if upload is not None:
+        stream = upload.stream
+    elif request.mimetype == 'text/csv':
+        stream = request.stream
+    else:
+        return jsonify({'message': "Upload a CSV as the 'file' field or a text/csv body"}), 400
+
+    config = current_app.config
+    try:
+        report = import_users(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''),
+                              batch_size=config['IMPORT_BATCH_SIZE'],
+                              workers=config['IMPORT_HASH_WORKERS'],
+                              max_rows=config['IMPORT_MAX_ROWS'])
+    except (ValueError, csv.Error) as e:
+        db.session.rollback()
+        return jsonify({'message': f'Could not read CSV: {e}'}), 400
+
+    log_admin_activity('IMPORT_USERS', f"Imported {report['created']} users "
+                                       f"({report['skipped']} skipped, {report['failed']} failed)")
+    return jsonify(report)
+
+@admin_bp.route('/users/search', methods=['GET'])
+@admin_required
+def search_users():
+    """
+    Users whose email or name contains ?q= (or, on PostgreSQL, nearly
+    matches it), best match first. ?limit= (at most 50) and the same
+    ?view=/?fields= projections as /users.
+    """
+    query = (request.args.get('q') or '').strip()
+    if not MIN_QUERY_LENGTH <= len(query) <= MAX_QUERY_LENGTH:
+        return jsonify({'message': f'Search query must be {MIN_QUERY_LENGTH} to {MAX_QUERY_LENGTH} characters'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+    try:
+        fields = requested_fields(request.args, USER_COLUMNS, USER_SUMMARY_FIELDS, USER_DEFAULT_FIELDS)
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    hits = search_user_ids(query, limit)
+    users = {}
+    if hits:
+        users = {u.id: u for u in users_query(fields).filter(User.id.in_([user_id for user_id, _ in hits]))}
+    return jsonify({
+        'users': [{**{field: getattr(users[user_id], field) for field in fields}, 'rank': round(rank, 4)}
+                  for user_id, rank in hits if user_id in users]
+    })
 
 @admin_bp.route('/users', methods=['POST'])
 @admin_required
@@ -109,6 +198,7 @@ def create_user():
     )
     
     db.session.add(new_user)
+    invalidate_on_commit('leaderboard')
     db.session.commit()
 
     log_admin_activity('CREATE_USER', f'Created new {role}: {email}')
@@ -116,7 +206,7 @@ def create_user():
     return jsonify({
         'message': 'User created successfully',
         'user': {
-            'id': str(new_user.id),
+            'id': new_user.id,
             'email': new_user.email,
             'name': new_user.name,
             'role': new_user.role
@@ -161,16 +251,24 @@ def create_quiz():
     if Quiz.query.get(quiz_id):
         return jsonify({'message': 'Quiz ID already exists'}), 400
 
+    try:
+        questions = normalize_questions(data['questions'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
     new_quiz = Quiz(
         id=quiz_id,
         title=data['title'],
         description=data.get('description', ''),
         time_limit=data.get('time_limit', 600),
         points_reward=data.get('points_reward', 50),
-        questions=data['questions']
+        position=next_quiz_position()
     )
     
     db.session.add(new_quiz)
+    db.session.flush()
+    replace_questions(quiz_id, questions)
+    invalidate_on_commit(prefixes=['quizzes'])
     db.session.commit()
     
     log_admin_activity('CREATE_QUIZ', 
@@ -178,6 +276,47 @@ def create_quiz():
     
     return jsonify({'message': 'Quiz created successfully', 'id': new_quiz.id}), 201
 
+@admin_bp.route('/quizzes/export', methods=['GET'])
+@admin_required
+def export_quizzes():
+    """All quizzes (or ?ids=a,b) as a quiz bundle download, streamed quiz by quiz"""
+    from flask import Response, stream_with_context
+    ids = request.args.get('ids')
+    quiz_ids = [quiz_id.strip() for quiz_id in ids.split(',') if quiz_id.strip()] if ids else None
+
+    log_admin_activity('EXPORT_QUIZZES', f"Exported {'all' if quiz_ids is None else len(quiz_ids)} quizzes")
+    filename = f"quizzes_{datetime.utcnow():%Y-%m-%d}.jsonl"
+    return Response(stream_with_context(write_bundle(export_documents(quiz_ids))),
+                    mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@admin_bp.route('/quizzes/import', methods=['POST'])
+@admin_required
+def import_quizzes():
+    """
+    Load a quiz bundle (multipart field 'file', or an application/x-ndjson
+    body). Unchanged quizzes are skipped; returns a per-quiz report.
+    """
+    import io
+    upload = request.files.get('file')
+    if upload is not None:
+        stream = upload.stream
+    elif request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        stream = request.stream
+    else:
+        return jsonify({'message': "Upload a quiz bundle as the 'file' field or an application/x-ndjson body"}), 400
+
+    try:
+        report = import_documents(read_bundle(io.TextIOWrapper(stream, encoding='utf-8-sig')))
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+
+    log_admin_activity('IMPORT_QUIZZES', f"Imported quiz bundle: {report['created']} created, "
+                                         f"{report['updated']} updated, {report['unchanged']} unchanged, "
+                                         f"{report['failed']} failed")
+    return jsonify(report)
+
 @admin_bp.route('/quizzes/<quiz_id>', methods=['DELETE'])
 @admin_required
 def delete_quiz(quiz_id):
@@ -186,7 +325,9 @@ def delete_quiz(quiz_id):
         return jsonify({'message': 'Quiz not found'}), 404
     
     quiz_title = quiz.title
+    delete_questions(quiz_id)
     db.session.delete(quiz)
+    invalidate_on_commit(f'quiz:{quiz_id}', prefixes=['quizzes'])
     db.session.commit()
     
     log_admin_activity('DELETE_QUIZ', f'Deleted quiz "{quiz_title}" (ID: {quiz_id})')
@@ -252,9 +393,7 @@ def get_analytics():
     total_quizzes = Quiz.query.count()
     
     # Count active users (users with points > 0)
-    active_users = User.query.filter(
-        User.gamification['points'].astext.cast(db.Integer) > 0
-    ).count()
+    active_users = User.query.filter(User.points > 0).count()
     
     # Get role distribution
     role_distribution = db.session.query(
@@ -276,82 +415,44 @@ def get_analytics():
     # 1. User Growth Trends (last 30 days)
     thirty_days_ago = today - timedelta(days=30)
     
-    # Query to group creating_at by date
-    # Note: Using date_trunc for PostgreSQL
+    # Query to group created_at by date (date_trunc on PostgreSQL)
+    day = day_bucket(User.created_at, db.engine.dialect.name)
     growth_data = db.session.query(
-        func.date_trunc('day', User.created_at).label('date'),
+        day.label('date'),
         func.count(User.id)
     ).filter(
         User.created_at >= thirty_days_ago
-    ).group_by(
-        func.date_trunc('day', User.created_at)
-    ).order_by(
-        func.date_trunc('day', User.created_at)
-    ).all()
-    
-    # Format for frontend: [{'date': '2023-10-01', 'users': 5}, ...]
-    # We need cumulative sum ideally, but for now let's just show daily new users 
-    # or calculate cumulative on the fly if needed. 
-    # Let's do cumulative calculation here for robustness.
-    
-    # First, get total count before 30 days ago
-    base_count = User.query.filter(User.created_at < thirty_days_ago).count()
-    
-    formatted_growth_data = []
-    running_total = base_count
-    
-    # We should fill in missing dates for a smooth chart
-    current_date = thirty_days_ago
+    ).group_by(day).order_by(day).all()
     
-    # Create a map of existing data
-    data_map = {str(d[0].date()): d[1] for d in growth_data if d[0]}
-    
-    while current_date <= today:
-        date_str = str(current_date.date())
-        daily_count = data_map.get(date_str, 0)
-        running_total += daily_count
-        
-        formatted_growth_data.append({
-            'date': date_str,
-            'users': running_total,
-            'newUsers': daily_count
-        })
-        current_date += timedelta(days=1)
+    # Format for frontend: [{'date': '2023-10-01', 'users': 5, 'newUsers': 1}, ...]
+    # Cumulative totals start from the users created before the window,
+    # with missing dates filled in for a smooth chart.
+    base_count = User.query.filter(User.created_at < thirty_days_ago).count()
+    data_map = {day_key(d[0]): d[1] for d in growth_data if d[0]}
+    formatted_growth_data = fill_growth_series(data_map, thirty_days_ago, today, base_count)
 
     # 2. Badge Distribution
-    # This requires more complex JSONB querying or processing in python if volume is low.
-    # For scalability, we'd use SQL, but JSONB aggregation can be tricky across versions.
-    # Efficient Hybrid approach: Fetch only the gamification column
-    
-    user_gamification_data = db.session.query(User.gamification).all()
-    
-    badge_counts = {'0': 0, '1': 0, '2': 0, '3+': 0}
-    
-    for g_data in user_gamification_data:
-        g = g_data[0] or {} # Handle None
-        badges = g.get('badges', [])
-        count = len(badges)
-        
-        if count == 0: badge_counts['0'] += 1
-        elif count == 1: badge_counts['1'] += 1
-        elif count == 2: badge_counts['2'] += 1
-        else: badge_counts['3+'] += 1
-        
-    formatted_badge_data = [
-        {'name': '0 Badges', 'value': badge_counts['0']},
-        {'name': '1 Badge', 'value': badge_counts['1']},
-        {'name': '2 Badges', 'value': badge_counts['2']},
-        {'name': '3+ Badges', 'value': badge_counts['3+']}
-    ]
+    # Badge counts per user straight from user_badges; users without a row have 0
+    badge_counts = [count for (count,) in db.session.query(
+        func.count(UserBadge.badge_id)
+    ).group_by(UserBadge.user_id).all()]
+    badge_counts.extend([0] * (total_users - len(badge_counts)))
+    formatted_badge_data = badge_distribution(badge_counts)
 
     # 3. Total Points (Global)
-    # Perform sum on the JSONB field cast to integer
-    # Note: This syntax is PostgreSQL specific for JSONB 'points'
-    total_points = db.session.query(
-        func.sum(
-            func.cast(User.gamification['points'].astext, db.Integer)
-        )
-    ).scalar() or 0
+    total_points = db.session.query(func.sum(User.points)).scalar() or 0
+
+    # 4. Active time per quiz, summed from the per-(user, quiz) progress totals
+    time_per_quiz = db.session.query(
+        UserProgress.quiz_id,
+        func.count(UserProgress.user_id),
+        func.sum(UserProgress.total_seconds)
+    ).group_by(UserProgress.quiz_id).all()
+    formatted_time_data = [
+        {'quiz_id': quiz_id, 'learners': learners, 'total_seconds': int(seconds or 0),
+         'average_seconds': round((seconds or 0) / learners) if learners else 0}
+        for quiz_id, learners, seconds in time_per_quiz
+    ]
 
     log_admin_activity('VIEW_ANALYTICS', 'Viewed platform analytics')
     
@@ -363,7 +464,8 @@ def get_analytics():
         'role_distribution': {role: count for role, count in role_distribution},
         'recent_admin_actions': recent_admin_actions,
         'growth_trends': formatted_growth_data,
-        'badge_distribution': formatted_badge_data
+        'badge_distribution': formatted_badge_data,
+        'time_per_quiz': formatted_time_data
     })
 
 @admin_bp.route('/users/<user_id>', methods=['PUT'])
@@ -397,6 +499,7 @@ def update_user_details(user_id):
         from werkzeug.security import generate_password_hash
         user.password_hash = generate_password_hash(data['password'])
         
+    invalidate_on_commit('leaderboard')
     db.session.commit()
     
     log_admin_activity('UPDATE_USER', f'Updated details for user {user.email}')
@@ -404,7 +507,7 @@ def update_user_details(user_id):
     return jsonify({
         'message': 'User updated successfully',
         'user': {
-            'id': str(user.id),
+            'id': user.id,
             'email': user.email,
             'name': user.name,
             'role': user.role
@@ -428,15 +531,44 @@ def update_quiz(quiz_id):
         quiz.time_limit = data['time_limit']
     if data.get('points_reward'):
         quiz.points_reward = data['points_reward']
+    # No longer what a bundle last loaded; the next import rewrites it
+    quiz.content_hash = None
     if data.get('questions'):
-        quiz.questions = data['questions']
+        try:
+            replace_questions(quiz_id, data['questions'])
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'message': str(e)}), 400
         
+    invalidate_on_commit(f'quiz:{quiz_id}', prefixes=['quizzes'])
     db.session.commit()
     
     log_admin_activity('UPDATE_QUIZ', f'Updated quiz "{quiz.title}"')
     
     return jsonify({'message': 'Quiz updated successfully'})
 
+@admin_bp.route('/quizzes/<quiz_id>/questions/<question_id>', methods=['PATCH'])
+@admin_required
+def update_quiz_question(quiz_id, question_id):
+    """Edit one question (text, options, correctOptionId, explanation) without rewriting the quiz"""
+    data = request.get_json() or {}
+    
+    try:
+        question = update_question(quiz_id, question_id, data)
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'message': str(e)}), 400
+    if question is None:
+        return jsonify({'message': 'Question not found'}), 404
+    Quiz.query.filter_by(id=quiz_id).update({Quiz.content_hash: None}, synchronize_session=False)
+        
+    invalidate_on_commit(f'quiz:{quiz_id}', prefixes=['quizzes'])
+    db.session.commit()
+    
+    log_admin_activity('UPDATE_QUESTION', f'Updated question {question_id} of quiz {quiz_id}')
+    
+    return jsonify({'message': 'Question updated successfully', 'question': question})
+
 @admin_bp.route('/analytics/export', methods=['GET'])
 @admin_required
 def export_analytics():
@@ -445,7 +577,7 @@ def export_analytics():
     from io import StringIO
     from flask import Response
     
-    users = User.query.all()
+    users = User.query.options(selectinload(User.badges)).all()
     
     # Create CSV in memory
     si = StringIO()
@@ -458,8 +590,8 @@ def export_analytics():
             u.name, 
             u.email, 
             u.role, 
-            u.gamification.get('points', 0) if u.gamification else 0,
-            len(u.gamification.get('badges', [])) if u.gamification else 0,
+            u.points,
+            len(u.badges),
             u.created_at.isoformat() if u.created_at else ''
         ])
         
@@ -469,3 +601,37 @@ def export_analytics():
         mimetype="text/csv",
         headers={"Content-disposition": "attachment; filename=enableu_export.csv"}
     )
+
+@admin_bp.route('/system/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool_stats():
+    """Connection pool statistics for the worker serving this request"""
+    from utils.db_pool import get_pool_stats
+    return jsonify(get_pool_stats(db.engine))
+
+@admin_bp.route('/system/cache-bus', methods=['GET'])
+@admin_required
+def get_cache_bus_stats():
+    """Cross-process cache invalidation status for the worker serving this request"""
+    from utils.cache_bus import cache_bus
+    return jsonify(cache_bus.snapshot())
+
+@admin_bp.route('/system/slow-queries', methods=['GET'])
+@admin_required
+def get_slow_queries():
+    """Top slow statements by total time, plus the most recent samples"""
+    from utils.slow_query import slow_query_log
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        'threshold_ms': slow_query_log.threshold_ms,
+        'top': slow_query_log.top(limit),
+        'recent': slow_query_log.samples()[:limit]
+    })
+
+@admin_bp.route('/system/slow-queries', methods=['DELETE'])
+@admin_required
+def reset_slow_queries():
+    from utils.slow_query import slow_query_log
+    slow_query_log.reset()
+    log_admin_activity('RESET_SLOW_QUERIES', 'Cleared slow query statistics')
+    return jsonify({'message': 'Slow query statistics cleared'})
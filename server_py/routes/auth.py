@@ -4,6 +4,7 @@ from models import User, AuditLog
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 from utils.security import validate_password_strength
+from utils.cache_bus import invalidate_on_commit
 import datetime
 import uuid
 
@@ -34,6 +35,7 @@ def register():
     new_user = User(email=email, name=name, password_hash=hashed_password)
     
     db.session.add(new_user)
+    invalidate_on_commit('leaderboard')
     db.session.commit()
 
     return jsonify({'message': 'User created successfully'}), 201
@@ -49,7 +51,7 @@ def login():
     if not user or not check_password_hash(user.password_hash, password):
         return jsonify({'message': 'Invalid credentials'}), 401
 
-    access_token = create_access_token(identity=user.id, expires_delta=datetime.timedelta(days=1))
+    access_token = create_access_token(identity=str(user.id), expires_delta=datetime.timedelta(days=1))
     
     # Log admin login
     if user.role == 'admin':
@@ -70,15 +72,7 @@ def login():
     # Return user data along with token to match frontend expectation
     return jsonify({
         'token': access_token,
-        'user': {
-            'id': str(user.id),
-            'email': user.email,
-            'name': user.name,
-            'role': user.role,
-            'gamification': user.gamification,
-            'settings': user.accessibility_settings,
-            'requires_password_change': user.requires_password_change or False
-        }
+        'user': profile_payload(user)
     }), 200
 
 @auth_bp.route('/me', methods=['GET'])
@@ -90,15 +84,19 @@ def me():
     if not user:
         return jsonify({'message': 'User not found'}), 404
         
-    return jsonify({
-        'id': str(user.id),
+    return jsonify(profile_payload(user)), 200
+
+def profile_payload(user):
+    """The /me and login user body; shared with GET /api/dashboard"""
+    return {
+        'id': user.id,
         'email': user.email,
         'name': user.name,
         'role': user.role,
         'gamification': user.gamification,
         'settings': user.accessibility_settings,
         'requires_password_change': user.requires_password_change or False
-    }), 200
+    }
 
 @auth_bp.route('/me', methods=['PUT'])
 @jwt_required()
@@ -126,19 +124,12 @@ def update_profile():
     if data.get('settings'):
         user.accessibility_settings = data['settings']
             
+    invalidate_on_commit('leaderboard')
     db.session.commit()
     
     return jsonify({
         'message': 'Profile updated successfully',
-        'user': {
-            'id': str(user.id),
-            'email': user.email,
-            'name': user.name,
-            'role': user.role,
-            'gamification': user.gamification,
-            'settings': user.accessibility_settings,
-            'requires_password_change': user.requires_password_change or False
-        }
+        'user': profile_payload(user)
     }), 200
 
 @auth_bp.route('/forgot-password', methods=['POST'])
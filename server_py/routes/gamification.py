@@ -1,65 +1,93 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from extensions import db
-from models import User, Quiz, Result
+from models import User, Quiz, Result, ResultSummary, UserBadge, UserProgress
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import desc
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy import case, desc, func, select
+from sqlalchemy.orm import joinedload, undefer
 from datetime import datetime
+from uuid import UUID
+from routes.auth import profile_payload
+from utils.cache import cached_payload, cached_response, response_cache
+from utils.cache_bus import invalidate_on_commit
+from utils.db_compat import upsert
+from utils.events import event_broker
+from utils.grading import build_feedback, grade_quiz
+from utils.progress_buffer import add_active_time, capped_credit, credit_expression, credit_seconds, progress_buffer
+from utils.projection import requested_fields
+from utils.quiz_content import (CATALOG_FIELDS, QUIZ_COLUMNS, QUIZ_FIELDS, QUIZ_ORDER, SUMMARY_FIELDS,
+                                load_catalog, load_graded_questions, load_quiz_list)
+from utils.quiz_search import MAX_QUERY_LENGTH, search_quizzes
 
 gamification_bp = Blueprint('gamification', __name__)
 
+def quiz_list_fields():
+    return requested_fields(request.args, QUIZ_FIELDS, SUMMARY_FIELDS, CATALOG_FIELDS)
+
+def quiz_list_cache_key():
+    # One entry per normalized field set; bad input skips caching (400)
+    try:
+        fields = quiz_list_fields()
+    except ValueError:
+        return 'quizzes?invalid'
+    return 'quizzes' if fields == list(CATALOG_FIELDS) else f"quizzes?fields={','.join(fields)}"
+
 @gamification_bp.route('/quizzes', methods=['GET'])
 @jwt_required()
+@cached_response(quiz_list_cache_key)
 def get_quizzes():
-    quizzes = Quiz.query.all()
-    # Serialize and hide correct answers
-    result = []
-    for q in quizzes:
-        questions = q.questions
-        # If questions is a list of dicts, map over it. 
-        # Note: SQLAlchemy JSONB returns python list/dict.
-        sanitized_questions = []
-        for question in questions:
-            sanitized_questions.append({
-                'id': question['id'],
-                'text': question['text'],
-                'options': question['options']
-            })
-            
-        result.append({
-            'id': q.id,
-            'title': q.title,
-            'description': q.description,
-            'timeLimit': q.time_limit,
-            'points_reward': q.points_reward,
-            'questions': sanitized_questions
-        })
-    return jsonify(result)
+    """
+    The quiz catalog. ?view=summary drops questions for a question count;
+    ?fields=id,title,... picks any of QUIZ_FIELDS.
+    """
+    try:
+        fields = quiz_list_fields()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # Display columns only; answer keys are never loaded here
+    return jsonify(load_quiz_list(fields))
+
+@gamification_bp.route('/quizzes/search', methods=['GET'])
+@jwt_required()
+def search_quizzes_view():
+    """
+    Ranked quiz summaries matching ?q= in title, description or question
+    text. Paginated with ?page= and ?per_page= (at most 50).
+    """
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'Search query required'}), 400
+    if len(query) > MAX_QUERY_LENGTH:
+        return jsonify({'error': f'Search query is limited to {MAX_QUERY_LENGTH} characters'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 50)
+
+    hits = search_quizzes(query)
+    page_hits = hits[(page - 1) * per_page:page * per_page]
+    quizzes = {}
+    if page_hits:
+        rows = db.session.execute(
+            select(*[QUIZ_COLUMNS[f] for f in SUMMARY_FIELDS]).where(Quiz.id.in_([q for q, _ in page_hits]))
+        )
+        quizzes = {row[0]: dict(zip(SUMMARY_FIELDS, row)) for row in rows}
+
+    return jsonify({
+        'quizzes': [{**quizzes[quiz_id], 'rank': round(rank, 4)}
+                    for quiz_id, rank in page_hits if quiz_id in quizzes],
+        'total': len(hits),
+        'page': page,
+        'per_page': per_page,
+        'pages': -(-len(hits) // per_page)
+    })
 
 @gamification_bp.route('/quizzes/<quiz_id>', methods=['GET'])
 @jwt_required()
+@cached_response(lambda quiz_id: f'quiz:{quiz_id}')
 def get_quiz(quiz_id):
-    quiz = Quiz.query.get(quiz_id)
-    if not quiz:
+    catalog = load_catalog(quiz_id)
+    if not catalog:
         return jsonify({'error': 'Quiz not found'}), 404
     
-    # Hide correct answers
-    sanitized_questions = []
-    for question in quiz.questions:
-        sanitized_questions.append({
-            'id': question['id'],
-            'text': question['text'],
-            'options': question['options']
-        })
-    
-    return jsonify({
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'timeLimit': quiz.time_limit,
-        'points_reward': quiz.points_reward,
-        'questions': sanitized_questions
-    })
+    return jsonify(catalog[0])
 
 @gamification_bp.route('/quizzes/<quiz_id>/submit', methods=['POST'])
 @jwt_required()
@@ -72,43 +100,52 @@ def submit_quiz(quiz_id):
         return jsonify({'error': 'Quiz not found'}), 404
     
     data = request.get_json()
-    answers = data.get('answers', {})  # { questionId: selectedOptionId }
+    # { questionId: selectedOptionId }; ids are stored as strings
+    answers = {str(k): str(v) for k, v in data.get('answers', {}).items() if v is not None}
+    questions = load_graded_questions(quiz_id)
+    if not questions:
+        return jsonify({'error': 'Quiz has no questions'}), 400
     
-    # Calculate score
-    correct_count = 0
-    for question in quiz.questions:
-        q_id = question['id']
-        correct_opt = question['correctOptionId']
-        user_opt = answers.get(q_id)
-        if user_opt == correct_opt:
-            correct_count += 1
+    # Calculate score and points
+    correct_count, points_awarded = grade_quiz(questions, answers, quiz.points_reward)
+    total_questions = len(questions)
     
-    # Award points
-    total_questions = len(quiz.questions)
-    if correct_count == total_questions:
-        points_awarded = quiz.points_reward
-    else:
-        points_awarded = int((correct_count / total_questions) * quiz.points_reward)
-    
-    # Update user gamification data
-    user.gamification['points'] = user.gamification.get('points', 0) + points_awarded
-    
-    # Award badge if 100% correct
-    if correct_count == total_questions and quiz_id not in user.gamification.get('badges', []):
-        user.gamification.setdefault('badges', []).append(quiz_id)
-        
-    # CRITICAL: Mark field as modified so SQLAlchemy persists the change
-    flag_modified(user, 'gamification')
+    # Update user gamification data: a single-column increment, safe under concurrent submits
+    User.query.filter_by(id=user.id).update(
+        {User.points: User.points + points_awarded}, synchronize_session=False
+    )
     
-    # Update or Create Progress Record
-    from models import UserProgress
-    progress = UserProgress.query.filter_by(user_id=current_user_id, quiz_id=quiz_id).first()
-    if not progress:
-        progress = UserProgress(user_id=current_user_id, quiz_id=quiz_id)
-        db.session.add(progress)
+    # Award badge if 100% correct (no-op if already awarded)
+    if correct_count == total_questions:
+        upsert(db.session, UserBadge, {'user_id': user.id, 'badge_id': quiz_id}, ['user_id', 'badge_id'])
     
-    progress.status = 'completed'
-    db.session.commit()
+    # Update or Create Progress Record, folding in any buffered heartbeat and
+    # crediting the time since the last one
+    now = datetime.utcnow()
+    idle_seconds = current_app.config['PROGRESS_IDLE_SECONDS']
+    completion = {'status': 'completed', 'last_activity': now}
+    dialect_name = db.session.get_bind().dialect.name
+    pending = progress_buffer.complete(current_user_id, quiz_id, now)
+    if pending is not None:
+        if pending.dirty:
+            completion['current_question_index'] = pending.index
+        inserted = pending.seconds + credit_seconds((now - pending.last_activity).total_seconds(), idle_seconds)
+        # Other workers may already have credited part of this span
+        increment = capped_credit(inserted, now, dialect_name)
+    else:
+        increment = credit_expression(now, dialect_name, idle_seconds)
+        inserted = 0
+    time_spent = upsert(
+        db.session, UserProgress,
+        {'user_id': current_user_id, 'quiz_id': quiz_id, **completion,
+         'active_seconds': inserted, 'total_seconds': inserted},
+        ['user_id', 'quiz_id'],
+        update={**completion, **add_active_time(increment)},
+        returning=[UserProgress.active_seconds]
+    ).scalar_one()
+    # The attempt's time moves to its result; the next attempt starts from zero
+    UserProgress.query.filter_by(user_id=current_user_id, quiz_id=quiz_id)\
+        .update({UserProgress.active_seconds: 0}, synchronize_session=False)
     
     # Save result
     result = Result(
@@ -116,40 +153,37 @@ def submit_quiz(quiz_id):
         quiz_id=quiz_id,
         score=points_awarded,
         correct_count=correct_count,
-        total_questions=total_questions
+        total_questions=total_questions,
+        time_spent=time_spent
     )
     db.session.add(result)
+    invalidate_on_commit('leaderboard')
     db.session.commit()
+    badges = [badge.badge_id for badge in user.badges]
+    
+    # Push to open /api/stream connections: one leaderboard query for all watchers
+    if len(event_broker):
+        version = response_cache.generation
+        event_broker.publish_leaderboard(leaderboard_entries(), version)
+        event_broker.publish('progress', {
+            'quizId': quiz_id,
+            'score': points_awarded,
+            'correctCount': correct_count,
+            'totalQuestions': total_questions,
+            'totalPoints': user.points,
+            'badges': badges
+        }, user_id=str(user.id))
     
     # Prepare detailed feedback
-    feedback = []
-    for question in quiz.questions:
-        q_id = question['id']
-        correct_opt = question['correctOptionId']
-        user_opt = answers.get(q_id)
-        is_correct = (user_opt == correct_opt)
-        
-        # Find option texts
-        user_opt_text = next((o['text'] for o in question['options'] if o['id'] == user_opt), "No Answer")
-        correct_opt_text = next((o['text'] for o in question['options'] if o['id'] == correct_opt), "Unknown")
-
-        feedback.append({
-            'questionId': q_id,
-            'questionText': question['text'],
-            'userOptionId': user_opt,
-            'userOptionText': user_opt_text,
-            'correctOptionId': correct_opt,
-            'correctOptionText': correct_opt_text,
-            'isCorrect': is_correct,
-            'explanation': question.get('explanation', 'No explanation provided.')
-        })
+    feedback = build_feedback(questions, answers)
 
     return jsonify({
         'message': 'Quiz submitted',
         'score': points_awarded,
         'correctCount': correct_count,
-        'totalQuestions': len(quiz.questions),
-        'badges': user.gamification['badges'],
+        'totalQuestions': total_questions,
+        'timeSpent': time_spent,
+        'badges': badges,
         'feedback': feedback
     })
 
@@ -163,150 +197,209 @@ def start_quiz_progress():
     
     if not quiz_id:
         return jsonify({'error': 'Quiz ID required'}), 400
-        
-    from models import UserProgress
-    progress = UserProgress.query.filter_by(user_id=current_user_id, quiz_id=quiz_id).first()
     
-    if not progress:
-        progress = UserProgress(
-            user_id=current_user_id, 
-            quiz_id=quiz_id, 
-            status='started',
-            current_question_index=current_index
-        )
-        db.session.add(progress)
-        db.session.commit()
-    elif progress.status == 'completed':
-        progress.last_activity = datetime.utcnow()
-        progress.current_question_index = current_index
-        db.session.commit()
-    else:
-        progress.status = 'in-progress'
-        progress.current_question_index = current_index
-        progress.last_activity = datetime.utcnow()
-        db.session.commit()
+    # Heartbeats for an attempt this worker already wrote are coalesced in memory
+    now = datetime.utcnow()
+    idle_seconds = current_app.config['PROGRESS_IDLE_SECONDS']
+    status = progress_buffer.record(current_user_id, quiz_id, current_index, now, idle_seconds)
+    if status is not None:
+        return jsonify({'message': 'Progress updated', 'status': status, 'currentIndex': current_index})
+        
+    # New rows start as 'started'; existing ones move to 'in-progress' unless already completed
+    progress = upsert(
+        db.session, UserProgress,
+        {'user_id': current_user_id, 'quiz_id': quiz_id, 'status': 'started',
+         'current_question_index': current_index, 'last_activity': now},
+        ['user_id', 'quiz_id'],
+        update=lambda excluded: {
+            'status': case((UserProgress.status == 'completed', 'completed'), else_='in-progress'),
+            'current_question_index': excluded.current_question_index,
+            'last_activity': excluded.last_activity,
+            **add_active_time(credit_expression(excluded.last_activity, db.session.get_bind().dialect.name,
+                                                idle_seconds))
+        },
+        returning=[UserProgress.status, UserProgress.current_question_index]
+    ).one()
+    db.session.commit()
+    progress_buffer.remember(current_user_id, quiz_id, progress.status, progress.current_question_index, now)
         
     return jsonify({'message': 'Progress updated', 'status': progress.status, 'currentIndex': progress.current_question_index})
 
 @gamification_bp.route('/leaderboard', methods=['GET'])
 @jwt_required()
+@cached_response('leaderboard')
 def get_leaderboard():
-    users = User.query.all()
-    leaderboard = []
-    for user in users:
-        from uuid import UUID
-        gamification = user.gamification or {}
-        points = gamification.get('points', 0)
-        
-        # Robustness: If points are 0, check results table just in case
-        if points == 0:
-            from sqlalchemy import func
-            res_sum = db.session.query(func.sum(Result.score)).filter(Result.user_id == user.id).scalar() or 0
-            points = int(res_sum)
-            
-        leaderboard.append({
-            'email': user.email,
-            'name': user.name,
-            'points': points if points > 0 else gamification.get('points', 0),
-            'badges': len(gamification.get('badges', []))
-        })
-    
-    # Sort by points descending
-    leaderboard.sort(key=lambda x: x['points'], reverse=True)
-    
-    # Return top 10
-    return jsonify(leaderboard[:10])
+    return jsonify(leaderboard_entries())
+
+def leaderboard_entries(limit=10):
+    """Top users by points, served from the ix_users_points index"""
+    users = User.query.order_by(desc(User.points)).limit(limit).all()
+
+    # Badge counts for just those users in one grouped query
+    badge_counts = {}
+    if users:
+        badge_counts = dict(
+            db.session.query(UserBadge.user_id, func.count(UserBadge.badge_id))
+            .filter(UserBadge.user_id.in_([u.id for u in users]))
+            .group_by(UserBadge.user_id)
+            .all()
+        )
+
+    return [{
+        'email': user.email,
+        'name': user.name,
+        'points': user.points,
+        'badges': badge_counts.get(user.id, 0)
+    } for user in users]
 
 @gamification_bp.route('/progress', methods=['GET'])
 @jwt_required()
 def get_user_progress():
     """Get detailed progress data for the current user"""
-    from uuid import UUID
-    identity = get_jwt_identity()
-    try:
-        current_user_id = UUID(str(identity)) if not isinstance(identity, UUID) else identity
-    except:
-        current_user_id = identity
-
-    user = User.query.get(current_user_id)
+    user = load_current_user()
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    # Get all quizzes
-    all_quizzes = Quiz.query.all()
+    return jsonify(progress_payload(user, load_quizzes()))
+
+DASHBOARD_SECTIONS = ('me', 'progress', 'quizzes', 'leaderboard')
+
+@gamification_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """
+    /auth/me, /progress, a quiz summary list and /leaderboard in one response,
+    built from one user load and one quiz load. Pick sections with
+    ?include=me,progress (default: all).
+    """
+    include = request.args.get('include')
+    sections = [s.strip() for s in include.split(',') if s.strip()] if include else list(DASHBOARD_SECTIONS)
+    unknown = sorted(set(sections) - set(DASHBOARD_SECTIONS))
+    if unknown:
+        return jsonify({'error': f"Unknown sections: {', '.join(unknown)}",
+                        'sections': list(DASHBOARD_SECTIONS)}), 400
+    
+    payload = {}
+    if 'me' in sections or 'progress' in sections:
+        user = load_current_user()
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+    quizzes = load_quizzes() if 'progress' in sections or 'quizzes' in sections else []
+    
+    if 'me' in sections:
+        payload['me'] = profile_payload(user)
+    if 'progress' in sections:
+        payload['progress'] = progress_payload(user, quizzes)
+    if 'quizzes' in sections:
+        payload['quizzes'] = [quiz_summary(quiz) for quiz in quizzes]
+    if 'leaderboard' in sections:
+        payload['leaderboard'] = cached_payload('leaderboard', leaderboard_entries)
+    return jsonify(payload)
+
+def load_current_user():
+    """The JWT user with badges joined in (one query), or None"""
+    identity = get_jwt_identity()
+    try:
+        user_id = identity if isinstance(identity, UUID) else UUID(str(identity))
+    except (TypeError, ValueError):
+        user_id = identity
+    return db.session.get(User, user_id, options=[joinedload(User.badges)])
+
+def load_quizzes():
+    """All quizzes with their question counts (one query)"""
+    return Quiz.query.options(undefer(Quiz.question_count)).order_by(*QUIZ_ORDER).all()
+
+def quiz_summary(quiz):
+    return {
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'timeLimit': quiz.time_limit,
+        'points_reward': quiz.points_reward,
+        'questionCount': quiz.question_count
+    }
+
+def progress_payload(user, all_quizzes):
+    """The /progress body for ``user`` given every quiz (from load_quizzes)"""
+    current_user_id = user.id
     total_quizzes = len(all_quizzes)
+    quizzes_by_id = {quiz.id: quiz for quiz in all_quizzes}
     
-    # Get user's results
-    user_results = Result.query.filter_by(user_id=current_user_id).all()
+    # Get user's results (newest first, reused for stats and recent activity)
+    user_results = Result.query.filter_by(user_id=current_user_id)\
+        .order_by(desc(Result.completed_at)).all()
+    # Older results are compacted into one summary row per quiz
+    summaries = ResultSummary.query.filter_by(user_id=current_user_id)\
+        .order_by(desc(ResultSummary.last_completed_at)).all()
     completed_quiz_ids = set(result.quiz_id for result in user_results)
+    completed_quiz_ids.update(summary.quiz_id for summary in summaries)
+    attempts = len(user_results) + sum(summary.attempts for summary in summaries)
+    total_score = sum(result.score for result in user_results) + sum(summary.total_score for summary in summaries)
     
-    # Sync: If user has badges in JSON but no result record, consider it completed for percentage
-    gamification = user.gamification or {}
-    badge_ids = gamification.get('badges', [])
+    # Sync: If user has badges but no result record, consider it completed for percentage
+    badge_ids = [badge.badge_id for badge in user.badges]
     for bid in badge_ids:
         completed_quiz_ids.add(bid)
         
     completed_count = len(completed_quiz_ids)
     
     # Get "In Progress" quizzes
-    from models import UserProgress
     progress_records = UserProgress.query.filter_by(user_id=current_user_id).all()
+    # Heartbeats this worker hasn't flushed yet
+    pending = progress_buffer.pending_for(current_user_id)
     in_progress_list = []
     
     for record in progress_records:
         if record.status in ['started', 'in-progress']:
             # Verify quiz exists
-            quiz = Quiz.query.get(record.quiz_id)
+            quiz = quizzes_by_id.get(record.quiz_id)
             if quiz:
+                current_index, last_activity, _ = pending.get(
+                    record.quiz_id, (record.current_question_index, record.last_activity, 0))
                 in_progress_list.append({
                     'quizId': quiz.id,
                     'quizTitle': quiz.title,
                     'status': record.status,
-                    'currentIndex': record.current_question_index,
-                    'totalQuestions': len(quiz.questions),
-                    'lastActivity': record.last_activity.isoformat() if record.last_activity else None
+                    'currentIndex': current_index,
+                    'totalQuestions': quiz.question_count,
+                    'lastActivity': last_activity
                 })
     
     # Sort by last activity to show most recent first
-    in_progress_list.sort(key=lambda x: x['lastActivity'] or '', reverse=True)
+    in_progress_list.sort(key=lambda x: x['lastActivity'] or datetime.min, reverse=True)
     
     # Limit to 4 most recent items for UI balance
     in_progress_list = in_progress_list[:4]
     
     # Calculate average score
-    if user_results:
-        total_score = sum(result.score for result in user_results)
-        avg_score = total_score / len(user_results)
-    else:
-        avg_score = 0
+    avg_score = total_score / attempts if attempts else 0
     
-    # Calculate total time spent (estimate based on quiz completion)
-    total_time_spent = len(user_results) * 180  # Rough estimate
+    # Active seconds across all attempts, including heartbeats not flushed yet
+    total_time_spent = sum(record.total_seconds for record in progress_records)
+    total_time_spent += sum(seconds for _, _, seconds in pending.values())
     
-    # Get recent activity (last 5 quizzes)
-    recent_results = Result.query.filter_by(user_id=current_user_id)\
-        .order_by(desc(Result.completed_at))\
-        .limit(5).all()
+    # Get recent activity (last 5 quizzes), falling back to summarized attempts
+    recent_results = [(r.quiz_id, r.score, r.completed_at, r.time_spent) for r in user_results[:5]]
+    recent_results += [(summary.quiz_id, summary.last_score, summary.last_completed_at, summary.last_time_spent)
+                       for summary in summaries[:5 - len(recent_results)]]
     
     recent_activity = []
-    for result in recent_results:
-        quiz = Quiz.query.get(result.quiz_id)
+    for quiz_id, score, completed_at, time_spent in recent_results:
+        quiz = quizzes_by_id.get(quiz_id)
         if quiz:
             recent_activity.append({
                 'quizTitle': quiz.title,
-                'score': result.score,
-                'completedAt': result.completed_at.isoformat() if result.completed_at else None,
-                'timeSpent': 180  # Placeholder
+                'score': score,
+                'completedAt': completed_at,
+                'timeSpent': time_spent
             })
     
     # Resolve Badges
-    gamification = user.gamification or {}
-    badge_ids = gamification.get('badges', [])
     earned_badges = []
     for bid in badge_ids:
         # Assuming badge ID corresponds to Quiz ID for now
-        quiz = Quiz.query.get(bid)
+        quiz = quizzes_by_id.get(bid)
         if quiz:
             earned_badges.append({
                 'id': bid,
@@ -321,25 +414,22 @@ def get_user_progress():
             })
 
 
-    # Calculate total points (Robustly: Sum of all results)
-    from sqlalchemy import func
-    total_points_sum = db.session.query(func.sum(Result.score)).filter(Result.user_id == current_user_id).scalar() or 0
-    total_points = int(total_points_sum)
+    # Calculate total points (Robustly: Sum of all results, raw and summarized)
+    total_points = total_score
     
     # Completion percentage
     completion_percentage = (completed_count / total_quizzes * 100) if total_quizzes > 0 else 0
     
-    return jsonify({
+    return {
         'totalQuizzes': total_quizzes,
         'completedQuizzes': completed_count,
         'completionPercentage': round(completion_percentage, 1),
         'averageScore': round(avg_score, 1),
         'totalTimeSpent': total_time_spent,
-        'totalPoints': total_points if total_points > 0 else gamification.get('points', 0),
+        'totalPoints': total_points if total_points > 0 else user.points,
         'totalBadges': len(badge_ids),
         'earnedBadges': earned_badges, 
-        'level': gamification.get('level', 1),
+        'level': user.level,
         'recentActivity': recent_activity,
         'inProgress': in_progress_list
-    })
-
+    }
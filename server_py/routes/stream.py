@@ -0,0 +1,60 @@
+from flask import Blueprint, Response, current_app, jsonify
+from flask_jwt_extended import get_jwt_identity, jwt_required
+import time
+from routes.gamification import leaderboard_entries
+from utils.cache import cached_payload, response_cache
+from utils.events import event_broker, format_sse
+
+stream_bp = Blueprint('stream', __name__)
+
+@stream_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])  # EventSource can't send headers: ?jwt=<token>
+def stream():
+    """
+    Server-Sent Events for live dashboards.
+
+    Events: `leaderboard` (full top 10 on connect), `leaderboard-delta`
+    ({'size', 'changes': [{'rank', ...entry}]} after each submit), `progress`
+    (the current user's own submits) and `resync` (the client fell behind
+    and should refetch). Comment heartbeats keep proxies from timing out.
+    Streams end after STREAM_MAX_SECONDS; EventSource reconnects on its own,
+    which also spreads clients across workers and lets restarts drain.
+    """
+    config = current_app.config
+    if len(event_broker) >= config['STREAM_MAX_CLIENTS']:
+        return jsonify({'error': 'Too many open streams, retry later'}), 503
+
+    # The shared cache entry is evicted on every worker when points change, so
+    # this also catches submits and admin edits made elsewhere; publishing it
+    # first brings this worker's open streams up to date as well
+    version = response_cache.generation
+    board = cached_payload('leaderboard', leaderboard_entries)
+    event_broker.publish_leaderboard(board, version)
+    subscription = event_broker.subscribe(str(get_jwt_identity()), config['STREAM_QUEUE_SIZE'])
+    # Read after subscribing: a newer board than ours may have won, and any
+    # delta racing this read repeats changes the snapshot already has
+    snapshot = event_broker.leaderboard_snapshot() or board
+    heartbeat = config['STREAM_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + config['STREAM_MAX_SECONDS']
+
+    # Runs after the request context (and its DB session) is gone
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield format_sse('leaderboard', snapshot)
+            while not subscription.closed and time.monotonic() < deadline:
+                frame = subscription.get(timeout=heartbeat)
+                if subscription.overflowed:
+                    subscription.drain()
+                    yield format_sse('resync', {})
+                elif frame is not None:
+                    yield frame
+                elif not subscription.closed:
+                    yield ': heartbeat\n\n'
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+    return response
@@ -1,14 +1,13 @@
 from app import create_app, db
-from models import Quiz
+from utils.quiz_bundle import import_documents
+import migrations
 
 app = create_app()
 
 def seed():
     with app.app_context():
-        # Clear existing quizzes
-        Quiz.query.delete()
-        db.session.commit()
-        print("Existing quizzes cleared.")
+        # Make sure the schema exists before seeding
+        migrations.upgrade(db.engine)
 
         quizzes = [
             {
@@ -571,19 +570,14 @@ def seed():
             }
         ]
 
-        for q_data in quizzes:
-            quiz = Quiz(
-                id=q_data['id'],
-                title=q_data['title'],
-                description=q_data['description'],
-                time_limit=q_data['time_limit'],
-                points_reward=q_data['points_reward'],
-                questions=q_data['questions']
-            )
-            db.session.add(quiz)
-        
-        db.session.commit()
-        print(f"Successfully seeded {len(quizzes)} quizzes!")
+        # Same upsert as a bundle import: unchanged quizzes are left alone,
+        # and quizzes added through the admin UI are kept
+        report = import_documents({'data': quiz} for quiz in quizzes)
+        for item in report['quizzes']:
+            if item['status'] == 'error':
+                print(f"Skipped {item['id']}: {item['message']}")
+        print(f"Seeded {len(quizzes)} quizzes: {report['created']} created, "
+              f"{report['updated']} updated, {report['unchanged']} unchanged.")
 
 if __name__ == '__main__':
     seed()
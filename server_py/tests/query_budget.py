@@ -0,0 +1,77 @@
+"""
+Query counting helpers for tests.
+
+    with QueryRecorder(db.engine) as queries:
+        self.client.get('/api/progress', headers=headers)
+    self.assertLessEqual(queries.count, 5)
+
+or, via QueryBudgetMixin on a TestCase:
+
+    response = self.assertQueryBudget(5, 'get', '/api/progress', headers=headers)
+"""
+
+import os
+import sys
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from utils.slow_query import normalize_statement
+
+# Statements that legitimately repeat inside one request
+IGNORED_PREFIXES = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryRecorder:
+    """Capture every SQL statement executed on ``engine`` while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(IGNORED_PREFIXES):
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def repeated_shapes(self, allowed=1):
+        """Statement shapes executed more than ``allowed`` times (likely N+1 loops)"""
+        shapes = Counter(normalize_statement(s) for s in self.statements)
+        return {shape: n for shape, n in shapes.items() if n > allowed}
+
+    def report(self):
+        return '\n'.join(f'  {i + 1}. {normalize_statement(s)}' for i, s in enumerate(self.statements))
+
+
+class QueryBudgetMixin:
+    """TestCase mixin; expects ``self.client`` and ``db`` bound to the app under test"""
+
+    def assertQueryBudget(self, max_queries, method, url, allowed_repeats=1, **kwargs):
+        from extensions import db
+
+        with QueryRecorder(db.engine) as queries:
+            response = getattr(self.client, method)(url, **kwargs)
+
+        if queries.count > max_queries:
+            self.fail(f'{method.upper()} {url} ran {queries.count} queries '
+                      f'(budget {max_queries}):\n{queries.report()}')
+
+        repeated = queries.repeated_shapes(allowed_repeats)
+        if repeated:
+            details = '\n'.join(f'  {n}x {shape}' for shape, n in repeated.items())
+            self.fail(f'{method.upper()} {url} repeated statements (possible N+1):\n{details}')
+
+        return response
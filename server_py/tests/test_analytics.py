@@ -0,0 +1,41 @@
+import unittest
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analytics import badge_distribution, fill_growth_series
+
+class TestFillGrowthSeries(unittest.TestCase):
+
+    def test_cumulative_with_empty_days(self):
+        series = fill_growth_series({'2026-01-01': 2, '2026-01-03': 1},
+                                    datetime(2026, 1, 1, 15), datetime(2026, 1, 3, 9), base_count=10)
+
+        self.assertEqual(series, [
+            {'date': '2026-01-01', 'users': 12, 'newUsers': 2},
+            {'date': '2026-01-02', 'users': 12, 'newUsers': 0},
+            {'date': '2026-01-03', 'users': 13, 'newUsers': 1}
+        ])
+
+    def test_single_day_and_reversed_range(self):
+        day = datetime(2026, 1, 1)
+        self.assertEqual(fill_growth_series({}, day, day, 4), [{'date': '2026-01-01', 'users': 4, 'newUsers': 0}])
+        self.assertEqual(fill_growth_series({}, day, datetime(2025, 12, 31), 4), [])
+
+class TestBadgeDistribution(unittest.TestCase):
+
+    def test_buckets_three_or_more_together(self):
+        self.assertEqual(badge_distribution([0, 1, 1, 2, 3, 7]), [
+            {'name': '0 Badges', 'value': 1},
+            {'name': '1 Badge', 'value': 2},
+            {'name': '2 Badges', 'value': 1},
+            {'name': '3+ Badges', 'value': 2}
+        ])
+
+    def test_no_users(self):
+        self.assertEqual([bucket['value'] for bucket in badge_distribution([])], [0, 0, 0, 0])
+
+if __name__ == '__main__':
+    unittest.main()
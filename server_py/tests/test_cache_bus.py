@@ -0,0 +1,215 @@
+import unittest
+import os
+import socket
+import sys
+import time
+from collections import namedtuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import Quiz
+from utils.cache import ResponseCache, response_cache
+from utils.cache_bus import CacheBus, cache_bus, invalidate_on_commit
+
+Notify = namedtuple('Notify', 'pid channel payload')
+
+class FakeListenConnection:
+    """psycopg2-shaped connection fed through a socketpair"""
+
+    def __init__(self):
+        self.reader, self.writer = socket.socketpair()
+        self.notifies = []
+        self.executed = []
+        self.autocommit = False
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def cursor(self):
+        connection = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql):
+                connection.executed.append(sql)
+
+        return Cursor()
+
+    def send(self, payload):
+        self.writer.send(payload.encode() + b'\n')
+
+    def poll(self):
+        data = self.reader.recv(65536)
+        if not data:
+            raise OSError('server closed the connection')
+        self.notifies.extend(Notify(1, 'cache_invalidate', line) for line in data.decode().splitlines())
+
+    def close(self):
+        self.reader.close()
+        self.writer.close()
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+class TestCacheBus(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache()
+        self.bus = CacheBus(self.cache)
+
+    def tearDown(self):
+        self.bus.stop()
+
+    def test_live_cache_keeps_entries_until_the_longer_ttl(self):
+        self.cache.set('quizzes', b'[]', 'application/json', ttl=0, live_ttl=60)
+        self.assertIsNone(self.cache.get('quizzes'))
+
+        self.cache.set('quizzes', b'[]', 'application/json', ttl=0, live_ttl=60)
+        self.cache.live = True
+        self.assertIsNotNone(self.cache.get('quizzes'))
+        self.cache.live = False
+        self.assertIsNone(self.cache.get('quizzes'))
+
+    def test_body_built_across_an_invalidation_is_not_stored(self):
+        generation = self.cache.generation
+        self.bus.handle(CacheBus(self.cache).payload({'leaderboard'}, set()))  # another worker's write
+
+        self.cache.set('leaderboard', b'stale', 'application/json', ttl=60, generation=generation)
+        self.assertIsNone(self.cache.get('leaderboard'))
+        self.cache.set('leaderboard', b'fresh', 'application/json', ttl=60, generation=self.cache.generation)
+        self.assertEqual(self.cache.get('leaderboard').body, b'fresh')
+
+    def test_handle_evicts_keys_and_prefixes_but_skips_own_messages(self):
+        for key in ('quizzes', 'quiz:1', 'quiz:2', 'leaderboard'):
+            self.cache.set(key, b'{}', 'application/json', ttl=60)
+
+        self.bus.handle(self.bus.payload({'quizzes'}, {'quiz:'}))
+        self.assertIsNotNone(self.cache.get('quizzes'))
+
+        other = CacheBus(self.cache)
+        self.bus.handle(other.payload({'quizzes'}, {'quiz:'}))
+        self.assertIsNone(self.cache.get('quizzes'))
+        self.assertIsNone(self.cache.get('quiz:2'))
+        self.assertIsNotNone(self.cache.get('leaderboard'))
+        self.assertEqual(self.bus.received, 1)
+
+    def test_oversized_payload_clears_everything(self):
+        self.cache.set('leaderboard', b'{}', 'application/json', ttl=60)
+        payload = self.bus.payload({f'quiz:{i}' for i in range(2000)}, set())
+
+        CacheBus(self.cache).handle(payload)
+        self.assertIsNone(self.cache.get('leaderboard'))
+
+    def test_listener_applies_notifications_and_falls_back_on_disconnect(self):
+        connection = FakeListenConnection()
+        self.cache.set('leaderboard', b'{}', 'application/json', ttl=60)
+        self.bus.start(lambda: connection, poll_seconds=0.05)
+
+        self.assertTrue(wait_for(lambda: self.bus.connected))
+        self.assertIn('LISTEN cache_invalidate', connection.executed)
+        self.assertIsNone(self.cache.get('leaderboard'), 'cache is cleared on connect')
+
+        self.cache.set('quizzes', b'[]', 'application/json', ttl=60)
+        connection.send(CacheBus(self.cache).payload({'quizzes'}, set()))
+        self.assertTrue(wait_for(lambda: self.cache.get('quizzes') is None))
+
+        connection.writer.close()
+        self.assertTrue(wait_for(lambda: not self.bus.connected))
+
+class TestInvalidateOnCommit(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+        response_cache.set('quizzes', b'[]', 'application/json', ttl=60)
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_evicts_after_commit_only(self):
+        self.assertFalse(cache_bus.enabled)
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        invalidate_on_commit('quizzes')
+        self.assertIsNotNone(response_cache.get('quizzes'))
+
+        db.session.commit()
+        self.assertIsNone(response_cache.get('quizzes'))
+
+    def test_rollback_discards_pending_keys(self):
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        invalidate_on_commit('quizzes')
+        db.session.rollback()
+        db.session.commit()
+        self.assertIsNotNone(response_cache.get('quizzes'))
+
+class TestExternalPooler(unittest.TestCase):
+
+    def tearDown(self):
+        for name in ('DB_EXTERNAL_POOLER', 'CACHE_BUS_DATABASE_URL'):
+            os.environ.pop(name, None)
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        create_app()  # leave the shared bus disabled for the other tests
+
+    def test_bus_stays_off_behind_a_transaction_pooler(self):
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'postgresql+psycopg2://app@pgbouncer:6432/enableu'
+        os.environ['DB_EXTERNAL_POOLER'] = 'pgbouncer'
+        create_app()
+        self.assertFalse(cache_bus.enabled)
+
+        os.environ['CACHE_BUS_DATABASE_URL'] = 'postgresql+psycopg2://app@db:5432/enableu'
+        create_app()
+        self.assertTrue(cache_bus.enabled)
+
+@unittest.skipUnless(os.getenv('TEST_DATABASE_URL', '').startswith('postgresql'),
+                     'set TEST_DATABASE_URL to a PostgreSQL database')
+class TestPostgresNotify(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['SQLALCHEMY_DATABASE_URI'] = os.environ['TEST_DATABASE_URL']
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+        self.app = create_app()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.listener = CacheBus(response_cache)
+        response_cache.clear()
+
+    def tearDown(self):
+        self.listener.stop()
+        response_cache.clear()
+        db.session.remove()
+        self.app_context.pop()
+
+    def test_commit_reaches_another_listener(self):
+        from utils.cache_bus import _connect
+        from sqlalchemy.engine import make_url
+        self.listener.start(lambda: _connect(make_url(os.environ['TEST_DATABASE_URL'])), poll_seconds=0.1)
+        self.assertTrue(wait_for(lambda: self.listener.connected, timeout=5))
+
+        db.session.execute(db.select(db.literal(1)))
+        invalidate_on_commit('leaderboard')
+        db.session.commit()
+
+        self.assertTrue(wait_for(lambda: self.listener.received == 1, timeout=5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import gzip
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from utils.cache import cached_response, response_cache
+from utils.compression import init_compression
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = 0
+        self.app = Flask(__name__)
+        self.app.config['COMPRESS_MIN_SIZE'] = 500
+        init_compression(self.app)
+        response_cache.clear()
+
+        @self.app.route('/big')
+        def big():
+            return jsonify([{'text': 'accessible content'} for _ in range(100)])
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+
+        @self.app.route('/cached')
+        @cached_response('test:cached')
+        def cached():
+            self.calls += 1
+            return jsonify([{'text': 'leaderboard row'} for _ in range(100)])
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        response_cache.clear()
+
+    def test_large_response_is_gzipped(self):
+        response = self.client.get('/big', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertIn(b'accessible content', gzip.decompress(response.get_data()))
+
+    def test_small_response_is_not_compressed(self):
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_identity_when_client_does_not_accept(self):
+        response = self.client.get('/big')
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_cached_response_is_compressed_once(self):
+        first = self.client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+        second = self.client.get('/cached', headers={'Accept-Encoding': 'gzip'})
+        plain = self.client.get('/cached')
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(gzip.decompress(second.get_data()), plain.get_data())
+        self.assertEqual(list(response_cache.get('test:cached').variants), ['gzip'])
+
+if __name__ == '__main__':
+    unittest.main()
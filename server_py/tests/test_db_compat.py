@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User, UserBadge
+from werkzeug.security import generate_password_hash
+
+class TestSQLitePortability(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.password = 'PortablePassword123!'
+        self.admin = User(email='admin@test.com', password_hash=generate_password_hash(self.password), role='admin')
+        db.session.add(self.admin)
+        for i in range(3):
+            db.session.add(User(
+                email=f'student{i}@test.com',
+                password_hash='x',
+                points=i * 10,
+                badges=[UserBadge(badge_id=f'quiz-{b}') for b in range(i)],
+                created_at=datetime.utcnow() - timedelta(days=i)
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_guid_accepts_strings_and_returns_uuids(self):
+        user = db.session.get(User, str(self.admin.id))
+        self.assertIsInstance(user.id, uuid.UUID)
+        self.assertEqual(user.id, self.admin.id)
+
+    def test_analytics_runs_on_sqlite(self):
+        response = self.client.post('/api/auth/login', json={'email': 'admin@test.com', 'password': self.password})
+        headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+        response = self.client.get('/api/admin/analytics', headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['active_users'], 2)
+        self.assertEqual(response.json['total_points'], 30)
+        self.assertEqual(response.json['growth_trends'][-1]['users'], 4)
+        badges = {b['name']: b['value'] for b in response.json['badge_distribution']}
+        self.assertEqual(badges, {'0 Badges': 2, '1 Badge': 1, '2 Badges': 1, '3+ Badges': 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import json
+from app import create_app
+from extensions import db
+from models import User, Quiz
+from utils.cache import response_cache
+from utils.events import EventBroker, event_broker, format_sse
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'Question 1', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'a'}
+]
+
+def parse_frame(frame):
+    fields = dict(line.split(': ', 1) for line in frame.strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+class TestEventBroker(unittest.TestCase):
+
+    def test_publish_fans_out_and_filters_by_user(self):
+        broker = EventBroker()
+        alice = broker.subscribe('alice')
+        bob = broker.subscribe('bob')
+
+        self.assertEqual(broker.publish('ping', {'n': 1}), 2)
+        self.assertEqual(broker.publish('progress', {'n': 2}, user_id='bob'), 1)
+
+        self.assertEqual(alice.get(0), format_sse('ping', {'n': 1}))
+        self.assertIsNone(alice.get(0))
+        self.assertEqual(parse_frame(bob.get(0)), ('ping', {'n': 1}))
+        self.assertEqual(parse_frame(bob.get(0)), ('progress', {'n': 2}))
+
+    def test_full_queue_marks_overflow(self):
+        broker = EventBroker()
+        subscription = broker.subscribe('alice', maxsize=2)
+        for n in range(5):
+            broker.publish('ping', {'n': n})
+
+        self.assertTrue(subscription.overflowed)
+        subscription.drain()
+        self.assertFalse(subscription.overflowed)
+        self.assertIsNone(subscription.get(0))
+
+    def test_leaderboard_delta_only_sends_changed_ranks(self):
+        broker = EventBroker()
+        subscription = broker.subscribe()
+        broker.set_leaderboard([{'email': 'a', 'points': 20}, {'email': 'b', 'points': 10}])
+
+        self.assertEqual(broker.publish_leaderboard([{'email': 'a', 'points': 20}, {'email': 'b', 'points': 10}]), 0)
+        broker.publish_leaderboard([{'email': 'b', 'points': 30}, {'email': 'a', 'points': 20}, {'email': 'c', 'points': 5}])
+
+        event, data = parse_frame(subscription.get(0))
+        self.assertEqual(event, 'leaderboard-delta')
+        self.assertEqual(data['size'], 3)
+        self.assertEqual([c['rank'] for c in data['changes']], [0, 1, 2])
+        self.assertEqual(data['changes'][0]['email'], 'b')
+
+    def test_older_leaderboard_versions_are_dropped(self):
+        broker = EventBroker()
+        subscription = broker.subscribe()
+        fresh = [{'email': 'a', 'points': 70}]
+
+        self.assertEqual(broker.publish_leaderboard(fresh, version=5), 1)
+        # A stream connect that read the board before the submit's eviction
+        self.assertEqual(broker.publish_leaderboard([{'email': 'a', 'points': 20}], version=4), 0)
+
+        self.assertEqual(broker.leaderboard_snapshot(), fresh)
+        self.assertEqual(parse_frame(subscription.get(0))[1]['changes'][0]['points'], 70)
+        self.assertIsNone(subscription.get(0))
+
+    def test_close_all_wakes_readers_and_last_unsubscribe_drops_snapshot(self):
+        broker = EventBroker()
+        subscription = broker.subscribe()
+        broker.set_leaderboard([])
+        broker.close_all()
+
+        self.assertIsNone(subscription.get(1))
+        self.assertTrue(subscription.closed)
+        broker.unsubscribe(subscription)
+        self.assertEqual(len(broker), 0)
+        self.assertIsNone(broker.leaderboard_snapshot())
+
+class TestStreamEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.app.config['STREAM_HEARTBEAT_SECONDS'] = 0.01
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'StreamPassword123!'
+        db.session.add(User(email='student@test.com', name='Student', password_hash=generate_password_hash(self.password)))
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        db.session.flush()
+        replace_questions('quiz-1', QUESTIONS)
+        db.session.commit()
+
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        self.token = response.json['token']
+
+    def tearDown(self):
+        event_broker.close_all()
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_requires_token(self):
+        self.assertEqual(self.client.get('/api/stream').status_code, 401)
+
+    def test_stream_sends_snapshot_then_submit_updates(self):
+        response = self.client.get(f'/api/stream?jwt={self.token}', buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        frames = (chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in response.response)
+
+        self.assertEqual(next(frames), 'retry: 5000\n\n')
+        event, board = parse_frame(next(frames))
+        self.assertEqual(event, 'leaderboard')
+        self.assertEqual(board[0]['points'], 0)
+        self.assertEqual(len(event_broker), 1)
+
+        self.client.post('/api/quizzes/quiz-1/submit', headers={'Authorization': f'Bearer {self.token}'},
+                         json={'answers': {'q1': 'a'}})
+
+        event, delta = parse_frame(next(frames))
+        self.assertEqual(event, 'leaderboard-delta')
+        self.assertEqual(delta['changes'][0]['points'], 50)
+        event, progress = parse_frame(next(frames))
+        self.assertEqual(event, 'progress')
+        self.assertEqual((progress['quizId'], progress['totalPoints']), ('quiz-1', 50))
+        self.assertEqual(next(frames), ': heartbeat\n\n')
+
+        response.close()
+        self.assertEqual(len(event_broker), 0)
+
+    def test_connect_sends_the_current_board_and_updates_open_streams(self):
+        first = self.client.get(f'/api/stream?jwt={self.token}', buffered=False)
+        frames = (chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in first.response)
+        next(frames)
+        self.assertEqual(parse_frame(next(frames))[1][0]['points'], 0)
+
+        # Points changed on another worker: only the shared cache entry is evicted here
+        User.query.update({User.points: 70})
+        db.session.commit()
+        response_cache.invalidate('leaderboard')
+
+        second = self.client.get(f'/api/stream?jwt={self.token}', buffered=False)
+        second_frames = (chunk.decode() if isinstance(chunk, bytes) else chunk for chunk in second.response)
+        next(second_frames)
+        self.assertEqual(parse_frame(next(second_frames))[1][0]['points'], 70)
+        event, delta = parse_frame(next(frames))
+        self.assertEqual((event, delta['changes'][0]['points']), ('leaderboard-delta', 70))
+
+        first.close()
+        second.close()
+
+    def test_rejects_streams_over_the_limit(self):
+        self.app.config['STREAM_MAX_CLIENTS'] = 0
+        self.assertEqual(self.client.get(f'/api/stream?jwt={self.token}').status_code, 503)
+
+    def test_thread_workers_keep_threads_free_for_requests(self):
+        os.environ['GUNICORN_THREADS'] = '4'
+        try:
+            self.assertEqual(create_app().config['STREAM_MAX_CLIENTS'], 2)
+            os.environ['SERVER_ASYNC'] = 'True'
+            self.assertEqual(create_app().config['STREAM_MAX_CLIENTS'], 200)
+        finally:
+            os.environ.pop('GUNICORN_THREADS')
+            os.environ.pop('SERVER_ASYNC', None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import User, Quiz, Result, UserBadge
+from migrations import has_index, m0002_gamification_columns
+from utils.cache import response_cache
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'Question 1', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'a'},
+    {'id': 'q2', 'text': 'Question 2', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'b'}
+]
+
+class TestGamificationColumns(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'GamifiedPassword123!'
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        db.session.flush()
+        replace_questions('quiz-1', QUESTIONS)
+        db.session.commit()
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_user(self, email, **kwargs):
+        user = User(email=email, password_hash=generate_password_hash(self.password), **kwargs)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def headers_for(self, email):
+        response = self.client.post('/api/auth/login', json={'email': email, 'password': self.password})
+        return {'Authorization': f"Bearer {response.json['token']}"}
+
+    def test_backfill_copies_legacy_json_in_batches(self):
+        legacy = [
+            self.add_user(f'legacy{i}@test.com') for i in range(5)
+        ]
+        zero = self.add_user('zero@test.com')
+        db.session.add(Result(user_id=zero.id, quiz_id='quiz-1', score=30, correct_count=1, total_questions=2))
+        db.session.commit()
+
+        with db.engine.connect() as connection:
+            connection.execute(text('ALTER TABLE users ADD COLUMN gamification JSON'))
+            for i, user in enumerate(legacy):
+                stats = {'points': 10 * (i + 1), 'badges': ['quiz-1', 'quiz-2'][:i], 'streak': i}
+                connection.execute(text('UPDATE users SET gamification = :g WHERE id = :id'),
+                                   {'g': json.dumps(stats), 'id': str(user.id)})
+            connection.execute(text('UPDATE users SET gamification = :g WHERE id = :id'),
+                               {'g': json.dumps({'points': 0, 'badges': []}), 'id': str(zero.id)})
+            connection.commit()
+
+            m0002_gamification_columns.backfill(connection, batch_size=2)
+            # Re-running must not duplicate badges
+            m0002_gamification_columns.backfill(connection, batch_size=2)
+
+        db.session.expire_all()
+        self.assertEqual([u.points for u in legacy], [10, 20, 30, 40, 50])
+        self.assertEqual(legacy[4].gamification, {'points': 50, 'badges': ['quiz-1', 'quiz-2'], 'streak': 4, 'level': 1})
+        self.assertEqual(UserBadge.query.count(), 1 + 2 + 2 + 2)
+        # Results-only points are folded in, replacing the old leaderboard fallback
+        self.assertEqual(db.session.get(User, zero.id).points, 30)
+
+    def test_backfill_adds_to_points_earned_under_the_new_code(self):
+        veteran = self.add_user('veteran@test.com')
+        zero = self.add_user('zero@test.com')
+        with db.engine.connect() as connection:
+            connection.execute(text('ALTER TABLE users ADD COLUMN gamification JSON'))
+            connection.execute(text('UPDATE users SET gamification = :g WHERE id = :id'),
+                               {'g': json.dumps({'points': 500}), 'id': str(veteran.id)})
+            connection.execute(text('UPDATE users SET gamification = :g WHERE id = :id'),
+                               {'g': json.dumps({'points': 0}), 'id': str(zero.id)})
+            connection.commit()
+
+        # Submits under the new code, before the backfill reaches these users
+        for user in (veteran, zero):
+            self.client.post('/api/quizzes/quiz-1/submit', headers=self.headers_for(user.email),
+                             json={'answers': {'q1': 'a', 'q2': 'b'}})
+
+        with db.engine.connect() as connection:
+            m0002_gamification_columns.backfill(connection)
+            m0002_gamification_columns.backfill(connection)
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(User, veteran.id).points, 550)
+        self.assertEqual(db.session.get(User, zero.id).points, 50)
+
+    def test_stat_columns_are_indexed(self):
+        with db.engine.connect() as connection:
+            connection.execute(text('DROP INDEX ix_users_streak'))
+            connection.commit()
+            m0002_gamification_columns.upgrade(connection)
+            m0002_gamification_columns.upgrade(connection)
+            for name in ('ix_users_points', 'ix_users_streak', 'ix_users_level'):
+                self.assertTrue(has_index(connection, 'users', name))
+
+    def test_submit_increments_points_and_awards_badge_once(self):
+        self.add_user('student@test.com')
+        headers = self.headers_for('student@test.com')
+        answers = {'answers': {'q1': 'a', 'q2': 'b'}}
+
+        for _ in range(2):
+            response = self.client.post('/api/quizzes/quiz-1/submit', json=answers, headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json['badges'], ['quiz-1'])
+
+        user = User.query.filter_by(email='student@test.com').first()
+        self.assertEqual(user.points, 100)
+        self.assertEqual(UserBadge.query.filter_by(user_id=user.id).count(), 1)
+
+    def test_leaderboard_ranks_by_points_column(self):
+        for i, points in enumerate([5, 50, 20]):
+            self.add_user(f'student{i}@test.com', points=points,
+                          badges=[UserBadge(badge_id='quiz-1')] if points == 50 else [])
+        headers = self.headers_for('student0@test.com')
+
+        response = self.client.get('/api/leaderboard', headers=headers)
+
+        self.assertEqual([row['points'] for row in response.json], [50, 20, 5])
+        self.assertEqual([row['badges'] for row in response.json], [1, 0, 0])
+
+if __name__ == '__main__':
+    unittest.main()
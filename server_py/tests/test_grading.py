@@ -0,0 +1,52 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.grading import build_feedback, grade_quiz
+
+def question(question_id, correct='a'):
+    return {'id': question_id, 'text': f'Question {question_id}', 'correctOptionId': correct,
+            'explanation': 'Because.', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}]}
+
+QUESTIONS = [question('q1'), question('q2', 'b'), question('q3')]
+
+class TestGradeQuiz(unittest.TestCase):
+
+    def test_perfect_score_awards_full_points(self):
+        self.assertEqual(grade_quiz(QUESTIONS, {'q1': 'a', 'q2': 'b', 'q3': 'a'}, 50), (3, 50))
+
+    def test_partial_score_is_proportional_and_rounded_down(self):
+        self.assertEqual(grade_quiz(QUESTIONS, {'q1': 'a', 'q2': 'a', 'q3': 'a'}, 50), (2, 33))
+        self.assertEqual(grade_quiz(QUESTIONS, {}, 50), (0, 0))
+
+    def test_missing_answer_never_matches_a_missing_key(self):
+        questions = [question('q1', None), question('q2')]
+        self.assertEqual(grade_quiz(questions, {'q2': 'a'}, 100), (1, 50))
+
+    def test_empty_quiz_scores_zero(self):
+        self.assertEqual(grade_quiz([], {}, 50), (0, 0))
+
+class TestBuildFeedback(unittest.TestCase):
+
+    def test_reports_selected_and_correct_options(self):
+        feedback = build_feedback(QUESTIONS[:2], {'q1': 'a', 'q2': 'x'})
+
+        self.assertEqual(feedback[0], {
+            'questionId': 'q1', 'questionText': 'Question q1', 'userOptionId': 'a', 'userOptionText': 'A',
+            'correctOptionId': 'a', 'correctOptionText': 'A', 'isCorrect': True, 'explanation': 'Because.'
+        })
+        self.assertEqual((feedback[1]['userOptionText'], feedback[1]['isCorrect']), ('No Answer', False))
+
+    def test_unanswered_question_without_key_is_not_correct(self):
+        unkeyed = {**question('q1', None)}
+        del unkeyed['explanation']
+        feedback = build_feedback([unkeyed], {})[0]
+
+        self.assertFalse(feedback['isCorrect'])
+        self.assertEqual(feedback['correctOptionText'], 'Unknown')
+        self.assertEqual(feedback['explanation'], 'No explanation provided.')
+
+if __name__ == '__main__':
+    unittest.main()
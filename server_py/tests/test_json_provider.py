@@ -0,0 +1,50 @@
+import unittest
+import os
+import sys
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from utils.json_provider import FastJSONProvider
+
+class TestFastJSONProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+        self.user_id = uuid.UUID('12345678-1234-5678-1234-567812345678')
+        self.created = datetime(2026, 1, 2, 3, 4, 5, 600000)
+
+    def render(self):
+        with self.app.app_context():
+            response = jsonify({'id': self.user_id, 'created_at': self.created, 'name': 'Zoë'})
+            return response.get_data(as_text=True)
+
+    def test_native_uuid_and_datetime(self):
+        for use_orjson in (True, False):
+            if use_orjson and not self.app.json.use_orjson:
+                continue
+            self.app.json.use_orjson = use_orjson
+            body = self.app.json.loads(self.render())
+            self.assertEqual(body['id'], str(self.user_id))
+            self.assertEqual(body['created_at'], self.created.isoformat())
+            self.assertEqual(body['name'], 'Zoë')
+
+    def test_compact_by_default(self):
+        self.assertNotIn('\n  ', self.render())
+
+    def test_pretty_printing_is_optional(self):
+        self.app.json.pretty = True
+        self.assertIn('\n  ', self.render())
+
+    def test_encoders_agree(self):
+        if not self.app.json.use_orjson:
+            self.skipTest('orjson not installed')
+        fast = self.render()
+        self.app.json.use_orjson = False
+        self.assertEqual(fast, self.render())
+
+if __name__ == '__main__':
+    unittest.main()
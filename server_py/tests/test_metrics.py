@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from sqlalchemy import create_engine, text
+from utils.json_provider import FastJSONProvider
+from utils.metrics import Histogram, init_metrics, registry
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), [('0.1', 2), ('1', 3), ('+Inf', 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 3.65)
+
+class TestRequestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        registry.reset()
+        self.engine = create_engine('sqlite://')
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+        init_metrics(self.app)
+
+        @self.app.route('/items')
+        def items():
+            with self.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+                conn.execute(text('SELECT 2'))
+            return jsonify([{'id': i} for i in range(10)])
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.engine.dispose()
+        registry.reset()
+
+    def test_request_is_recorded_per_endpoint(self):
+        self.client.get('/items')
+        body = self.client.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('enableu_http_requests_total{endpoint="items",method="GET",status="200"', body)
+        self.assertIn('enableu_db_queries_per_request_bucket{endpoint="items",method="GET"', body)
+        self.assertRegex(body, r'enableu_db_queries_per_request_sum\{endpoint="items",[^}]*\} 2\n')
+        self.assertRegex(body, r'enableu_serialization_duration_seconds_count\{endpoint="items",[^}]*\} 1\n')
+
+    def test_closed_without_a_token_outside_development(self):
+        with patch.dict(os.environ, {'FLASK_ENV': 'production'}):
+            self.assertEqual(self.client.get('/metrics').status_code, 404)
+            self.app.config['METRICS_TOKEN'] = 'scrape-secret'
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+            self.assertEqual(response.status_code, 200)
+
+    def test_metrics_token(self):
+        self.app.config['METRICS_TOKEN'] = 'scrape-secret'
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        response = self.client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
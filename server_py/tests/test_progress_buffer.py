@@ -0,0 +1,116 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User, Quiz, UserProgress
+from utils.cache import response_cache
+from utils.progress_buffer import progress_buffer, upsert_progress
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+from query_budget import QueryRecorder
+
+QUESTIONS = [
+    {'id': f'q{i}', 'text': f'Question {i}', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}],
+     'correctOptionId': 'a'}
+    for i in range(1, 4)
+]
+
+class TestProgressBuffer(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'BufferPassword123!'
+        self.user = User(email='student@test.com', password_hash=generate_password_hash(self.password))
+        db.session.add(self.user)
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        db.session.flush()
+        replace_questions('quiz-1', QUESTIONS)
+        db.session.commit()
+
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+        # Flushed explicitly by the tests
+        progress_buffer.start(self.app, interval=3600)
+
+    def tearDown(self):
+        progress_buffer.stop()
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def start(self, index):
+        return self.client.post('/api/progress/start', headers=self.headers,
+                                json={'quizId': 'quiz-1', 'currentQuestionIndex': index}).json
+
+    def stored(self):
+        db.session.expire_all()
+        return UserProgress.query.one()
+
+    def test_heartbeats_are_coalesced_until_flush(self):
+        self.assertEqual(self.start(0)['status'], 'started')
+
+        with QueryRecorder(db.engine) as queries:
+            self.assertEqual(self.start(1), {'message': 'Progress updated', 'status': 'in-progress', 'currentIndex': 1})
+            self.start(2)
+        self.assertEqual(queries.count, 0)
+        self.assertEqual(self.stored().current_question_index, 0)
+
+        progress = self.client.get('/api/progress', headers=self.headers).json
+        self.assertEqual(progress['inProgress'][0]['currentIndex'], 2)
+
+        self.assertEqual(progress_buffer.flush(), 1)
+        self.assertEqual((self.stored().status, self.stored().current_question_index), ('in-progress', 2))
+        self.assertEqual(progress_buffer.flush(), 0)
+
+    def test_submit_folds_in_pending_heartbeat(self):
+        self.start(0)
+        self.start(2)
+        self.client.post('/api/quizzes/quiz-1/submit', headers=self.headers,
+                         json={'answers': {'q1': 'a', 'q2': 'a', 'q3': 'a'}})
+
+        self.assertEqual((self.stored().status, self.stored().current_question_index), ('completed', 2))
+        self.assertEqual(progress_buffer.flush(), 0)
+        self.assertEqual(self.start(0)['status'], 'completed')
+        progress_buffer.flush()
+        self.assertEqual(self.stored().status, 'completed')
+
+    def test_stale_flush_does_not_overwrite_newer_state(self):
+        now = datetime.utcnow()
+        db.session.add(UserProgress(user_id=self.user.id, quiz_id='quiz-1', status='completed',
+                                    current_question_index=2, last_activity=now))
+        db.session.commit()
+
+        upsert_progress(db.session, [{'user_id': self.user.id, 'quiz_id': 'quiz-1', 'status': 'in-progress',
+                                      'current_question_index': 1, 'last_activity': now - timedelta(seconds=5)}])
+        db.session.commit()
+
+        self.assertEqual((self.stored().status, self.stored().current_question_index), ('completed', 2))
+
+    def test_stop_flushes_and_falls_back_to_write_through(self):
+        self.start(0)
+        self.start(1)
+        progress_buffer.stop()
+
+        self.assertEqual(self.stored().current_question_index, 1)
+        self.assertEqual(len(progress_buffer), 0)
+        self.start(2)
+        self.assertEqual(self.stored().current_question_index, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import User, Quiz, UserProgress
+from migrations import has_index, m0004_progress_constraints
+from utils.cache import response_cache
+from utils.db_compat import upsert
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'Question 1', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'a'}
+]
+
+class TestProgressUpsert(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'ProgressPassword123!'
+        self.user = User(email='student@test.com', password_hash=generate_password_hash(self.password))
+        db.session.add(self.user)
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        db.session.flush()
+        replace_questions('quiz-1', QUESTIONS)
+        db.session.commit()
+
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def start(self, index):
+        return self.client.post('/api/progress/start', headers=self.headers,
+                                json={'quizId': 'quiz-1', 'currentQuestionIndex': index}).json
+
+    def test_start_then_resume_then_complete(self):
+        self.assertEqual(self.start(0), {'message': 'Progress updated', 'status': 'started', 'currentIndex': 0})
+        self.assertEqual(self.start(1)['status'], 'in-progress')
+
+        self.client.post('/api/quizzes/quiz-1/submit', headers=self.headers, json={'answers': {'q1': 'a'}})
+        # Revisiting a completed quiz moves the cursor but keeps the status
+        self.assertEqual(self.start(0), {'message': 'Progress updated', 'status': 'completed', 'currentIndex': 0})
+
+        self.assertEqual(UserProgress.query.count(), 1)
+
+    def test_upsert_do_nothing_keeps_existing_row(self):
+        row = {'user_id': self.user.id, 'quiz_id': 'quiz-1', 'status': 'started'}
+        upsert(db.session, UserProgress, row, ['user_id', 'quiz_id'])
+        upsert(db.session, UserProgress, dict(row, status='completed'), ['user_id', 'quiz_id'])
+        db.session.commit()
+
+        self.assertEqual([p.status for p in UserProgress.query.all()], ['started'])
+
+    def test_migration_collapses_duplicates_before_unique_index(self):
+        with db.engine.connect() as connection:
+            connection.execute(text('DROP INDEX uq_user_progress_user_quiz'))
+            connection.commit()
+        now = datetime.utcnow()
+        db.session.add_all([
+            UserProgress(user_id=self.user.id, quiz_id='quiz-1', status='in-progress', last_activity=now),
+            UserProgress(user_id=self.user.id, quiz_id='quiz-1', status='completed', last_activity=now - timedelta(days=1)),
+            UserProgress(user_id=self.user.id, quiz_id='quiz-1', status='started', last_activity=now - timedelta(days=2))
+        ])
+        db.session.commit()
+
+        with db.engine.connect() as connection:
+            m0004_progress_constraints.upgrade(connection)
+            self.assertTrue(has_index(connection, 'user_progress', 'uq_user_progress_user_quiz'))
+
+        db.session.expire_all()
+        self.assertEqual([p.status for p in UserProgress.query.all()], ['completed'])
+
+if __name__ == '__main__':
+    unittest.main()
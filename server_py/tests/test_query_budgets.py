@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app import create_app
+from extensions import db
+from models import User, Quiz, Result, UserProgress
+from utils.cache import response_cache
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+from query_budget import QueryBudgetMixin, QueryRecorder
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'Question 1', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'a'},
+    {'id': 'q2', 'text': 'Question 2', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'b'}
+]
+
+class TestQueryRecorder(unittest.TestCase):
+
+    def test_flags_statements_repeated_with_different_binds(self):
+        engine = create_engine('sqlite://')
+        with QueryRecorder(engine) as queries:
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text('SELECT :id'), {'id': i})
+                conn.execute(text('SELECT 1, 2'))
+
+        self.assertEqual(queries.count, 4)
+        self.assertEqual(queries.repeated_shapes(), {'SELECT ?': 3})
+        engine.dispose()
+
+class EndpointFixture(QueryBudgetMixin):
+    """Five students with results and progress, an admin and four quizzes"""
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'BudgetPassword123!'
+        users = [User(email=f'student{i}@test.com', password_hash=generate_password_hash(self.password), points=75)
+                 for i in range(5)]
+        users.append(User(email='admin@test.com', password_hash=generate_password_hash(self.password), role='admin'))
+        db.session.add_all(users)
+        for i in range(4):
+            db.session.add(Quiz(id=f'quiz-{i}', title=f'Quiz {i}', description='', time_limit=300,
+                                points_reward=50))
+            db.session.flush()
+            replace_questions(f'quiz-{i}', QUESTIONS)
+        db.session.commit()
+
+        # Three results per student, matching their 75 points
+        for user in users[:5]:
+            for i in range(3):
+                db.session.add(Result(user_id=user.id, quiz_id=f'quiz-{i}', score=25,
+                                      correct_count=1, total_questions=2))
+            db.session.add(UserProgress(user_id=user.id, quiz_id='quiz-3', status='in-progress'))
+        db.session.commit()
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def headers_for(self, email):
+        response = self.client.post('/api/auth/login', json={'email': email, 'password': self.password})
+        return {'Authorization': f"Bearer {response.json['token']}"}
+
+class TestEndpointQueryBudgets(EndpointFixture, unittest.TestCase):
+
+    def test_progress_budget(self):
+        headers = self.headers_for('student0@test.com')
+        response = self.assertQueryBudget(5, 'get', '/api/progress', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['totalPoints'], 75)
+        self.assertEqual(len(response.json['inProgress']), 1)
+
+    def test_leaderboard_budget(self):
+        headers = self.headers_for('student0@test.com')
+        response = self.assertQueryBudget(2, 'get', '/api/leaderboard', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json[0]['points'], 75)
+
+    def test_quiz_catalog_budget(self):
+        headers = self.headers_for('student0@test.com')
+        response = self.assertQueryBudget(1, 'get', '/api/quizzes', headers=headers)
+        self.assertEqual(len(response.json), 4)
+
+    def test_dashboard_budget(self):
+        headers = self.headers_for('student0@test.com')
+        # user + quizzes + results + summaries + progress rows + leaderboard (2)
+        response = self.assertQueryBudget(7, 'get', '/api/dashboard', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['progress'], self.client.get('/api/progress', headers=headers).json)
+        self.assertEqual(response.json['me']['email'], 'student0@test.com')
+        self.assertEqual(response.json['quizzes'][0]['questionCount'], 2)
+
+        # The leaderboard section shares the /leaderboard cache entry
+        self.assertQueryBudget(0, 'get', '/api/leaderboard', headers=headers)
+        self.assertQueryBudget(5, 'get', '/api/dashboard', headers=headers)
+
+    def test_dashboard_include(self):
+        headers = self.headers_for('student0@test.com')
+        response = self.assertQueryBudget(2, 'get', '/api/dashboard?include=me,quizzes', headers=headers)
+        self.assertEqual(sorted(response.json), ['me', 'quizzes'])
+
+        response = self.client.get('/api/dashboard?include=me,friends', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_users_budget(self):
+        headers = self.headers_for('admin@test.com')
+        response = self.assertQueryBudget(4, 'get', '/api/admin/users', headers=headers)
+        self.assertEqual(len(response.json), 6)
+
+class TestListProjections(EndpointFixture, unittest.TestCase):
+    """?view=summary / ?fields= on the quiz and admin user lists"""
+
+    def test_quiz_summary_selects_quiz_columns_only(self):
+        headers = self.headers_for('student0@test.com')
+        with QueryRecorder(db.engine) as queries:
+            response = self.client.get('/api/quizzes?view=summary', headers=headers)
+
+        self.assertEqual(queries.count, 1)
+        self.assertNotIn('question_options', queries.statements[0])
+        self.assertEqual(response.json[0], {'id': 'quiz-0', 'title': 'Quiz 0', 'description': '',
+                                            'timeLimit': 300, 'points_reward': 50, 'questionCount': 2})
+
+    def test_quiz_fields(self):
+        headers = self.headers_for('student0@test.com')
+        response = self.client.get('/api/quizzes?fields=title,questions', headers=headers)
+        self.assertEqual(sorted(response.json[0]), ['id', 'questions', 'title'])
+        self.assertEqual(len(response.json[0]['questions']), 2)
+
+        response = self.client.get('/api/quizzes?fields=title,answers', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_quiz_list_variants_are_invalidated_together(self):
+        headers = self.headers_for('student0@test.com')
+        admin = self.headers_for('admin@test.com')
+        self.client.get('/api/quizzes', headers=headers)
+        self.client.get('/api/quizzes?view=summary', headers=headers)
+
+        self.client.put('/api/admin/quizzes/quiz-0', headers=admin, json={'title': 'Renamed'})
+
+        response = self.assertQueryBudget(1, 'get', '/api/quizzes?view=summary', headers=headers)
+        self.assertEqual(response.json[0]['title'], 'Renamed')
+        self.assertEqual(self.client.get('/api/quizzes', headers=headers).json[0]['title'], 'Renamed')
+
+    def test_admin_users_summary_skips_badges_and_unused_columns(self):
+        headers = self.headers_for('admin@test.com')
+        with QueryRecorder(db.engine) as queries:
+            response = self.client.get('/api/admin/users?view=summary', headers=headers)
+
+        self.assertEqual(sorted(response.json[0]), ['email', 'id', 'name', 'points', 'role'])
+        self.assertNotIn('user_badges', ' '.join(queries.statements))
+        users_select = [s for s in queries.statements if 'FROM users' in s and 'users.role' in s][-1]
+        self.assertNotIn('password_hash', users_select)
+        self.assertNotIn('accessibility_settings', users_select)
+
+        response = self.client.get('/api/admin/users?fields=email,created_at', headers=headers)
+        self.assertEqual(sorted(response.json[0]), ['created_at', 'email', 'id'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import AnswerKey, Quiz, QuizQuestion, User
+from utils.cache import response_cache
+from utils.quiz_bundle import FORMAT, content_hash, export_documents, import_documents, normalize_document
+from werkzeug.security import generate_password_hash
+from query_budget import QueryRecorder
+
+def quiz(quiz_id, title, question_text='Question 1'):
+    return {'id': quiz_id, 'title': title, 'description': 'd', 'time_limit': 300, 'points_reward': 50,
+            'questions': [{'id': 'q1', 'text': question_text, 'correctOptionId': 'a', 'explanation': 'Because.',
+                           'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}]}]}
+
+def bundle(*quizzes, version=1):
+    lines = [json.dumps({'format': FORMAT, 'version': version})] + [json.dumps(q) for q in quizzes]
+    return '\n'.join(lines) + '\n'
+
+class TestQuizBundle(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'BundlePassword123!'
+        db.session.add(User(email='admin@test.com', password_hash=generate_password_hash(self.password), role='admin'))
+        db.session.commit()
+        response = self.client.post('/api/auth/login', json={'email': 'admin@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def upload(self, text):
+        return self.client.post('/api/admin/quizzes/import', headers=self.headers,
+                                data={'file': (io.BytesIO(text.encode()), 'quizzes.jsonl')},
+                                content_type='multipart/form-data')
+
+    def test_hash_ignores_id_and_key_order(self):
+        first = normalize_document(quiz('a', 'Title'))
+        second = normalize_document(dict(reversed(list(quiz('b', 'Title').items()))))
+        self.assertEqual(content_hash(first), content_hash(second))
+        self.assertNotEqual(content_hash(first), content_hash(normalize_document(quiz('a', 'Other'))))
+
+    def test_reimport_is_incremental(self):
+        report = self.upload(bundle(quiz('quiz-1', 'One'), quiz('quiz-2', 'Two'))).json
+        self.assertEqual((report['created'], report['updated'], report['unchanged']), (2, 0, 0))
+
+        with QueryRecorder(db.engine) as queries:
+            report = import_documents({'data': q} for q in (quiz('quiz-1', 'One'), quiz('quiz-2', 'Two', 'Edited')))
+        self.assertEqual((report['created'], report['updated'], report['unchanged']), (0, 1, 1))
+        # Only the changed quiz has its questions rewritten
+        self.assertEqual(len([q for q in queries.statements if q.startswith('INSERT INTO quiz_questions')]), 1)
+
+        self.assertEqual(db.session.get(QuizQuestion, ('quiz-2', 'q1')).text, 'Edited')
+        self.assertEqual(Quiz.query.count(), 2)
+        # New quizzes are appended in bundle order; updated ones keep their place
+        import_documents({'data': q} for q in (quiz('quiz-10', 'Ten'), quiz('quiz-2', 'Two', 'Again')))
+        self.assertEqual([(q.id, q.position) for q in Quiz.query.order_by(Quiz.position)],
+                         [('quiz-1', 1), ('quiz-2', 2), ('quiz-10', 3)])
+
+    def test_export_round_trips(self):
+        self.upload(bundle(quiz('quiz-1', 'One')))
+        response = self.client.get('/api/admin/quizzes/export', headers=self.headers)
+        lines = response.get_data(as_text=True).splitlines()
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(json.loads(lines[0])['format'], FORMAT)
+        exported = json.loads(lines[1])
+        self.assertEqual(exported['questions'][0]['correctOptionId'], 'a')
+        self.assertEqual(exported['hash'], content_hash(normalize_document(quiz('quiz-1', 'One'))))
+        self.assertEqual(self.upload(response.get_data(as_text=True)).json['unchanged'], 1)
+
+    def test_exports_legacy_questions_without_an_answer_key(self):
+        self.upload(bundle(quiz('quiz-1', 'One'), quiz('quiz-2', 'Two')))
+        AnswerKey.query.filter_by(quiz_id='quiz-1').update({AnswerKey.correct_option_id: None})
+        db.session.commit()
+
+        response = self.client.get('/api/admin/quizzes/export', headers=self.headers)
+        documents = [json.loads(line) for line in response.get_data(as_text=True).splitlines()[1:]]
+
+        self.assertEqual([d['id'] for d in documents], ['quiz-1', 'quiz-2'])
+        self.assertIsNone(documents[0]['questions'][0]['correctOptionId'])
+        # Importing it back reports the quiz instead of storing an unanswerable question
+        self.assertEqual(self.upload(response.get_data(as_text=True)).json['failed'], 1)
+
+    def test_admin_edits_clear_the_hash(self):
+        self.upload(bundle(quiz('quiz-1', 'One')))
+        self.client.patch('/api/admin/quizzes/quiz-1/questions/q1', headers=self.headers, json={'text': 'Changed'})
+        self.assertEqual(self.upload(bundle(quiz('quiz-1', 'One'))).json['updated'], 1)
+        self.assertEqual(db.session.get(QuizQuestion, ('quiz-1', 'q1')).text, 'Question 1')
+
+    def test_bad_entries_are_reported_per_quiz(self):
+        tampered = {**quiz('quiz-3', 'Three'), 'hash': '0' * 64}
+        unanswered = quiz('quiz-4', 'Four')
+        del unanswered['questions'][0]['correctOptionId']
+        text = bundle(quiz('quiz-1', 'One'), {'id': 'quiz-2'}, tampered, quiz('quiz-1', 'Again'), unanswered)
+        report = self.upload(text + '{not json\n').json
+
+        self.assertEqual((report['created'], report['failed']), (1, 5))
+        self.assertEqual([(item['line'], item['status']) for item in report['quizzes'] if item['status'] == 'error'],
+                         [(3, 'error'), (4, 'error'), (5, 'error'), (6, 'error'), (7, 'error')])
+
+    def test_rejects_missing_header_and_newer_versions(self):
+        self.assertEqual(self.upload(json.dumps(quiz('quiz-1', 'One'))).status_code, 400)
+        response = self.upload(bundle(quiz('quiz-1', 'One'), version=2))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('version', response.json['message'])
+        self.assertEqual(list(export_documents()), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import User, Quiz, QuizQuestion, QuestionOption, AnswerKey
+from migrations import has_column, m0003_normalized_questions
+from utils.cache import response_cache
+from utils.quiz_bundle import export_documents
+from utils.quiz_content import load_graded_questions, normalize_questions
+from werkzeug.security import generate_password_hash
+
+# Shape sent by the admin quiz form: no question ids, integer option ids, is_correct flags
+ADMIN_FORM_QUESTIONS = [
+    {'text': 'Pick two', 'explanation': 'Because.', 'options': [
+        {'id': 1, 'text': 'One', 'is_correct': False},
+        {'id': 2, 'text': 'Two', 'is_correct': True}
+    ]},
+    {'text': 'Pick one', 'options': [
+        {'id': 1, 'text': 'One', 'is_correct': True},
+        {'id': 2, 'text': 'Two', 'is_correct': False}
+    ]}
+]
+
+class TestQuizContent(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'ContentPassword123!'
+        db.session.add(User(email='admin@test.com', password_hash=generate_password_hash(self.password), role='admin'))
+        db.session.add(User(email='student@test.com', password_hash=generate_password_hash(self.password)))
+        db.session.commit()
+        self.admin = self.headers_for('admin@test.com')
+        self.student = self.headers_for('student@test.com')
+
+        response = self.client.post('/api/admin/quizzes', headers=self.admin, json={
+            'id': 'quiz-1', 'title': 'Quiz 1', 'description': 'd', 'questions': ADMIN_FORM_QUESTIONS
+        })
+        self.assertEqual(response.status_code, 201)
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def headers_for(self, email):
+        response = self.client.post('/api/auth/login', json={'email': email, 'password': self.password})
+        return {'Authorization': f"Bearer {response.json['token']}"}
+
+    def test_normalize_rejects_unknown_correct_option(self):
+        with self.assertRaises(ValueError):
+            normalize_questions([{'text': 'x', 'options': [{'id': 'a', 'text': 'A'}], 'correctOptionId': 'b'}])
+
+    def test_questions_without_a_correct_option_are_rejected(self):
+        unanswered = [{'text': 'x', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}]}]
+        response = self.client.post('/api/admin/quizzes', headers=self.admin, json={
+            'id': 'quiz-2', 'title': 'Quiz 2', 'questions': unanswered
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(db.session.get(Quiz, 'quiz-2'))
+
+        response = self.client.patch('/api/admin/quizzes/quiz-1/questions/q1', headers=self.admin,
+                                     json={'options': [{'id': 'x', 'text': 'X'}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(load_graded_questions('quiz-1')[0]['correctOptionId'], '2')
+
+    def test_unanswered_questions_are_never_correct(self):
+        # A legacy question without an answer key must not match a missing answer
+        AnswerKey.query.filter_by(quiz_id='quiz-1', question_id='q1').update({AnswerKey.correct_option_id: None})
+        db.session.commit()
+
+        response = self.client.post('/api/quizzes/quiz-1/submit', headers=self.student, json={'answers': {}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json['correctCount'], response.json['score']), (0, 0))
+        self.assertFalse(any(item['isCorrect'] for item in response.json['feedback']))
+
+    def test_catalog_hides_answer_keys_and_keeps_order(self):
+        response = self.client.get('/api/quizzes/quiz-1', headers=self.student)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['questions'], [
+            {'id': 'q1', 'text': 'Pick two', 'options': [{'id': '1', 'text': 'One'}, {'id': '2', 'text': 'Two'}]},
+            {'id': 'q2', 'text': 'Pick one', 'options': [{'id': '1', 'text': 'One'}, {'id': '2', 'text': 'Two'}]}
+        ])
+
+    def test_submit_grades_against_answer_keys(self):
+        response = self.client.post('/api/quizzes/quiz-1/submit', headers=self.student,
+                                    json={'answers': {'q1': 2, 'q2': 2}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['correctCount'], 1)
+        self.assertEqual(response.json['feedback'][0]['explanation'], 'Because.')
+        self.assertEqual(response.json['feedback'][1]['correctOptionText'], 'One')
+
+    def test_patch_edits_one_question(self):
+        self.client.get('/api/quizzes', headers=self.student)  # warm the catalog cache
+
+        response = self.client.patch('/api/admin/quizzes/quiz-1/questions/q2', headers=self.admin,
+                                     json={'text': 'Pick two again', 'correctOptionId': '2'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['question']['correctOptionId'], '2')
+        catalog = self.client.get('/api/quizzes', headers=self.student).json
+        self.assertEqual([q['text'] for q in catalog[0]['questions']], ['Pick two', 'Pick two again'])
+        self.assertEqual([q['correctOptionId'] for q in load_graded_questions('quiz-1')], ['2', '2'])
+
+    def test_patch_validates_input(self):
+        response = self.client.patch('/api/admin/quizzes/quiz-1/questions/q1', headers=self.admin,
+                                     json={'correctOptionId': '9'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch('/api/admin/quizzes/quiz-1/questions/q9', headers=self.admin, json={'text': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_delete_quiz_removes_content(self):
+        response = self.client.delete('/api/admin/quizzes/quiz-1', headers=self.admin)
+
+        self.assertEqual(response.status_code, 200)
+        for model in (QuizQuestion, QuestionOption, AnswerKey):
+            self.assertEqual(model.query.count(), 0)
+
+    def test_quizzes_list_in_curriculum_order(self):
+        for n in range(2, 11):
+            response = self.client.post('/api/admin/quizzes', headers=self.admin, json={
+                'id': f'quiz-{n}', 'title': f'Quiz {n}', 'questions': ADMIN_FORM_QUESTIONS
+            })
+            self.assertEqual(response.status_code, 201)
+        expected = [f'quiz-{n}' for n in range(1, 11)]
+
+        catalog = self.client.get('/api/quizzes', headers=self.student).json
+        self.assertEqual([quiz['id'] for quiz in catalog], expected)
+        summaries = self.client.get('/api/quizzes?fields=id,title', headers=self.student).json
+        self.assertEqual([quiz['id'] for quiz in summaries], expected)
+        self.assertEqual([quiz['id'] for quiz in export_documents()], expected)
+
+    def test_migration_moves_legacy_json(self):
+        legacy = [{'id': 'q1', 'text': 'Legacy', 'correctOptionId': 'b', 'explanation': 'Old.',
+                   'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}]}]
+        db.session.add(Quiz(id='legacy', title='Legacy', description='', time_limit=60, points_reward=10))
+        db.session.commit()
+
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE quizzes ADD COLUMN questions JSON'))
+            connection.execute(text("UPDATE quizzes SET questions = :q WHERE id = 'legacy'"), {'q': json.dumps(legacy)})
+            m0003_normalized_questions.upgrade(connection)
+            self.assertFalse(has_column(connection, 'quizzes', 'questions'))
+
+        questions = load_graded_questions('legacy')
+        self.assertEqual(questions, [{'id': 'q1', 'text': 'Legacy', 'correctOptionId': 'b', 'explanation': 'Old.',
+                                      'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}]}])
+        # quiz-1 already had rows and is left alone
+        self.assertEqual(QuizQuestion.query.filter_by(quiz_id='quiz-1').count(), 2)
+        # Quizzes without a position are appended after the numbered ones
+        self.assertEqual([(quiz.id, quiz.position) for quiz in Quiz.query.order_by(Quiz.position)],
+                         [('quiz-1', 1), ('legacy', 2)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User
+from utils.cache import response_cache
+from utils.quiz_search import InvertedIndex, tokenize
+from werkzeug.security import generate_password_hash
+
+def question(text):
+    return {'text': text, 'options': [{'id': 1, 'text': 'Yes', 'is_correct': True}, {'id': 2, 'text': 'No'}]}
+
+QUIZZES = [
+    {'id': 'budgeting', 'title': 'Budgeting Basics', 'description': 'Plan a monthly budget',
+     'questions': [question('What is a savings goal?')]},
+    {'id': 'banking', 'title': 'Banking', 'description': 'Accounts and cards',
+     'questions': [question('Should a budget include bank fees?'), question('What is overdraft?')]},
+    {'id': 'cooking', 'title': 'Cooking', 'description': 'Kitchen safety',
+     'questions': [question('Is a knife sharp?')]}
+]
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def test_tokenize_drops_stop_words_and_plurals(self):
+        self.assertEqual(tokenize('What are the Savings goals?'), ['saving', 'goal'])
+        self.assertEqual(tokenize('glass class'), ['glass', 'class'])
+
+    def test_every_word_must_match_and_title_outranks_question_text(self):
+        index = InvertedIndex()
+        for quiz in QUIZZES:
+            index.add(quiz['id'], 'title', quiz['title'])
+            index.add(quiz['id'], 'description', quiz['description'])
+            for q in quiz['questions']:
+                index.add(quiz['id'], 'question', q['text'])
+            index.size += 1
+
+        self.assertEqual([quiz_id for quiz_id, _ in index.search('budget')], ['budgeting', 'banking'])
+        self.assertEqual([quiz_id for quiz_id, _ in index.search('budget fees')], ['banking'])
+        self.assertEqual(index.search('mortgage'), [])
+        self.assertEqual(index.search('the'), [])
+
+class TestQuizSearchEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'SearchPassword123!'
+        db.session.add(User(email='admin@test.com', password_hash=generate_password_hash(self.password), role='admin'))
+        db.session.commit()
+        response = self.client.post('/api/auth/login', json={'email': 'admin@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+        for quiz in QUIZZES:
+            self.client.post('/api/admin/quizzes', headers=self.headers, json=quiz)
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def search(self, query_string):
+        return self.client.get(f'/api/quizzes/search?{query_string}', headers=self.headers)
+
+    def test_ranked_summaries_with_pagination(self):
+        body = self.search('q=budgets').json
+        self.assertEqual([quiz['id'] for quiz in body['quizzes']], ['budgeting', 'banking'])
+        self.assertEqual(body['quizzes'][0]['questionCount'], 1)
+        self.assertNotIn('questions', body['quizzes'][0])
+        self.assertEqual((body['total'], body['pages']), (2, 1))
+
+        body = self.search('q=budget&per_page=1&page=2').json
+        self.assertEqual([quiz['id'] for quiz in body['quizzes']], ['banking'])
+        self.assertEqual((body['total'], body['pages'], body['page']), (2, 2, 2))
+
+    def test_rejects_missing_query(self):
+        self.assertEqual(self.search('q=%20').status_code, 400)
+        self.assertEqual(self.search('q=' + 'x' * 201).status_code, 400)
+
+    def test_quiz_writes_rebuild_the_index(self):
+        self.assertEqual(self.search('q=knife').json['total'], 1)
+        self.client.put('/api/admin/quizzes/cooking', headers=self.headers,
+                        json={'questions': [question('Which pan is best?')]})
+        self.assertEqual(self.search('q=knife').json['total'], 0)
+        self.assertEqual(self.search('q=pan').json['quizzes'][0]['id'], 'cooking')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from app import create_app
+from extensions import db
+from models import User, Quiz, Result, ResultSummary
+from utils.cache import response_cache
+from utils.quiz_content import replace_questions
+from utils.result_compaction import (add_months, attached_partitions, compact_results, convert_to_partitioned,
+                                     is_partitioned, month_start, partition_month)
+from werkzeug.security import generate_password_hash
+
+QUESTIONS = [
+    {'id': 'q1', 'text': 'Question 1', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}], 'correctOptionId': 'a'}
+]
+
+class TestResultCompaction(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'CompactPassword123!'
+        self.user = User(email='student@test.com', password_hash=generate_password_hash(self.password))
+        db.session.add(self.user)
+        for quiz_id in ('quiz-1', 'quiz-2'):
+            db.session.add(Quiz(id=quiz_id, title=quiz_id, description='', time_limit=300, points_reward=50))
+            db.session.flush()
+            replace_questions(quiz_id, QUESTIONS)
+        db.session.commit()
+
+        self.now = datetime.utcnow()
+        self.cutoff = add_months(month_start(self.now), -1)
+        self.add_result('quiz-1', 10, self.cutoff - timedelta(days=40))
+        self.add_result('quiz-1', 40, self.cutoff - timedelta(days=20))
+        self.add_result('quiz-1', 30, self.cutoff - timedelta(days=1))
+        self.add_result('quiz-2', 50, self.cutoff - timedelta(days=5))
+        self.add_result('quiz-2', 20, self.now)
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_result(self, quiz_id, score, completed_at):
+        # time_spent mirrors the score so totals are easy to check
+        db.session.add(Result(user_id=self.user.id, quiz_id=quiz_id, score=score, correct_count=0,
+                              total_questions=1, time_spent=score, completed_at=completed_at))
+        db.session.commit()
+
+    def progress(self):
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        headers = {'Authorization': f"Bearer {response.json['token']}"}
+        return self.client.get('/api/progress', headers=headers).json
+
+    def compact(self):
+        with db.engine.begin() as connection:
+            return compact_results(connection, self.cutoff)
+
+    def test_month_helpers(self):
+        self.assertEqual(add_months(datetime(2026, 11, 15), 3), datetime(2027, 2, 1))
+        self.assertEqual(add_months(datetime(2026, 1, 1), -1), datetime(2025, 12, 1))
+        self.assertEqual(partition_month('results_2026_03'), datetime(2026, 3, 1))
+        self.assertIsNone(partition_month('results_default'))
+
+    def test_compaction_summarizes_and_removes_old_rows(self):
+        stats = self.compact()
+
+        self.assertEqual(stats, {'summaries': 2, 'results': 4, 'partitions': 0, 'deleted': 4})
+        self.assertEqual(Result.query.count(), 1)
+        summary = db.session.get(ResultSummary, (self.user.id, 'quiz-1'))
+        self.assertEqual((summary.attempts, summary.total_score, summary.best_score, summary.last_score),
+                         (3, 80, 40, 30))
+        self.assertEqual((summary.total_time_spent, summary.last_time_spent), (80, 30))
+
+    def test_repeated_compaction_merges_into_existing_summaries(self):
+        self.compact()
+        # A late-arriving old result (e.g. clock skew) is folded in on the next run
+        self.add_result('quiz-1', 45, self.cutoff - timedelta(days=60))
+        self.compact()
+
+        summary = db.session.get(ResultSummary, (self.user.id, 'quiz-1'))
+        self.assertEqual((summary.attempts, summary.total_score, summary.best_score, summary.last_score),
+                         (4, 125, 45, 30))
+        self.assertEqual((summary.total_time_spent, summary.last_time_spent), (125, 30))
+
+    def test_progress_totals_are_unchanged_by_compaction(self):
+        before = self.progress()
+        self.compact()
+        after = self.progress()
+
+        for key in ('completedQuizzes', 'averageScore', 'totalPoints', 'totalTimeSpent'):
+            self.assertEqual(before[key], after[key], key)
+        self.assertEqual([a['score'] for a in after['recentActivity']], [20, 30, 50])
+        self.assertEqual([a['timeSpent'] for a in after['recentActivity']], [20, 30, 50])
+
+    def test_cli_command(self):
+        runner = self.app.test_cli_runner()
+        result = runner.invoke(args=['db', 'compact-results', '--keep-months', '1'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Compacted 4 results', result.output)
+
+@unittest.skipUnless(os.getenv('TEST_DATABASE_URL', '').startswith('postgresql'),
+                     'set TEST_DATABASE_URL to a PostgreSQL database')
+class TestConvertToPartitioned(unittest.TestCase):
+    """m0005 on an existing plain results table; everything runs in a throwaway schema and is rolled back"""
+
+    def setUp(self):
+        self.engine = create_engine(os.environ['TEST_DATABASE_URL'])
+        self.connection = self.engine.connect()
+        self.transaction = self.connection.begin()
+        schema = f'convert_test_{uuid.uuid4().hex[:8]}'
+        self.connection.execute(text(f'CREATE SCHEMA {schema}'))
+        self.connection.execute(text(f'SET LOCAL search_path TO {schema}'))
+        db.metadata.create_all(bind=self.connection, tables=[User.__table__, Quiz.__table__])
+        # The pre-partitioning shape: surrogate primary key, nullable completed_at
+        self.connection.execute(text(
+            'CREATE TABLE results (id UUID PRIMARY KEY, user_id UUID NOT NULL REFERENCES users (id), '
+            'quiz_id VARCHAR(50) NOT NULL REFERENCES quizzes (id), score INTEGER NOT NULL, '
+            'correct_count INTEGER NOT NULL, total_questions INTEGER NOT NULL, completed_at TIMESTAMP)'
+        ))
+        self.connection.execute(text('CREATE INDEX ix_results_user_id ON results (user_id)'))
+
+    def tearDown(self):
+        self.transaction.rollback()
+        self.connection.close()
+        self.engine.dispose()
+
+    def test_existing_rows_are_copied_into_monthly_partitions(self):
+        user_id = uuid.uuid4()
+        self.connection.execute(User.__table__.insert().values(id=user_id, email='old@test.com', password_hash='x'))
+        self.connection.execute(Quiz.__table__.insert().values(id='quiz-1', title='Quiz 1'))
+        for completed_at in (datetime(2025, 1, 15), datetime(2025, 1, 31), datetime(2025, 3, 2), None):
+            self.connection.execute(text(
+                'INSERT INTO results (id, user_id, quiz_id, score, correct_count, total_questions, completed_at) '
+                "VALUES (:id, :user_id, 'quiz-1', 80, 4, 5, :completed_at)"
+            ), {'id': str(uuid.uuid4()), 'user_id': str(user_id), 'completed_at': completed_at})
+
+        convert_to_partitioned(self.connection)
+
+        self.assertTrue(is_partitioned(self.connection))
+        self.assertIsNone(self.connection.execute(text("SELECT to_regclass('results_unpartitioned')")).scalar())
+        partitions = set(attached_partitions(self.connection))
+        self.assertTrue({'results_default', 'results_2025_01', 'results_2025_02', 'results_2025_03'} <= partitions)
+        counts = {name: self.connection.execute(text(f'SELECT COUNT(*) FROM {name}')).scalar()
+                  for name in ('results_2025_01', 'results_2025_03', 'results_default')}
+        self.assertEqual(counts, {'results_2025_01': 2, 'results_2025_03': 1, 'results_default': 0})
+        # The NULL completed_at row got a timestamp and lands in the current month
+        rows = self.connection.execute(text('SELECT time_spent, completed_at FROM results')).all()
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(all(time_spent == 0 and completed_at is not None for time_spent, completed_at in rows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+from utils.slow_query import bind_shape, init_slow_query_log, normalize_statement, slow_query_log
+
+class TestNormalization(unittest.TestCase):
+
+    def test_literals_and_placeholders_collapse(self):
+        a = normalize_statement("SELECT * FROM users WHERE email = 'a@b.com' AND id = 42")
+        b = normalize_statement("SELECT *\n  FROM users WHERE email = %(email_1)s AND id = %(id_1)s")
+        self.assertEqual(a, 'SELECT * FROM users WHERE email = ? AND id = ?')
+        self.assertEqual(a, b)
+
+    def test_in_lists_and_casts(self):
+        sql = normalize_statement("SELECT CAST(x ->> 'points' AS INTEGER), y::int FROM t WHERE id IN (?, ?, ?)")
+        self.assertEqual(sql, 'SELECT CAST(x ->> ? AS INTEGER), y::int FROM t WHERE id IN (?...)')
+
+    def test_bind_shape_hides_values(self):
+        self.assertEqual(bind_shape({'email': 'secret@x.com', 'limit': 5}), '{email: str, limit: int}')
+        self.assertEqual(bind_shape([('a', 1), ('b', 2)], executemany=True), '2 x (str, int)')
+
+class TestSlowQueryLog(unittest.TestCase):
+
+    def setUp(self):
+        slow_query_log.reset()
+        self.app = Flask(__name__)
+        self.app.config['SLOW_QUERY_MS'] = 0
+        init_slow_query_log(self.app)
+        self.engine = create_engine('sqlite://')
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.app.config['SLOW_QUERY_MS'] = 200
+        init_slow_query_log(self.app)
+        slow_query_log.reset()
+
+    def test_top_offenders_aggregate_by_shape(self):
+        with self.engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text('SELECT :value + 1'), {'value': i})
+            conn.execute(text('SELECT 2'))
+
+        top = slow_query_log.top()
+        by_statement = {e['statement']: e for e in top}
+        self.assertEqual(by_statement['SELECT ? + ?']['count'], 3)
+        self.assertEqual(by_statement['SELECT ? + ?']['bind_shape'], '(int)')
+        self.assertGreaterEqual(len(slow_query_log.samples()), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User, Quiz, Result, UserProgress
+from utils.cache import response_cache
+from utils.progress_buffer import ProgressBuffer, credit_seconds, progress_buffer
+from utils.quiz_content import replace_questions
+from werkzeug.security import generate_password_hash
+
+QUESTIONS = [
+    {'id': f'q{i}', 'text': f'Question {i}', 'options': [{'id': 'a', 'text': 'A'}, {'id': 'b', 'text': 'B'}],
+     'correctOptionId': 'a'}
+    for i in range(1, 4)
+]
+ANSWERS = {'q1': 'a', 'q2': 'a', 'q3': 'b'}
+
+class TestTimeOnTask(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.app.config['PROGRESS_IDLE_SECONDS'] = 120
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'TimePassword123!'
+        self.user = User(email='student@test.com', password_hash=generate_password_hash(self.password))
+        db.session.add(self.user)
+        db.session.add(Quiz(id='quiz-1', title='Quiz 1', description='', time_limit=300, points_reward=50))
+        db.session.flush()
+        replace_questions('quiz-1', QUESTIONS)
+        db.session.commit()
+
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+    def tearDown(self):
+        progress_buffer.stop()
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def start(self, index):
+        return self.client.post('/api/progress/start', headers=self.headers,
+                                json={'quizId': 'quiz-1', 'currentQuestionIndex': index}).json
+
+    def submit(self):
+        return self.client.post('/api/quizzes/quiz-1/submit', headers=self.headers, json={'answers': ANSWERS}).json
+
+    def stored(self):
+        db.session.expire_all()
+        return UserProgress.query.one()
+
+    def step_back(self, seconds):
+        """Pretend the last heartbeat came ``seconds`` earlier"""
+        UserProgress.query.update({UserProgress.last_activity: datetime.utcnow() - timedelta(seconds=seconds)})
+        db.session.commit()
+
+    def test_credit_ignores_idle_and_negative_gaps(self):
+        self.assertEqual(credit_seconds(42.7, 120), 42)
+        self.assertEqual(credit_seconds(120, 120), 120)
+        self.assertEqual(credit_seconds(600, 120), 0)
+        self.assertEqual(credit_seconds(-3, 120), 0)
+
+    def test_heartbeat_gaps_accumulate_and_move_to_the_result(self):
+        self.start(0)
+        self.step_back(30)
+        self.start(1)
+        self.step_back(900)  # stepped away: not counted
+        self.start(2)
+        self.assertEqual(self.stored().active_seconds, 30)
+
+        self.step_back(20)
+        response = self.submit()
+
+        self.assertEqual(response['timeSpent'], 50)
+        self.assertEqual(Result.query.one().time_spent, 50)
+        self.assertEqual((self.stored().active_seconds, self.stored().total_seconds), (0, 50))
+
+        progress = self.client.get('/api/progress', headers=self.headers).json
+        self.assertEqual(progress['totalTimeSpent'], 50)
+        self.assertEqual(progress['recentActivity'][0]['timeSpent'], 50)
+
+    def test_retake_starts_a_new_attempt_but_keeps_the_lifetime_total(self):
+        self.start(0)
+        self.step_back(40)
+        self.submit()
+
+        self.step_back(10)
+        self.start(0)
+        self.step_back(15)
+        self.assertEqual(self.submit()['timeSpent'], 25)
+        self.assertEqual(self.stored().total_seconds, 65)
+
+    def test_buffered_heartbeats_credit_the_same_time(self):
+        progress_buffer.start(self.app, interval=3600)
+        self.start(0)
+        entry = progress_buffer._entries[str(self.user.id)]['quiz-1']
+        # Heartbeats and the stored row move back together; flushes credit no more than the stored gap
+        self.step_back(25)
+        entry.last_activity -= timedelta(seconds=25)
+        self.start(1)
+
+        progress = self.client.get('/api/progress', headers=self.headers).json
+        self.assertEqual(progress['totalTimeSpent'], 25)
+        self.assertEqual(progress_buffer.flush(), 1)
+        self.assertEqual((self.stored().active_seconds, self.stored().total_seconds), (25, 25))
+
+        self.step_back(40)
+        entry.last_activity -= timedelta(seconds=35)
+        self.start(2)
+        entry.last_activity -= timedelta(seconds=5)
+        self.assertEqual(self.submit()['timeSpent'], 65)
+        self.assertEqual(progress_buffer.flush(), 0)
+        self.assertEqual((self.stored().active_seconds, self.stored().total_seconds), (0, 65))
+
+    def test_alternating_workers_do_not_double_count(self):
+        start = datetime.utcnow() - timedelta(seconds=180)
+        db.session.add(UserProgress(user_id=self.user.id, quiz_id='quiz-1', status='started',
+                                    current_question_index=0, last_activity=start))
+        db.session.commit()
+        workers = [ProgressBuffer(), ProgressBuffer()]
+        for worker in workers:
+            worker.start(self.app, interval=3600)
+            worker.remember(self.user.id, 'quiz-1', 'started', 0, start)
+
+        try:
+            # A heartbeat every 20 s, round-robin across two workers
+            for step in range(1, 10):
+                workers[step % 2].record(self.user.id, 'quiz-1', step, start + timedelta(seconds=20 * step), 120)
+            for worker in workers:
+                worker.flush()
+        finally:
+            for worker in workers:
+                worker.stop()
+
+        self.assertLessEqual(self.stored().total_seconds, 180)
+        self.assertEqual(self.stored().current_question_index, 9)
+
+    def test_analytics_reports_time_per_quiz(self):
+        self.start(0)
+        self.step_back(30)
+        self.start(1)
+        self.user.role = 'admin'
+        db.session.commit()
+
+        analytics = self.client.get('/api/admin/analytics', headers=self.headers).json
+        self.assertEqual(analytics['time_per_quiz'],
+                         [{'quiz_id': 'quiz-1', 'learners': 1, 'total_seconds': 30, 'average_seconds': 30}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import io
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import AuditLog, User
+from utils.user_import import UNUSABLE_PASSWORD
+from utils.cache import response_cache
+from werkzeug.security import check_password_hash, generate_password_hash
+from query_budget import QueryRecorder
+
+PASSWORD = 'ImportPassword123!'
+
+class TestUserImport(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.app.config['IMPORT_BATCH_SIZE'] = 3
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        db.session.add_all([
+            User(email='admin@test.com', password_hash=generate_password_hash(PASSWORD), role='admin'),
+            User(email='existing@school.org', password_hash=generate_password_hash(PASSWORD))
+        ])
+        db.session.commit()
+        response = self.client.post('/api/auth/login', json={'email': 'admin@test.com', 'password': PASSWORD})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def upload(self, text):
+        return self.client.post('/api/admin/users/import', headers=self.headers,
+                                data={'file': (io.BytesIO(text.encode()), 'users.csv')},
+                                content_type='multipart/form-data')
+
+    def test_imports_valid_rows_and_reports_the_rest(self):
+        response = self.upload(
+            'Email,Name,Role,Password\n'
+            f'ana@school.org,Ana,student,{PASSWORD}\n'
+            f'ben@school.org,Ben,Teacher,{PASSWORD}\n'
+            'existing@school.org,Old,student,\n'
+            'not-an-email,Bad,student,\n'
+            f'ana@school.org,Ana Again,student,{PASSWORD}\n'
+            'cy@school.org,Cy,principal,\n'
+            'dee@school.org,Dee,student,weak\n'
+            'eve@school.org,,,\n'
+        )
+        report = response.json
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((report['created'], report['skipped'], report['failed']), (3, 2, 3))
+        self.assertFalse(report['truncated'])
+        self.assertEqual([(row['row'], row['status']) for row in report['rows']], [
+            (2, 'created'), (3, 'created'), (4, 'skipped'), (5, 'error'),
+            (6, 'skipped'), (7, 'error'), (8, 'error'), (9, 'created')
+        ])
+        self.assertIn("Invalid role 'principal'", report['rows'][5]['message'])
+
+        ben = User.query.filter_by(email='ben@school.org').one()
+        self.assertEqual((ben.name, ben.role, ben.requires_password_change), ('Ben', 'teacher', False))
+        self.assertTrue(check_password_hash(ben.password_hash, PASSWORD))
+        eve = User.query.filter_by(email='eve@school.org').one()
+        self.assertEqual((eve.role, eve.requires_password_change), ('student', True))
+        self.assertEqual(eve.password_hash, UNUSABLE_PASSWORD)
+        self.assertFalse(check_password_hash(eve.password_hash, UNUSABLE_PASSWORD))
+        response = self.client.post('/api/auth/login', json={'email': 'eve@school.org', 'password': ''})
+        self.assertNotEqual(response.status_code, 200)
+        self.assertEqual(AuditLog.query.filter_by(action='IMPORT_USERS').count(), 1)
+
+    def test_one_existence_query_and_insert_per_chunk(self):
+        rows = ''.join(f'user{i}@school.org,User {i},student,\n' for i in range(6))
+        with QueryRecorder(db.engine) as queries:
+            report = self.upload('email,name,role,password\n' + rows).json
+
+        self.assertEqual(report['created'], 6)
+        inserts = [q for q in queries.statements if q.startswith('INSERT INTO users')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(User.query.count(), 8)
+
+    def test_row_limit_and_plain_csv_body(self):
+        self.app.config['IMPORT_MAX_ROWS'] = 2
+        response = self.client.post('/api/admin/users/import', headers=self.headers,
+                                    data='email\na@x.org\nb@x.org\nc@x.org\n', content_type='text/csv')
+        self.assertEqual(response.json['created'], 2)
+        self.assertTrue(response.json['truncated'])
+
+    def test_rejects_files_without_an_email_column(self):
+        self.assertEqual(self.upload('name,role\nAna,student\n').status_code, 400)
+        response = self.client.post('/api/admin/users/import', headers=self.headers, json={})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
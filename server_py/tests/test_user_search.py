@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User
+from utils.cache import response_cache
+from utils.user_search import similarity, trigrams
+from werkzeug.security import generate_password_hash
+
+class TestTrigrams(unittest.TestCase):
+
+    def test_matches_pg_trgm(self):
+        self.assertEqual(trigrams('Cat'), {'  c', ' ca', 'cat', 'at '})
+        self.assertEqual(similarity('word', 'word'), 1.0)
+        self.assertAlmostEqual(similarity('word', 'two words'), 4 / 11)
+        self.assertEqual(similarity('abc', None), 0.0)
+
+class TestAdminUserSearch(unittest.TestCase):
+
+    def setUp(self):
+        os.environ['FLASK_ENV'] = 'testing'
+        os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+        os.environ['JWT_SECRET_KEY'] = 'test-secret-key'
+
+        self.app = create_app()
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        response_cache.clear()
+
+        self.password = 'SearchPassword123!'
+        password_hash = generate_password_hash(self.password)
+        db.session.add_all([
+            User(email='admin@test.com', password_hash=password_hash, role='admin'),
+            User(email='maria.lopez@school.org', name='Maria Lopez', password_hash=password_hash),
+            User(email='lopez.family@mail.com', name='Ana', password_hash=password_hash),
+            User(email='mario@test.com', name='Mario Rossi', password_hash=password_hash),
+            User(email='under_score@test.com', password_hash=password_hash)
+        ])
+        db.session.commit()
+        response = self.client.post('/api/auth/login', json={'email': 'admin@test.com', 'password': self.password})
+        self.headers = {'Authorization': f"Bearer {response.json['token']}"}
+
+    def tearDown(self):
+        response_cache.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def search(self, query_string):
+        return self.client.get(f'/api/admin/users/search?{query_string}', headers=self.headers)
+
+    def emails(self, query_string):
+        return [user['email'] for user in self.search(query_string).json['users']]
+
+    def test_matches_name_and_email_substrings_prefix_first(self):
+        self.assertEqual(self.emails('q=lopez'), ['lopez.family@mail.com', 'maria.lopez@school.org'])
+        self.assertEqual(self.emails('q=MARI'), ['maria.lopez@school.org', 'mario@test.com'])
+        self.assertEqual(self.emails('q=mari&limit=1'), ['maria.lopez@school.org'])
+
+    def test_like_wildcards_are_literal(self):
+        self.assertEqual(self.emails('q=r_s'), ['under_score@test.com'])
+        self.assertEqual(self.emails('q=%25%25%25'), [])
+
+    def test_projection_and_validation(self):
+        user = self.search('q=rossi&view=summary').json['users'][0]
+        self.assertEqual(set(user), {'id', 'email', 'role', 'name', 'points', 'rank'})
+        self.assertIn('gamification', self.search('q=rossi').json['users'][0])
+
+        self.assertEqual(self.search('q=ab').status_code, 400)
+        self.assertEqual(self.search('q=abc&fields=password_hash').status_code, 400)
+
+    def test_requires_admin(self):
+        self.client.post('/api/auth/register', json={'email': 'student@test.com', 'password': self.password})
+        response = self.client.post('/api/auth/login', json={'email': 'student@test.com', 'password': self.password})
+        headers = {'Authorization': f"Bearer {response.json['token']}"}
+        response = self.client.get('/api/admin/users/search?q=lopez', headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
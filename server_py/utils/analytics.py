@@ -0,0 +1,46 @@
+"""
+Analytics aggregation helpers used by the admin dashboard.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List
+
+BADGE_BUCKETS = ('0', '1', '2', '3+')
+BADGE_LABELS = {'0': '0 Badges', '1': '1 Badge', '2': '2 Badges', '3+': '3+ Badges'}
+
+
+def fill_growth_series(daily_counts: Dict[str, int], start: datetime, end: datetime,
+                       base_count: int) -> List[Dict[str, Any]]:
+    """
+    Build a cumulative user growth series with one point per day.
+
+    Args:
+        daily_counts: New users per day keyed by 'YYYY-MM-DD'
+        start: First day of the series
+        end: Last day of the series (inclusive)
+        base_count: Users created before ``start``
+
+    Returns:
+        List of {'date', 'users', 'newUsers'} dicts, days without signups included
+    """
+    series = []
+    running_total = base_count
+    day = start.date()
+    last = end.date()
+    one_day = timedelta(days=1)
+
+    while day <= last:
+        date_str = day.isoformat()
+        daily_count = daily_counts.get(date_str, 0)
+        running_total += daily_count
+        series.append({'date': date_str, 'users': running_total, 'newUsers': daily_count})
+        day += one_day
+    return series
+
+
+def badge_distribution(badge_counts: Iterable[int]) -> List[Dict[str, Any]]:
+    """Bucket users by number of badges earned: 0, 1, 2 and 3+"""
+    buckets = [0, 0, 0, 0]
+    for count in badge_counts:
+        buckets[count if count < 3 else 3] += 1
+    return [{'name': BADGE_LABELS[key], 'value': value} for key, value in zip(BADGE_BUCKETS, buckets)]
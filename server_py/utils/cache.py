@@ -0,0 +1,167 @@
+"""
+In-process response cache for payloads shared by every user.
+
+Entries keep the serialized body plus lazily built compressed variants,
+so a cached quiz catalog or leaderboard is compressed once per encoding
+instead of on every request. Writers evict entries in every worker through
+``utils.cache_bus``; while that bus is live, entries may be kept longer.
+Every eviction bumps a generation counter, and a response built while one
+happened is served but not stored, so it can't outlive the write it missed.
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Union
+
+from flask import current_app, json, request
+
+from utils.compression import add_vary, compress, negotiate_encoding
+
+
+class CacheEntry:
+    __slots__ = ('body', 'mimetype', 'expires_at', 'live_expires_at', 'variants', '_lock')
+
+    def __init__(self, body: bytes, mimetype: str, expires_at: float, live_expires_at: float = None):
+        self.body = body
+        self.mimetype = mimetype
+        self.expires_at = expires_at
+        self.live_expires_at = max(expires_at, live_expires_at or expires_at)
+        self.variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str, level: int) -> bytes:
+        variant = self.variants.get(encoding)
+        if variant is None:
+            with self._lock:
+                variant = self.variants.get(encoding)
+                if variant is None:
+                    variant = compress(self.body, encoding, level)
+                    self.variants[encoding] = variant
+        return variant
+
+    def to_response(self):
+        app = current_app
+        response = app.response_class(self.body, mimetype=self.mimetype)
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return response
+
+        add_vary(response)
+        if len(self.body) >= app.config.get('COMPRESS_MIN_SIZE', 1024):
+            encoding = negotiate_encoding(request.accept_encodings)
+            if encoding:
+                response.set_data(self.encoded(encoding, app.config.get('COMPRESS_LEVEL', 6)))
+                response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class ResponseCache:
+    """Thread-safe TTL cache of serialized responses keyed by string"""
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        # True while cross-process invalidations are being received
+        # (utils.cache_bus); entries then stay valid until live_expires_at
+        self.live = False
+        # Bumped by every invalidation; see set()
+        self.generation = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if (entry.live_expires_at if self.live else entry.expires_at) <= time.monotonic():
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            return None
+        return entry
+
+    def set(self, key: str, body: bytes, mimetype: str, ttl: float, live_ttl: float = None,
+            generation: int = None) -> CacheEntry:
+        """
+        Store an entry. With ``generation`` (read before the body was built),
+        the entry is only returned, not stored, if anything was invalidated since.
+        """
+        now = time.monotonic()
+        entry = CacheEntry(body, mimetype, now + ttl, now + live_ttl if live_ttl else None)
+        with self._lock:
+            if generation is None or generation == self.generation:
+                self._entries[key] = entry
+        return entry
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str):
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def _store(key: str, response, ttl: Optional[float], generation: int) -> CacheEntry:
+    config = current_app.config
+    return response_cache.set(
+        key,
+        response.get_data(),
+        response.mimetype,
+        ttl if ttl is not None else config.get('RESPONSE_CACHE_TTL', 30),
+        config.get('CACHE_BUS_TTL'),
+        generation
+    )
+
+
+def cached_response(key: Union[str, Callable[..., str]], ttl: Optional[float] = None):
+    """
+    Cache a view's successful response body for all callers.
+
+    Only use on views whose output does not depend on the current user.
+
+    Args:
+        key: Cache key, or a callable receiving the view kwargs and returning one
+        ttl: Seconds to keep the entry (defaults to RESPONSE_CACHE_TTL); while
+            the invalidation bus is live, CACHE_BUS_TTL applies if longer
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key(**kwargs) if callable(key) else key
+            entry = response_cache.get(cache_key)
+            if entry is None:
+                generation = response_cache.generation
+                response = current_app.make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = _store(cache_key, response, ttl, generation)
+            return entry.to_response()
+        return wrapper
+    return decorator
+
+
+def cached_payload(key: str, build: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+    """
+    The JSON payload cached under ``key``, building and caching it on a miss.
+
+    Shares entries with ``cached_response`` views using the same key, so a
+    composite view can embed e.g. the leaderboard without recomputing it.
+    """
+    entry = response_cache.get(key)
+    if entry is not None:
+        return json.loads(entry.body)
+    generation = response_cache.generation
+    payload = build()
+    _store(key, current_app.json.response(payload), ttl, generation)
+    return payload
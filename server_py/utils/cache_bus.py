@@ -0,0 +1,230 @@
+"""
+Cross-process cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+Every worker keeps its own ``response_cache``, so a write served by one
+worker has to evict entries in all the others, on every node. Writers call
+``invalidate_on_commit()`` before committing. The keys go out as a single
+``pg_notify`` inside the writing transaction, so they are only delivered if
+it commits. They are evicted locally right after the commit. A daemon thread
+in each worker LISTENs on the channel and evicts what other processes send.
+
+While the listener is connected, entries may live for CACHE_BUS_TTL. When it
+is not (SQLite, a dropped connection), the short RESPONSE_CACHE_TTL applies
+again. The cache is cleared on every (re)connect, because messages sent
+during the gap were lost. A transaction-mode pooler accepts LISTEN but never
+delivers the notifications, so with DB_EXTERNAL_POOLER set the bus stays off
+unless CACHE_BUS_DATABASE_URL points at the database directly.
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from functools import partial
+from typing import Callable, Iterable
+
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from utils.cache import ResponseCache, response_cache
+from utils.db_pool import EXTERNAL_POOLER_MODES
+from utils.lifecycle import register_shutdown_hook
+
+logger = logging.getLogger('enableu.cache_bus')
+
+CHANNEL = 'cache_invalidate'
+MAX_PAYLOAD = 7900  # NOTIFY payloads must be under 8000 bytes
+_PENDING = 'cache_invalidations'
+
+
+class CacheBus:
+    """Publishes invalidations on commit and applies the ones other processes send"""
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+        self.origin = uuid.uuid4().hex[:12]  # skip our own messages
+        self.enabled = False
+        self.published = 0
+        self.received = 0
+        self.connects = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self.cache.live
+
+    def payload(self, keys: Iterable[str], prefixes: Iterable[str]) -> str:
+        message = json.dumps({'o': self.origin, 'k': sorted(keys), 'p': sorted(prefixes)},
+                             separators=(',', ':'))
+        if len(message.encode()) > MAX_PAYLOAD:
+            message = json.dumps({'o': self.origin, 'all': True}, separators=(',', ':'))
+        return message
+
+    def evict(self, keys: Iterable[str], prefixes: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self.cache.invalidate(*keys)
+        for prefix in prefixes:
+            self.cache.invalidate_prefix(prefix)
+
+    def handle(self, payload: str) -> None:
+        """Apply one notification payload from the channel"""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Ignoring malformed cache invalidation: %r', payload[:200])
+            return
+        if message.get('o') == self.origin:
+            return
+        self.received += 1
+        if message.get('all'):
+            self.cache.clear()
+        else:
+            self.evict(message.get('k', ()), message.get('p', ()))
+
+    # --- Listener thread ---
+
+    def start(self, connect: Callable, poll_seconds: float = 5) -> None:
+        """Start the listener thread once per process"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._listen, args=(connect, poll_seconds),
+                                            name='cache-bus', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _listen(self, connect: Callable, poll_seconds: float, max_backoff: float = 30) -> None:
+        backoff = 1
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = connect()
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {CHANNEL}')
+                self.cache.clear()
+                self.cache.live = True
+                self.connects += 1
+                backoff = 1
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], poll_seconds) != ([], [], []):
+                        connection.poll()
+                    else:
+                        # Idle: a round trip notices a dead connection
+                        with connection.cursor() as cursor:
+                            cursor.execute('SELECT 1')
+                    while connection.notifies:
+                        self.handle(connection.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning('Cache invalidation listener disconnected: %s', e)
+            finally:
+                self.cache.live = False
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, max_backoff)
+
+    def snapshot(self):
+        return {
+            'enabled': self.enabled,
+            'connected': self.connected,
+            'published': self.published,
+            'received': self.received,
+            'connects': self.connects
+        }
+
+
+cache_bus = CacheBus(response_cache)
+register_shutdown_hook(cache_bus.stop, name='stop_cache_bus')
+
+
+def invalidate_on_commit(*keys: str, prefixes: Iterable[str] = ()) -> None:
+    """
+    Evict response_cache keys (and key prefixes) in every worker once the
+    current db.session transaction commits. Call before ``commit()``.
+    """
+    from extensions import db
+    pending_keys, pending_prefixes = db.session.info.setdefault(_PENDING, (set(), set()))
+    pending_keys.update(keys)
+    pending_prefixes.update(prefixes)
+
+
+def _before_commit(session):
+    pending = session.info.get(_PENDING)
+    if not pending or not cache_bus.enabled:
+        return
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+    session.execute(sql_select(func.pg_notify(CHANNEL, cache_bus.payload(*pending))))
+    cache_bus.published += 1
+
+
+def _after_commit(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        cache_bus.evict(*pending)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING, None)
+
+
+_listeners_installed = False
+
+
+def _connect(url):
+    """A dedicated psycopg2 connection, whichever driver the app's engine uses"""
+    import psycopg2
+    params = url.translate_connect_args(username='user', database='dbname')
+    params.update(url.query)
+    return psycopg2.connect(**params)
+
+
+def init_cache_bus(app):
+    """Install the commit hooks and, on PostgreSQL, start listening with the first request"""
+    global _listeners_installed
+
+    if not _listeners_installed:
+        event.listen(Session, 'before_commit', _before_commit)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_rollback)
+        _listeners_installed = True
+
+    url = make_url(app.config.get('CACHE_BUS_DATABASE_URL') or app.config['SQLALCHEMY_DATABASE_URI'])
+    cache_bus.enabled = app.config.get('CACHE_BUS_ENABLED', True) and url.get_backend_name() == 'postgresql'
+    if not cache_bus.enabled:
+        return
+    pooler = os.getenv('DB_EXTERNAL_POOLER', '').strip().lower()
+    if pooler in EXTERNAL_POOLER_MODES and not app.config.get('CACHE_BUS_DATABASE_URL'):
+        logger.warning('DB_EXTERNAL_POOLER is set without CACHE_BUS_DATABASE_URL; '
+                       'cache entries expire by TTL only')
+        cache_bus.enabled = False
+        return
+    try:
+        import psycopg2  # noqa: F401
+    except ImportError:
+        logger.warning('psycopg2 is not installed; cache entries expire by TTL only')
+        return
+
+    connect = partial(_connect, url)
+
+    # Started lazily so CLI commands and the gunicorn master never listen
+    @app.before_request
+    def start_cache_bus():
+        cache_bus.start(connect)
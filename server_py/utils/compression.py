@@ -0,0 +1,78 @@
+"""
+Response compression negotiated by Accept-Encoding.
+
+Brotli is offered when the ``brotli`` package is installed, gzip otherwise.
+Responses smaller than COMPRESS_MIN_SIZE bytes, streamed responses and
+responses that already carry a Content-Encoding are sent unchanged.
+"""
+
+import gzip
+from typing import Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/csv',
+    'text/html',
+    'text/plain',
+    'text/css'
+}
+
+
+def supported_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """Pick the best supported encoding from a parsed Accept-Encoding header"""
+    return accept_encodings.best_match(supported_encodings())
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    if encoding == 'br':
+        # Brotli quality runs 0-11; scale the gzip-style 1-9 level onto it
+        return brotli.compress(data, quality=min(11, max(0, round(level * 11 / 9))))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def add_vary(response, header='Accept-Encoding'):
+    vary = {v.strip().lower() for v in response.headers.get('Vary', '').split(',') if v.strip()}
+    if header.lower() not in vary:
+        response.headers.add('Vary', header)
+
+
+def init_compression(app):
+    """Register an after_request hook that compresses eligible responses"""
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        add_vary(response)
+        data = response.get_data()
+        if len(data) < app.config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        response.set_data(compress(data, encoding, app.config.get('COMPRESS_LEVEL', 6)))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,111 @@
+"""
+Portable column types and dialect-aware query helpers.
+
+PostgreSQL keeps its native UUID and JSONB types; other databases (SQLite
+for tests, benchmarks and local load runs) get CHAR(36) and JSON.
+"""
+
+import uuid
+from datetime import date, datetime
+from typing import List, Union
+
+from sqlalchemy import CHAR, JSON, event, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+
+
+class GUID(TypeDecorator):
+    """UUID column: native UUID on PostgreSQL, CHAR(36) elsewhere. Accepts str or UUID."""
+
+    impl = CHAR(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == 'postgresql' else str(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(value)
+
+
+# JSONB on PostgreSQL (binary storage, GIN-indexable), JSON text elsewhere
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
+
+def day_bucket(column, dialect_name: str):
+    """Truncate a timestamp column to the day for GROUP BY"""
+    if dialect_name == 'postgresql':
+        return func.date_trunc('day', column)
+    return func.date(column)
+
+
+def seconds_between(start, end, dialect_name: str):
+    """SQL expression for the seconds from timestamp ``start`` to ``end``"""
+    if dialect_name == 'postgresql':
+        return func.extract('epoch', end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+
+def day_key(value: Union[str, date, datetime]) -> str:
+    """Normalize a day_bucket() result to 'YYYY-MM-DD'"""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def upsert(session, model, values, conflict_columns: List[str], update=None, returning=None):
+    """
+    INSERT ... ON CONFLICT (conflict_columns) on PostgreSQL and SQLite.
+
+    ``session`` may be an ORM session or a Core connection. ``values`` is a
+    row dict or a list of them. ``update`` is the SET clause
+    for DO UPDATE, either a dict or a callable taking the ``excluded``
+    pseudo-table; None means DO NOTHING. ``returning`` columns are returned
+    from the affected row.
+    """
+    bind = session.get_bind() if hasattr(session, 'get_bind') else session
+    dialect_name = bind.dialect.name
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'upsert is not supported on {dialect_name}')
+
+    stmt = insert(model).values(values)
+    if update is None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+    else:
+        set_ = update(stmt.excluded) if callable(update) else update
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+    if returning:
+        stmt = stmt.returning(*returning)
+    return session.execute(stmt)
+
+
+@event.listens_for(Engine, 'connect')
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    """Let SQLite file databases serve concurrent readers during load tests"""
+    module = type(dbapi_connection).__module__
+    if not module.startswith('sqlite3'):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        if cursor.execute('PRAGMA database_list').fetchone()[2]:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+    finally:
+        cursor.close()
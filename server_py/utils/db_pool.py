@@ -0,0 +1,153 @@
+"""
+Database connection pool configuration and per-worker pool statistics
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Any
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+EXTERNAL_POOLER_MODES = ('pgbouncer', 'external')
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class PoolStats:
+    """Thread-safe counters for connection checkouts in this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            if seconds > self.max_wait:
+                self.max_wait = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total_ms': round(self.total_wait * 1000, 3),
+                'wait_avg_ms': round(self.total_wait * 1000 / waits, 3) if waits else 0.0,
+                'wait_max_ms': round(self.max_wait * 1000, 3)
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+def build_engine_options(database_uri: str) -> Dict[str, Any]:
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the environment.
+
+    Environment variables:
+    - DB_POOL_SIZE: persistent connections per worker (default 5)
+    - DB_MAX_OVERFLOW: extra connections allowed under burst load (default 10)
+    - DB_POOL_TIMEOUT: seconds to wait for a free connection (default 30)
+    - DB_POOL_RECYCLE: seconds before a connection is replaced (default 1800)
+    - DB_POOL_PRE_PING: test connections on checkout (default true)
+    - DB_EXTERNAL_POOLER: set to 'pgbouncer' when connecting through a
+      transaction-pooling proxy; local pooling and prepared statements
+      are disabled
+
+    Args:
+        database_uri: The SQLAlchemy database URI
+
+    Returns:
+        Dictionary of keyword arguments for create_engine
+    """
+    url = make_url(database_uri)
+
+    # SQLite pooling is managed by Flask-SQLAlchemy
+    if url.get_backend_name() == 'sqlite':
+        return {}
+
+    pooler = os.getenv('DB_EXTERNAL_POOLER', '').strip().lower()
+    if pooler in EXTERNAL_POOLER_MODES:
+        options = {'poolclass': NullPool}
+        # psycopg 3 prepares repeated statements server-side, which breaks
+        # under transaction pooling; psycopg2 never prepares.
+        if url.get_driver_name() == 'psycopg':
+            options['connect_args'] = {'prepare_threshold': None}
+        return options
+
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True)
+    }
+
+
+def get_pool_stats(engine) -> Dict[str, Any]:
+    """
+    Report pool usage for the current worker process.
+
+    Returns:
+        Dictionary with the pool class, live connection counts and wait times
+    """
+    pool = engine.pool
+    stats = {
+        'pid': os.getpid(),
+        'pool_class': type(pool).__name__
+    }
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout()
+        })
+
+    stats.update(pool_stats.snapshot())
+    return stats
@@ -0,0 +1,155 @@
+"""
+In-process publish/subscribe behind the Server-Sent Events stream.
+
+One EventBroker per worker process fans each published event out to the
+matching subscriptions. An event is serialized to an SSE frame once, so N
+watching clients cost one computation and N queue puts per change instead
+of N polls. Queues are bounded: a client that falls behind is sent a
+``resync`` event and refetches, rather than the server buffering without
+limit. Each worker only reaches the clients connected to it.
+"""
+
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from flask import json
+
+from utils.lifecycle import register_shutdown_hook
+
+_CLOSE = object()
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one SSE frame with a JSON payload (one data: line per JSON line)"""
+    lines = ''.join(f'data: {line}\n' for line in json.dumps(data).splitlines())
+    return f'event: {event}\n{lines}\n'
+
+
+class Subscription:
+    """One connected client: a bounded queue of pre-encoded frames"""
+
+    def __init__(self, user_id: Optional[str], maxsize: int):
+        self.user_id = user_id
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def put(self, frame) -> None:
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout: float) -> Optional[str]:
+        """Next frame, or None if nothing arrived within ``timeout`` seconds"""
+        try:
+            frame = self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if frame is _CLOSE:
+            self.closed = True
+            return None
+        return frame
+
+    def drain(self) -> None:
+        """Drop queued frames after an overflow; the client will resync"""
+        while True:
+            try:
+                if self.queue.get_nowait() is _CLOSE:
+                    self.closed = True
+            except queue.Empty:
+                break
+        self.overflowed = False
+
+    def close(self) -> None:
+        self.closed = True
+        self.drain()
+        try:
+            self.queue.put_nowait(_CLOSE)  # wake a reader blocked in get()
+        except queue.Full:
+            pass
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._leaderboard: Optional[List[Dict]] = None
+        self._leaderboard_version = -1
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, user_id: Optional[str] = None, maxsize: int = 100) -> Subscription:
+        subscription = Subscription(user_id, maxsize)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            if not self._subscriptions:
+                # Nobody is watching, so the snapshot would go stale
+                self._leaderboard = None
+
+    def publish(self, event: str, data: Any, user_id: Optional[str] = None) -> int:
+        """Send to every subscription, or only ``user_id``'s; returns the number of receivers"""
+        with self._lock:
+            targets = [s for s in self._subscriptions if user_id is None or s.user_id == user_id]
+        return self._send(targets, event, data)
+
+    @staticmethod
+    def _send(targets: List[Subscription], event: str, data: Any) -> int:
+        if not targets:
+            return 0
+        frame = format_sse(event, data)
+        for subscription in targets:
+            subscription.put(frame)  # never blocks
+        return len(targets)
+
+    def leaderboard_snapshot(self) -> Optional[List[Dict]]:
+        return self._leaderboard
+
+    def set_leaderboard(self, entries: List[Dict]) -> None:
+        self._leaderboard = entries
+
+    def publish_leaderboard(self, entries: List[Dict], version: Optional[int] = None) -> int:
+        """
+        Publish the positions that changed since the last snapshot as a
+        ``leaderboard-delta`` event: {'size': n, 'changes': [{'rank': i, ...entry}]}.
+
+        ``version`` orders snapshots (callers pass the response cache
+        generation read before building ``entries``); a board older than
+        the current snapshot is dropped instead of rolling clients back.
+        """
+        # One critical section from snapshot swap to enqueue, so concurrent
+        # publishers (submits, stream connects) deliver deltas in swap order
+        with self._lock:
+            if version is not None:
+                if version < self._leaderboard_version:
+                    return 0
+                self._leaderboard_version = version
+            previous = self._leaderboard or []
+            self._leaderboard = entries
+            changes = [
+                {'rank': rank, **entry} for rank, entry in enumerate(entries)
+                if rank >= len(previous) or previous[rank] != entry
+            ]
+            if not changes and len(entries) == len(previous):
+                return 0
+            return self._send(list(self._subscriptions), 'leaderboard-delta',
+                              {'size': len(entries), 'changes': changes})
+
+    def close_all(self) -> None:
+        """End every stream, e.g. on worker shutdown"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
+
+
+event_broker = EventBroker()
+register_shutdown_hook(event_broker.close_all, name='close_event_streams')
@@ -0,0 +1,59 @@
+"""
+Quiz grading and sanitization helpers.
+
+Pure functions over question dicts (see utils.quiz_content), so they can
+be unit tested and benchmarked without a database.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+Question = Dict[str, Any]
+
+
+def grade_quiz(questions: List[Question], answers: Dict[str, str], points_reward: int) -> Tuple[int, int]:
+    """
+    Score a submission.
+
+    Args:
+        questions: Questions including 'correctOptionId'
+        answers: Mapping of question id to selected option id
+        points_reward: Points for a perfect score
+
+    Returns:
+        Tuple of (correct_count, points_awarded). An unanswered question, or
+        one without an answer key, is never correct; an empty quiz scores 0.
+    """
+    correct_count = sum(1 for q in questions if _is_correct(answers.get(q['id']), q['correctOptionId']))
+    total_questions = len(questions)
+
+    if total_questions == 0:
+        return 0, 0
+    if correct_count == total_questions:
+        return correct_count, points_reward
+    return correct_count, int((correct_count / total_questions) * points_reward)
+
+
+def _is_correct(answer, correct) -> bool:
+    return answer is not None and answer == correct
+
+
+def build_feedback(questions: List[Question], answers: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Per-question feedback with the selected and correct option texts"""
+    feedback = []
+    for question in questions:
+        q_id = question['id']
+        correct_opt = question['correctOptionId']
+        user_opt = answers.get(q_id)
+        option_texts = {o['id']: o['text'] for o in question['options']}
+
+        feedback.append({
+            'questionId': q_id,
+            'questionText': question['text'],
+            'userOptionId': user_opt,
+            'userOptionText': option_texts.get(user_opt, "No Answer"),
+            'correctOptionId': correct_opt,
+            'correctOptionText': option_texts.get(correct_opt, "Unknown"),
+            'isCorrect': _is_correct(user_opt, correct_opt),
+            'explanation': question.get('explanation', 'No explanation provided.')
+        })
+    return feedback
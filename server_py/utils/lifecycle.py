@@ -0,0 +1,45 @@
+"""
+Process lifecycle hooks for graceful shutdown.
+
+Components that buffer work in memory (write coalescing, batched logs)
+register a drain function here. The gunicorn ``worker_exit`` hook runs
+them once in-flight requests have finished; ``atexit`` covers the dev
+server and scripts.
+"""
+
+import atexit
+import threading
+from typing import Callable, List, Tuple
+
+_hooks: List[Tuple[str, Callable[[], None]]] = []
+_lock = threading.Lock()
+_shutting_down = threading.Event()
+
+
+def register_shutdown_hook(fn: Callable[[], None], name: str = None) -> Callable[[], None]:
+    """Register ``fn`` to run on shutdown. Can be used as a decorator."""
+    with _lock:
+        _hooks.append((name or getattr(fn, '__name__', repr(fn)), fn))
+    return fn
+
+
+def is_shutting_down() -> bool:
+    return _shutting_down.is_set()
+
+
+def run_shutdown_hooks(log=print):
+    """Run registered hooks once, in registration order"""
+    with _lock:
+        if _shutting_down.is_set():
+            return
+        _shutting_down.set()
+        hooks = list(_hooks)
+
+    for name, fn in hooks:
+        try:
+            fn()
+        except Exception as e:
+            log(f"Shutdown hook {name} failed: {e}")
+
+
+atexit.register(run_shutdown_hooks)
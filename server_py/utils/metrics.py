@@ -0,0 +1,261 @@
+"""
+Request timing instrumentation with fixed-bucket histograms.
+
+For every request we record, per blueprint endpoint:
+- wall time
+- time spent in database cursor execution and the number of statements
+- time spent serializing the JSON response
+
+Values are kept in per-process histograms and rendered in the Prometheus
+text exposition format at ``/metrics``. Under gunicorn each worker keeps
+its own registry, so scrape workers individually or aggregate by ``pid``.
+Scrapes need METRICS_TOKEN; without one the endpoint answers 404 except in
+development and testing.
+"""
+
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from flask import request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Cumulative-on-read histogram with fixed upper bounds"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets.append((_format_value(bound), total))
+        buckets.append(('+Inf', total + self.counts[-1]))
+        return buckets
+
+
+class RequestStats(threading.local):
+    """Per-thread (or per-greenlet under gevent) accumulators for the active request"""
+
+    def __init__(self):
+        self.active = False
+        self.start = 0.0
+        self.db_time = 0.0
+        self.db_count = 0
+        self.serialize_time = 0.0
+
+    def begin(self):
+        self.active = True
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_count = 0
+        self.serialize_time = 0.0
+
+
+request_stats = RequestStats()
+
+
+class MetricsRegistry:
+    FAMILIES = {
+        'http_request_duration_seconds': ('Wall time spent handling the request', LATENCY_BUCKETS),
+        'db_duration_seconds': ('Time spent executing SQL statements per request', LATENCY_BUCKETS),
+        'db_queries_per_request': ('SQL statements executed per request', QUERY_COUNT_BUCKETS),
+        'serialization_duration_seconds': ('Time spent encoding the JSON response', LATENCY_BUCKETS)
+    }
+
+    def __init__(self, prefix: str = 'enableu'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Tuple[str, str], Histogram]] = {name: {} for name in self.FAMILIES}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+
+    def _histogram(self, family: str, labels: Tuple[str, str]) -> Histogram:
+        histograms = self._histograms[family]
+        histogram = histograms.get(labels)
+        if histogram is None:
+            histogram = histograms[labels] = Histogram(self.FAMILIES[family][1])
+        return histogram
+
+    def record(self, endpoint: str, method: str, status: int, wall: float,
+               db_time: float, db_count: int, serialize_time: float):
+        labels = (endpoint, method)
+        with self._lock:
+            self._histogram('http_request_duration_seconds', labels).observe(wall)
+            self._histogram('db_duration_seconds', labels).observe(db_time)
+            self._histogram('db_queries_per_request', labels).observe(db_count)
+            self._histogram('serialization_duration_seconds', labels).observe(serialize_time)
+            key = (endpoint, method, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            for histograms in self._histograms.values():
+                histograms.clear()
+            self._requests.clear()
+
+    def render(self, extra_gauges: Dict[str, float] = None) -> str:
+        pid = str(os.getpid())
+        lines = []
+        with self._lock:
+            name = f'{self.prefix}_http_requests_total'
+            lines.append(f'# HELP {name} Requests handled by endpoint, method and status')
+            lines.append(f'# TYPE {name} counter')
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'{name}{_labels(endpoint=endpoint, method=method, status=status, pid=pid)} {count}')
+
+            for family, (help_text, _) in self.FAMILIES.items():
+                name = f'{self.prefix}_{family}'
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (endpoint, method), histogram in sorted(self._histograms[family].items()):
+                    for le, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{_labels(endpoint=endpoint, method=method, pid=pid, le=le)} {count}')
+                    base = _labels(endpoint=endpoint, method=method, pid=pid)
+                    lines.append(f'{name}_sum{base} {_format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{base} {histogram.count}')
+
+        for gauge, value in (extra_gauges or {}).items():
+            name = f'{self.prefix}_{gauge}'
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name}{_labels(pid=pid)} {_format_value(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def record_serialization(seconds: float):
+    if request_stats.active:
+        request_stats.serialize_time += seconds
+
+
+# --- SQLAlchemy hooks (registered once for every engine) ---
+
+_listeners_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if request_stats.active:
+        request_stats.db_time += elapsed
+        request_stats.db_count += 1
+
+
+def _handle_error(context):
+    conn = context.connection
+    starts = conn.info.get('metrics_query_start') if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def install_sqlalchemy_listeners():
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+    _listeners_installed = True
+
+
+def _pool_gauges() -> Dict[str, float]:
+    from extensions import db
+    from utils.db_pool import get_pool_stats
+
+    try:
+        stats = get_pool_stats(db.engine)
+    except Exception:
+        return {}
+    return {f'db_pool_{k}': v for k, v in stats.items() if isinstance(v, (int, float)) and k != 'pid'}
+
+
+def _is_development(app) -> bool:
+    return app.debug or app.testing or os.getenv('FLASK_ENV') in ('development', 'testing')
+
+
+def init_metrics(app):
+    """
+    Install timing hooks and the /metrics endpoint.
+
+    Call before init_compression so the recording hook runs after the
+    response has been compressed (after_request hooks run in reverse).
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    install_sqlalchemy_listeners()
+
+    @app.before_request
+    def start_request_timer():
+        request_stats.begin()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if request_stats.active:
+            request_stats.active = False
+            registry.record(
+                request.endpoint or 'unmatched',
+                request.method,
+                response.status_code,
+                time.perf_counter() - request_stats.start,
+                request_stats.db_time,
+                request_stats.db_count,
+                request_stats.serialize_time
+            )
+        return response
+
+    @app.teardown_request
+    def clear_request_stats(exc=None):
+        request_stats.active = False
+
+    def metrics_endpoint():
+        token = app.config.get('METRICS_TOKEN')
+        if not token and not _is_development(app):
+            # Fail closed: latency and route data stay private until a token is set
+            return Response('Not Found\n', status=404, mimetype='text/plain')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(registry.render(_pool_gauges()), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
@@ -0,0 +1,245 @@
+"""
+Write coalescing for quiz progress heartbeats.
+
+QuizPlayer reports the current question on every move. The first heartbeat
+of an attempt is written through, so the row exists and its status is known.
+Later heartbeats only update an in-memory entry per (user, quiz), with the
+last write winning. A background thread flushes the dirty entries every
+PROGRESS_FLUSH_SECONDS as batched upserts, so there is one commit per
+interval instead of one per click. submit_quiz folds the pending entry into
+its completion upsert, and shutdown flushes whatever is left.
+
+Flush upserts only move last_activity forward and never downgrade
+'completed'. That way a late flush, or one from another worker, can't
+clobber newer state. Without a running flusher (dev server, tests, scripts)
+every heartbeat is written through.
+
+Active time is credited per heartbeat: the gap since the previous heartbeat
+counts if it is at most PROGRESS_IDLE_SECONDS, otherwise the user was away.
+Credits accumulate as increments (active_seconds for the current attempt,
+total_seconds across attempts). Each worker only sees its own heartbeats,
+so when an attempt's heartbeats alternate between workers their buffered
+gaps overlap. A flush therefore credits at most the wall time between the
+stored last_activity and the flushed one, which keeps the sum across
+workers within the time that actually passed. Raw heartbeats are never
+stored.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, and_, case, cast, or_
+
+from models import UserProgress
+from utils.db_compat import seconds_between, upsert
+from utils.lifecycle import register_shutdown_hook
+
+logger = logging.getLogger('enableu.progress_buffer')
+
+BATCH_SIZE = 500
+
+
+def credit_seconds(gap: float, idle_seconds: float) -> int:
+    """Active seconds for a gap between heartbeats: all of it, or none if idle"""
+    return int(gap) if 0 <= gap <= idle_seconds else 0
+
+
+def credit_expression(at, dialect_name: str, idle_seconds: float):
+    """SQL credit for the gap from the stored last_activity to ``at``"""
+    gap = seconds_between(UserProgress.last_activity, at, dialect_name)
+    return case((and_(gap >= 0, gap <= idle_seconds), cast(gap, Integer)), else_=0)
+
+
+def capped_credit(seconds, at, dialect_name: str):
+    """SQL credit of ``seconds`` buffered elsewhere, but no more than the time from the stored last_activity to ``at``"""
+    gap = seconds_between(UserProgress.last_activity, at, dialect_name)
+    return case((UserProgress.last_activity.is_(None), seconds),
+                (gap <= 0, 0),
+                (gap < seconds, cast(gap, Integer)),
+                else_=seconds)
+
+
+def add_active_time(increment) -> Dict:
+    """SET clause adding ``increment`` (int or SQL) to the attempt and lifetime totals"""
+    return {
+        'active_seconds': UserProgress.active_seconds + increment,
+        'total_seconds': UserProgress.total_seconds + increment
+    }
+
+
+def upsert_progress(session, rows: List[Dict]) -> None:
+    """
+    Upsert heartbeat rows. Index and last_activity only win if at least as
+    new as the stored ones; active/total seconds are added as increments,
+    capped by capped_credit().
+    """
+    dialect_name = session.get_bind().dialect.name
+
+    def update(excluded):
+        newer = or_(UserProgress.last_activity.is_(None),
+                    excluded.last_activity >= UserProgress.last_activity)
+        return {
+            'status': case((UserProgress.status == 'completed', 'completed'), else_='in-progress'),
+            'current_question_index': case((newer, excluded.current_question_index),
+                                           else_=UserProgress.current_question_index),
+            'last_activity': case((newer, excluded.last_activity), else_=UserProgress.last_activity),
+            **add_active_time(capped_credit(excluded.active_seconds, excluded.last_activity, dialect_name))
+        }
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        upsert(session, UserProgress, rows[start:start + BATCH_SIZE], ['user_id', 'quiz_id'], update=update)
+
+
+class _Entry:
+    __slots__ = ('status', 'index', 'last_activity', 'seconds', 'dirty')
+
+    def __init__(self, status: str, index: int, last_activity: datetime, seconds: int = 0, dirty: bool = False):
+        self.status = status
+        self.index = index
+        self.last_activity = last_activity
+        self.seconds = seconds  # active seconds not yet flushed
+        self.dirty = dirty
+
+
+class ProgressBuffer:
+    """Last-write-wins heartbeats for this worker, keyed by user then quiz"""
+
+    def __init__(self, idle_seconds: float = 600):
+        self.idle_seconds = idle_seconds
+        self.flushed = 0
+        self._entries: Dict[str, Dict[str, _Entry]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._app = None
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(quizzes) for quizzes in self._entries.values())
+
+    def record(self, user_id, quiz_id: str, index: int, at: datetime, idle_seconds: float) -> Optional[str]:
+        """
+        Buffer a heartbeat for an attempt this worker already knows. Returns
+        its status, or None if the caller must write through instead.
+        """
+        if not self.active:
+            return None
+        with self._lock:
+            entry = self._entries.get(str(user_id), {}).get(quiz_id)
+            if entry is None:
+                return None
+            if entry.status != 'completed':
+                entry.status = 'in-progress'
+            entry.seconds += credit_seconds((at - entry.last_activity).total_seconds(), idle_seconds)
+            entry.index, entry.last_activity, entry.dirty = index, at, True
+            return entry.status
+
+    def remember(self, user_id, quiz_id: str, status: str, index: int, at: datetime) -> None:
+        """Track an attempt that was just written through, so later heartbeats are buffered"""
+        if not self.active:
+            return
+        with self._lock:
+            self._entries.setdefault(str(user_id), {})[quiz_id] = _Entry(status, index, at)
+
+    def complete(self, user_id, quiz_id: str, at: datetime) -> Optional[_Entry]:
+        """
+        Mark an attempt completed at ``at``. Returns a copy of the entry as it
+        was, so its unflushed index and seconds go into the completion write.
+        """
+        with self._lock:
+            entry = self._entries.get(str(user_id), {}).get(quiz_id)
+            if entry is None:
+                return None
+            pending = _Entry(entry.status, entry.index, entry.last_activity, entry.seconds, entry.dirty)
+            entry.status, entry.last_activity, entry.seconds, entry.dirty = 'completed', at, 0, False
+            return pending
+
+    def pending_for(self, user_id) -> Dict[str, Tuple[int, datetime, int]]:
+        """Unflushed (index, last_activity, seconds) per quiz, to overlay on rows read from the DB"""
+        with self._lock:
+            return {quiz_id: (entry.index, entry.last_activity, entry.seconds)
+                    for quiz_id, entry in self._entries.get(str(user_id), {}).items() if entry.dirty}
+
+    def _take_dirty(self) -> List[Dict]:
+        """Rows to write; marks them clean and forgets attempts idle past idle_seconds"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.idle_seconds)
+        rows = []
+        with self._lock:
+            for user_id, quizzes in list(self._entries.items()):
+                for quiz_id, entry in list(quizzes.items()):
+                    if entry.dirty:
+                        rows.append({'user_id': user_id, 'quiz_id': quiz_id, 'status': entry.status,
+                                     'current_question_index': entry.index,
+                                     'last_activity': entry.last_activity,
+                                     'active_seconds': entry.seconds, 'total_seconds': entry.seconds})
+                        entry.seconds, entry.dirty = 0, False
+                    elif entry.last_activity < cutoff:
+                        del quizzes[quiz_id]
+                if not quizzes:
+                    del self._entries[user_id]
+        return rows
+
+    def _restore(self, rows: List[Dict]) -> None:
+        with self._lock:
+            for row in rows:
+                entry = self._entries.get(row['user_id'], {}).get(row['quiz_id'])
+                if entry is not None and entry.status != 'completed':
+                    entry.seconds += row['active_seconds']
+                    entry.dirty = True
+
+    def flush(self) -> int:
+        """Write dirty entries in batched upserts; returns the number of rows written"""
+        if self._app is None:
+            return 0
+        rows = self._take_dirty()
+        if not rows:
+            return 0
+
+        from extensions import db
+        with self._app.app_context():
+            try:
+                upsert_progress(db.session, rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self._restore(rows)
+                logger.exception('Progress flush of %d rows failed; will retry', len(rows))
+                return 0
+        self.flushed += len(rows)
+        return len(rows)
+
+    # --- Flusher thread ---
+
+    def start(self, app, interval: float) -> None:
+        """Buffer heartbeats for ``app`` and flush them every ``interval`` seconds"""
+        with self._lock:
+            if self.active:
+                return
+            self._app = app
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,),
+                                            name='progress-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the flusher and write what is left (heartbeats are written through afterwards)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        with self._lock:
+            self._entries.clear()
+
+
+progress_buffer = ProgressBuffer()
+register_shutdown_hook(progress_buffer.stop, name='flush_progress_heartbeats')
@@ -0,0 +1,33 @@
+"""
+Sparse fieldsets for list endpoints: ``?fields=a,b`` or ``?view=summary``.
+
+Views map the requested names to the columns they need, so a projection
+is pushed down into the SELECT instead of trimming a full payload.
+"""
+
+from typing import Iterable, List, Mapping
+
+
+def requested_fields(args: Mapping[str, str], available: Iterable[str], summary: Iterable[str],
+                     default: Iterable[str] = None) -> List[str]:
+    """
+    Field names to return, in ``available`` order. ``?fields=`` wins over
+    ``?view=summary``; with neither (or ``?view=full``) ``default`` is used,
+    or every available field. 'id' is always included. Raises ValueError
+    on unknown fields or views.
+    """
+    available = list(available)
+    fields, view = args.get('fields'), args.get('view')
+    if fields:
+        names = {name.strip() for name in fields.split(',') if name.strip()}
+        unknown = names - set(available)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    elif view == 'summary':
+        names = set(summary)
+    elif view in (None, '', 'full'):
+        names = set(default if default is not None else available)
+    else:
+        raise ValueError(f'Unknown view: {view}')
+    names.add('id')
+    return [name for name in available if name in names]
@@ -0,0 +1,213 @@
+"""
+Quiz bundles: a versioned JSON-lines interchange format for quiz content.
+
+The first line is a header, ``{"format": "enableu.quiz-bundle", "version": 1}``.
+Every following line is one quiz in the admin/seed shape: id, title,
+description, time_limit, points_reward, and questions carrying
+correctOptionId and explanation. Each quiz line also has ``hash``, the
+SHA-256 of its canonical content.
+
+Imports are idempotent upserts keyed on quiz id. A quiz whose hash matches
+``quizzes.content_hash`` is skipped without touching its rows, so
+reloading a bundle only rewrites what changed. Quizzes are applied in
+chunks, each with one lookup of the stored hashes and one commit. New
+quizzes are appended to the curriculum order in bundle order, and exports
+follow that order. Nothing is ever deleted.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import select
+
+from extensions import db
+from models import AnswerKey, Quiz
+from utils.cache_bus import invalidate_on_commit
+from utils.db_compat import upsert
+from utils.quiz_content import QUIZ_ORDER, load_catalog, next_quiz_position, normalize_questions, replace_questions
+
+FORMAT = 'enableu.quiz-bundle'
+VERSION = 1
+CHUNK_SIZE = 100
+
+Document = Dict[str, Any]
+
+
+def normalize_document(data: Dict[str, Any], require_answer: bool = True) -> Document:
+    """
+    The canonical quiz document (without hash); raises ValueError on bad
+    input. Export passes ``require_answer=False`` so legacy questions without
+    an answer key still go out (and are reported when imported again).
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Quiz must be an object')
+    quiz_id, title = data.get('id'), data.get('title')
+    if not quiz_id or not title:
+        raise ValueError('Quiz id and title are required')
+    try:
+        time_limit = None if data.get('time_limit') is None else int(data['time_limit'])
+        points_reward = int(data.get('points_reward', 50))
+    except (TypeError, ValueError):
+        raise ValueError('time_limit and points_reward must be integers')
+    return {
+        'id': str(quiz_id),
+        'title': str(title),
+        'description': data.get('description') or '',
+        'time_limit': time_limit,
+        'points_reward': points_reward,
+        'questions': normalize_questions(data.get('questions') or [], require_answer)
+    }
+
+
+def content_hash(document: Document) -> str:
+    """SHA-256 over everything but the id, so the hash follows content only"""
+    content = {key: value for key, value in document.items() if key not in ('id', 'hash')}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+# --- Export ---
+
+def export_documents(quiz_ids: Optional[Iterable[str]] = None) -> Iterator[Document]:
+    """Quiz documents with answer keys and hashes, CHUNK_SIZE quizzes per query pair"""
+    ids = list(quiz_ids) if quiz_ids is not None else list(
+        db.session.execute(select(Quiz.id).order_by(*QUIZ_ORDER)).scalars())
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+        keys = {(key.quiz_id, key.question_id): key
+                for key in AnswerKey.query.filter(AnswerKey.quiz_id.in_(chunk))}
+        for quiz in load_catalog(quiz_ids=chunk):
+            for question in quiz['questions']:
+                key = keys.get((quiz['id'], question['id']))
+                question['correctOptionId'] = key.correct_option_id if key else None
+                question['explanation'] = key.explanation if key else None
+            document = normalize_document({**quiz, 'time_limit': quiz['timeLimit']}, require_answer=False)
+            yield {**document, 'hash': content_hash(document)}
+
+
+def write_bundle(documents: Iterable[Document]) -> Iterator[str]:
+    """Bundle lines (newline-terminated) for ``documents``, header first"""
+    header = {'format': FORMAT, 'version': VERSION, 'exported_at': datetime.utcnow().isoformat() + 'Z'}
+    yield json.dumps(header) + '\n'
+    for document in documents:
+        yield json.dumps(document, ensure_ascii=False) + '\n'
+
+
+# --- Import ---
+
+def read_bundle(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Quiz entries from bundle lines: ``{'line': n, 'data': {...}}``, or
+    ``{'line': n, 'error': ...}`` for a line that isn't JSON. Raises
+    ValueError for a missing header or an unsupported version.
+    """
+    numbered = ((number, line.strip()) for number, line in enumerate(lines, start=1))
+    numbered = (entry for entry in numbered if entry[1])
+    first = next(numbered, None)
+    try:
+        header = json.loads(first[1]) if first else None
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get('format') != FORMAT:
+        raise ValueError(f'Not a quiz bundle: the first line must be a {FORMAT} header')
+    if not isinstance(header.get('version'), int) or header['version'] > VERSION:
+        raise ValueError(f"Unsupported bundle version {header.get('version')!r} (this server reads {VERSION})")
+
+    for number, line in numbered:
+        try:
+            yield {'line': number, 'data': json.loads(line)}
+        except ValueError as e:
+            yield {'line': number, 'error': f'Invalid JSON: {e}'}
+
+
+def import_documents(entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upsert quizzes from read_bundle() entries (or ``{'data': ...}`` dicts).
+    Returns created/updated/unchanged/failed counts and a per-quiz report.
+    """
+    report = {'created': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'quizzes': []}
+
+    def record(entry, quiz_id, status, message=None):
+        item = {'id': quiz_id, 'status': status}
+        if entry.get('line') is not None:
+            item['line'] = entry['line']
+        if message:
+            item['message'] = message
+        report['quizzes'].append(item)
+        report['failed' if status == 'error' else status] += 1
+
+    seen = set()
+    iterator = iter(entries)
+    while True:
+        chunk = list(islice(iterator, CHUNK_SIZE))
+        if not chunk:
+            break
+
+        documents = []
+        for entry in chunk:
+            data = entry.get('data')
+            quiz_id = data.get('id') if isinstance(data, dict) else None
+            if 'error' in entry:
+                record(entry, quiz_id, 'error', entry['error'])
+                continue
+            try:
+                document = normalize_document(data)
+            except ValueError as e:
+                record(entry, quiz_id, 'error', str(e))
+                continue
+            digest = content_hash(document)
+            if data.get('hash') and data['hash'] != digest:
+                record(entry, document['id'], 'error', 'Content does not match its hash')
+            elif document['id'] in seen:
+                record(entry, document['id'], 'error', 'Duplicate quiz id in bundle')
+            else:
+                seen.add(document['id'])
+                documents.append((entry, document, digest))
+
+        stored = dict(db.session.execute(
+            select(Quiz.id, Quiz.content_hash).where(Quiz.id.in_([d['id'] for _, d, _ in documents]))
+        ).all()) if documents else {}
+        changed = []
+        for entry, document, digest in documents:
+            if document['id'] not in stored:
+                changed.append((entry, document, digest, 'created'))
+            elif stored[document['id']] != digest:
+                changed.append((entry, document, digest, 'updated'))
+            else:
+                record(entry, document['id'], 'unchanged')
+        if not changed:
+            continue
+
+        # New quizzes join the end of the curriculum in bundle order; updates keep their place
+        position = next_quiz_position()
+        positions = {}
+        for _, document, _, outcome in changed:
+            if outcome == 'created':
+                positions[document['id']] = position
+                position += 1
+        upsert(db.session, Quiz, [{
+            'id': document['id'],
+            'title': document['title'],
+            'description': document['description'],
+            'time_limit': document['time_limit'],
+            'points_reward': document['points_reward'],
+            'content_hash': digest,
+            'position': positions.get(document['id'], 0)
+        } for _, document, digest, _ in changed], ['id'], update=lambda excluded: {
+            'title': excluded.title,
+            'description': excluded.description,
+            'time_limit': excluded.time_limit,
+            'points_reward': excluded.points_reward,
+            'content_hash': excluded.content_hash
+        })
+        for _, document, _, _ in changed:
+            replace_questions(document['id'], document['questions'])
+        invalidate_on_commit(*[f"quiz:{document['id']}" for _, document, _, _ in changed], prefixes=['quizzes'])
+        db.session.commit()
+        for entry, document, _, status in changed:
+            record(entry, document['id'], status)
+
+    return report
@@ -0,0 +1,247 @@
+"""
+Normalized quiz content: questions, options and answer keys.
+
+Questions and their options are rows ordered by ``position``; the correct
+option and explanation live in ``answer_keys``, which only the grader reads.
+Catalog reads select display columns in one joined query and never touch
+answer keys; list projections without questions select quiz columns only.
+Quizzes themselves list in curriculum order (``Quiz.position``). Writes
+replace a quiz's rows or edit a single question.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, func, insert, select
+
+from extensions import db
+from models import AnswerKey, QuestionOption, Quiz, QuizQuestion
+from utils.grading import Question
+
+CONTENT_MODELS = (QuizQuestion, QuestionOption, AnswerKey)
+
+# Quiz list fields (?fields= names) and the columns behind them
+QUIZ_COLUMNS = {
+    'id': Quiz.id,
+    'title': Quiz.title,
+    'description': Quiz.description,
+    'timeLimit': Quiz.time_limit,
+    'points_reward': Quiz.points_reward,
+    'questionCount': Quiz.question_count
+}
+QUIZ_FIELDS = (*QUIZ_COLUMNS, 'questions')
+CATALOG_FIELDS = ('id', 'title', 'description', 'timeLimit', 'points_reward', 'questions')
+SUMMARY_FIELDS = ('id', 'title', 'description', 'timeLimit', 'points_reward', 'questionCount')
+# Curriculum order for every quiz list
+QUIZ_ORDER = (Quiz.position, Quiz.id)
+
+
+def next_quiz_position() -> int:
+    """Position for a quiz appended to the end of the curriculum"""
+    return db.session.execute(select(func.coalesce(func.max(Quiz.position), 0) + 1)).scalar_one()
+
+
+def normalize_questions(questions: Iterable[Question], require_answer: bool = True) -> List[Question]:
+    """
+    Canonical question dicts from an admin payload or a legacy JSON blob.
+
+    Missing question ids become 'q1', 'q2'...; all ids are strings; the
+    correct option comes from 'correctOptionId' or an option flagged
+    'is_correct' (the admin form's shape). Raises ValueError on bad input,
+    including a question without a correct option unless ``require_answer``
+    is False (legacy data, which the grader then never scores as correct).
+    """
+    normalized = []
+    seen = set()
+    for index, question in enumerate(questions, start=1):
+        question_id = str(question.get('id') or f'q{index}')
+        if question_id in seen:
+            raise ValueError(f'Duplicate question id {question_id}')
+        seen.add(question_id)
+        normalized.append({'id': question_id, **_normalize_content(question, require_answer)})
+    return normalized
+
+
+def _normalize_content(question: Question, require_answer: bool = True) -> Dict[str, Any]:
+    options = []
+    correct = question.get('correctOptionId')
+    for index, option in enumerate(question.get('options') or [], start=1):
+        option_id = str(option.get('id') or index)
+        options.append({'id': option_id, 'text': option.get('text') or ''})
+        if correct is None and option.get('is_correct'):
+            correct = option_id
+
+    option_ids = [o['id'] for o in options]
+    if len(set(option_ids)) != len(option_ids):
+        raise ValueError('Duplicate option id')
+    if correct is not None and str(correct) not in option_ids:
+        raise ValueError(f'Correct option {correct} is not one of the options')
+    if correct is None and require_answer:
+        raise ValueError(f"Question '{question.get('text') or ''}' has no correct option")
+
+    return {
+        'text': question.get('text') or '',
+        'options': options,
+        'correctOptionId': None if correct is None else str(correct),
+        'explanation': question.get('explanation')
+    }
+
+
+def content_rows(quiz_id: str, questions: List[Question]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Row dicts for quiz_questions, question_options and answer_keys from normalized questions"""
+    question_rows, option_rows, key_rows = [], [], []
+    for position, question in enumerate(questions):
+        question_rows.append({'quiz_id': quiz_id, 'question_id': question['id'],
+                              'position': position, 'text': question['text']})
+        option_rows.extend(_option_rows(quiz_id, question['id'], question['options']))
+        key_rows.append({'quiz_id': quiz_id, 'question_id': question['id'],
+                         'correct_option_id': question['correctOptionId'],
+                         'explanation': question['explanation']})
+    return question_rows, option_rows, key_rows
+
+
+def _option_rows(quiz_id, question_id, options):
+    return [{'quiz_id': quiz_id, 'question_id': question_id, 'option_id': option['id'],
+             'position': position, 'text': option['text']}
+            for position, option in enumerate(options)]
+
+
+# --- Reads ---
+
+def assemble_catalog(rows: Iterable[Tuple]) -> List[Dict[str, Any]]:
+    """
+    Group flat (quiz, question, option) rows, ordered by quiz and position,
+    into the quiz payloads served to students.
+    """
+    quizzes = []
+    quiz = question = None
+    for (quiz_id, title, description, time_limit, points_reward,
+         question_id, question_text, option_id, option_text) in rows:
+        if quiz is None or quiz['id'] != quiz_id:
+            quiz = {
+                'id': quiz_id,
+                'title': title,
+                'description': description,
+                'timeLimit': time_limit,
+                'points_reward': points_reward,
+                'questions': []
+            }
+            quizzes.append(quiz)
+            question = None
+        if question_id is None:
+            continue
+        if question is None or question['id'] != question_id:
+            question = {'id': question_id, 'text': question_text, 'options': []}
+            quiz['questions'].append(question)
+        if option_id is not None:
+            question['options'].append({'id': option_id, 'text': option_text})
+    return quizzes
+
+
+def load_catalog(quiz_id: Optional[str] = None, quiz_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Display-only quiz payloads (no answer keys), all quizzes, one or ``quiz_ids``, in a single query"""
+    query = db.session.query(
+        Quiz.id, Quiz.title, Quiz.description, Quiz.time_limit, Quiz.points_reward,
+        QuizQuestion.question_id, QuizQuestion.text.label('question_text'),
+        QuestionOption.option_id, QuestionOption.text.label('option_text')
+    ).outerjoin(
+        QuizQuestion, QuizQuestion.quiz_id == Quiz.id
+    ).outerjoin(
+        QuestionOption, and_(QuestionOption.quiz_id == QuizQuestion.quiz_id,
+                             QuestionOption.question_id == QuizQuestion.question_id)
+    )
+    if quiz_id is not None:
+        query = query.filter(Quiz.id == quiz_id)
+    if quiz_ids is not None:
+        query = query.filter(Quiz.id.in_(list(quiz_ids)))
+    query = query.order_by(*QUIZ_ORDER, QuizQuestion.position, QuestionOption.position)
+    return assemble_catalog(query.all())
+
+
+def load_quiz_list(fields: List[str]) -> List[Dict[str, Any]]:
+    """
+    Every quiz with only ``fields`` (names from QUIZ_FIELDS). Without
+    'questions' this is a single SELECT of the needed quiz columns.
+    """
+    if 'questions' not in fields:
+        rows = db.session.execute(select(*[QUIZ_COLUMNS[f] for f in fields]).order_by(*QUIZ_ORDER))
+        return [dict(zip(fields, row)) for row in rows]
+
+    catalog = load_catalog()
+    if list(fields) == list(CATALOG_FIELDS):
+        return catalog
+    for quiz in catalog:
+        quiz['questionCount'] = len(quiz['questions'])
+    return [{f: quiz[f] for f in fields} for quiz in catalog]
+
+
+def load_graded_questions(quiz_id: str) -> List[Question]:
+    """Questions with 'correctOptionId' and 'explanation' merged in, for grade_quiz/build_feedback"""
+    catalog = load_catalog(quiz_id)
+    if not catalog:
+        return []
+    keys = {key.question_id: key for key in AnswerKey.query.filter_by(quiz_id=quiz_id)}
+    questions = []
+    for question in catalog[0]['questions']:
+        key = keys.get(question['id'])
+        question['correctOptionId'] = key.correct_option_id if key else None
+        if key and key.explanation is not None:
+            question['explanation'] = key.explanation
+        questions.append(question)
+    return questions
+
+
+# --- Writes (callers commit) ---
+
+def delete_questions(quiz_id: str) -> None:
+    for model in reversed(CONTENT_MODELS):
+        model.query.filter_by(quiz_id=quiz_id).delete(synchronize_session=False)
+
+
+def replace_questions(quiz_id: str, questions: Iterable[Question]) -> int:
+    """Replace every question of a quiz; returns the number of questions"""
+    rows = content_rows(quiz_id, normalize_questions(questions))
+    delete_questions(quiz_id)
+    for model, model_rows in zip(CONTENT_MODELS, rows):
+        if model_rows:
+            db.session.execute(insert(model), model_rows)
+    return len(rows[0])
+
+
+def update_question(quiz_id: str, question_id: str, data: Dict[str, Any]) -> Optional[Question]:
+    """
+    Edit one question in place. Only the keys present in ``data`` ('text',
+    'options', 'correctOptionId', 'explanation') are changed. Returns the
+    updated question (with answer key) or None if it doesn't exist.
+    """
+    question = db.session.get(QuizQuestion, (quiz_id, question_id))
+    if not question:
+        return None
+
+    key = db.session.get(AnswerKey, (quiz_id, question_id))
+    if 'options' in data:
+        options = data['options']
+    else:
+        options = [{'id': o.option_id, 'text': o.text} for o in QuestionOption.query
+                   .filter_by(quiz_id=quiz_id, question_id=question_id)
+                   .order_by(QuestionOption.position)]
+    merged = _normalize_content({
+        'text': data.get('text', question.text),
+        'options': options,
+        'correctOptionId': data.get('correctOptionId', key.correct_option_id if key else None),
+        'explanation': data.get('explanation', key.explanation if key else None)
+    })
+
+    question.text = merged['text']
+    if 'options' in data:
+        QuestionOption.query.filter_by(quiz_id=quiz_id, question_id=question_id)\
+            .delete(synchronize_session=False)
+        option_rows = _option_rows(quiz_id, question_id, merged['options'])
+        if option_rows:
+            db.session.execute(insert(QuestionOption), option_rows)
+    if key is None:
+        key = AnswerKey(quiz_id=quiz_id, question_id=question_id)
+        db.session.add(key)
+    key.correct_option_id = merged['correctOptionId']
+    key.explanation = merged['explanation']
+
+    return {'id': question_id, **merged}
@@ -0,0 +1,137 @@
+"""
+Ranked full-text search over quiz titles, descriptions and question text.
+
+On PostgreSQL matches come from GIN expression indexes (m0007) on a weighted
+tsvector of each quiz's title (A) and description (B), and of each question's
+text (C). The query below spells the expressions exactly as the indexes do,
+so the planner can use them. ``websearch_to_tsquery`` accepts "quoted
+phrases", OR and -excluded words.
+
+Other databases use an in-memory inverted index with the same field weights.
+It is rebuilt when its marker entry in response_cache goes away. Quiz writes
+already evict the 'quizzes' prefix in every worker (utils.cache_bus), and
+otherwise the marker expires with the usual cache TTL. That fallback matches
+every word (no phrases or operators) with light plural stemming.
+"""
+
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from flask import current_app
+from sqlalchemy import select, text
+
+from extensions import db
+from models import Quiz, QuizQuestion
+from utils.cache import response_cache
+
+SEARCH_CONFIG = 'english'
+QUIZ_VECTOR = (f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+               f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')")
+QUESTION_VECTOR = f"setweight(to_tsvector('{SEARCH_CONFIG}', text), 'C')"
+
+# ts_rank's default weights for A, B and C
+FIELD_WEIGHTS = {'title': 1.0, 'description': 0.4, 'question': 0.2}
+INDEX_MARKER = 'quizzes:search-index'
+MAX_QUERY_LENGTH = 200
+
+_PG_SEARCH = text(f"""
+WITH search AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :q) AS query),
+hits AS (
+    SELECT id AS quiz_id, ts_rank({QUIZ_VECTOR}, search.query) AS rank
+    FROM quizzes, search WHERE {QUIZ_VECTOR} @@ search.query
+    UNION ALL
+    SELECT quiz_id, max(ts_rank({QUESTION_VECTOR}, search.query))
+    FROM quiz_questions, search WHERE {QUESTION_VECTOR} @@ search.query
+    GROUP BY quiz_id
+)
+SELECT quiz_id, sum(rank) AS rank FROM hits GROUP BY quiz_id ORDER BY rank DESC, quiz_id
+""")
+
+_WORD = re.compile(r'\w+')
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from how in is it of on or that the this to was what when where which who '
+    'why with'.split()
+)
+
+
+def tokenize(value: str) -> List[str]:
+    """Lowercased words without stop words, with a trailing plural 's' removed"""
+    tokens = []
+    for word in _WORD.findall((value or '').lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class InvertedIndex:
+    """Term -> {quiz_id: weighted term frequency} over every quiz's text"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.size = 0
+
+    def add(self, quiz_id: str, field: str, value: str) -> None:
+        for token in tokenize(value):
+            self.postings[token][quiz_id] += FIELD_WEIGHTS[field]
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """(quiz_id, score) for quizzes containing every query word, best first"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                return []
+            idf = math.log(1 + self.size / len(postings))
+            term_scores = {quiz_id: weight * idf for quiz_id, weight in postings.items()}
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {quiz_id: score + term_scores[quiz_id]
+                          for quiz_id, score in scores.items() if quiz_id in term_scores}
+        return sorted(scores.items(), key=lambda hit: (-hit[1], hit[0]))
+
+
+def build_index() -> InvertedIndex:
+    index = InvertedIndex()
+    for quiz_id, title, description in db.session.execute(select(Quiz.id, Quiz.title, Quiz.description)):
+        index.add(quiz_id, 'title', title)
+        index.add(quiz_id, 'description', description)
+        index.size += 1
+    for quiz_id, question in db.session.execute(select(QuizQuestion.quiz_id, QuizQuestion.text)):
+        index.add(quiz_id, 'question', question)
+    return index
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def current_index() -> InvertedIndex:
+    """This process's index, rebuilt after quiz writes or cache expiry"""
+    global _index
+    if _index is not None and response_cache.get(INDEX_MARKER) is not None:
+        return _index
+    with _index_lock:
+        if _index is None or response_cache.get(INDEX_MARKER) is None:
+            generation = response_cache.generation
+            _index = build_index()
+            config = current_app.config
+            response_cache.set(INDEX_MARKER, b'', 'text/plain',
+                               config.get('RESPONSE_CACHE_TTL', 30), config.get('CACHE_BUS_TTL'), generation)
+        return _index
+
+
+def search_quizzes(query: str) -> List[Tuple[str, float]]:
+    """Ranked (quiz_id, score) matches for a user query, best first"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return [(quiz_id, float(rank)) for quiz_id, rank in db.session.execute(_PG_SEARCH, {'q': query})]
+    return current_index().search(query)
@@ -0,0 +1,193 @@
+"""
+Monthly partition maintenance and compaction for the results table.
+
+On PostgreSQL ``results`` is range-partitioned by ``completed_at`` into one
+partition per month (``results_YYYY_MM``) plus ``results_default``.
+Compaction rolls every raw row older than the retention window into
+``result_summaries`` and removes it from ``results`` in the same
+transaction, so historical totals stay exact. Whole old partitions are
+detached and kept as ``results_archive_YYYY_MM`` tables (or dropped), and
+any leftovers are deleted. Other databases have no partitions; their old
+rows are summarized and deleted.
+
+Run from cron, e.g. monthly:
+    flask --app app db compact-results --keep-months 6
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import case, func, inspect, select, text
+
+from models import Result, ResultSummary
+from utils.db_compat import upsert
+
+DEFAULT_PARTITION = 'results_default'
+MONTHS_AHEAD = 3
+BATCH_SIZE = 500
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f'results_{month:%Y_%m}'
+
+
+def partition_month(name: str):
+    """Month covered by a ``results_YYYY_MM`` partition, or None for other tables"""
+    try:
+        return datetime.strptime(name[len('results_'):], '%Y_%m')
+    except ValueError:
+        return None
+
+
+def is_partitioned(connection) -> bool:
+    if connection.dialect.name != 'postgresql':
+        return False
+    return bool(connection.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('results')"
+    )).scalar())
+
+
+def attached_partitions(connection) -> List[str]:
+    return list(connection.execute(text(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        "WHERE i.inhparent = to_regclass('results')"
+    )).scalars())
+
+
+def ensure_partitions(connection, start: datetime, months_ahead: int = MONTHS_AHEAD) -> List[str]:
+    """
+    Create monthly partitions from ``start``'s month through ``months_ahead``
+    months from now. Rows that landed in the default partition for a month
+    are moved into the new partition before it is attached.
+    """
+    connection.execute(text(f'CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF results DEFAULT'))
+    existing = set(attached_partitions(connection))
+    created = []
+    month = month_start(start)
+    last = add_months(month_start(datetime.utcnow()), months_ahead)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            bounds = {'lower': month, 'upper': add_months(month, 1)}
+            in_range = 'completed_at >= :lower AND completed_at < :upper'
+            connection.execute(text(f'CREATE TABLE {name} (LIKE results INCLUDING DEFAULTS)'))
+            connection.execute(text(f'INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+            connection.execute(text(f'DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}'), bounds)
+            connection.execute(text(
+                f"ALTER TABLE results ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{bounds['lower']:%Y-%m-%d}') TO ('{bounds['upper']:%Y-%m-%d}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def summarize(connection, cutoff: datetime) -> List[Dict]:
+    """Per (user, quiz) attempts, total, best and last score and time of results before ``cutoff``"""
+    ranked = select(
+        Result.user_id, Result.quiz_id, Result.score, Result.time_spent, Result.completed_at,
+        func.row_number().over(
+            partition_by=(Result.user_id, Result.quiz_id),
+            order_by=Result.completed_at.desc()
+        ).label('recency')
+    ).where(Result.completed_at < cutoff).subquery()
+
+    rows = connection.execute(select(
+        ranked.c.user_id,
+        ranked.c.quiz_id,
+        func.count().label('attempts'),
+        func.sum(ranked.c.score).label('total_score'),
+        func.max(ranked.c.score).label('best_score'),
+        func.max(case((ranked.c.recency == 1, ranked.c.score))).label('last_score'),
+        func.sum(ranked.c.time_spent).label('total_time_spent'),
+        func.max(case((ranked.c.recency == 1, ranked.c.time_spent))).label('last_time_spent'),
+        func.max(ranked.c.completed_at).label('last_completed_at')
+    ).group_by(ranked.c.user_id, ranked.c.quiz_id))
+    return [dict(row._mapping) for row in rows]
+
+
+def merge_summaries(connection, summaries: List[Dict]) -> None:
+    """Add rolled-up rows to result_summaries, combining with existing totals"""
+    def combine(excluded):
+        newer = excluded.last_completed_at >= ResultSummary.last_completed_at
+        return {
+            'attempts': ResultSummary.attempts + excluded.attempts,
+            'total_score': ResultSummary.total_score + excluded.total_score,
+            'best_score': case((excluded.best_score > ResultSummary.best_score, excluded.best_score),
+                               else_=ResultSummary.best_score),
+            'last_score': case((newer, excluded.last_score), else_=ResultSummary.last_score),
+            'total_time_spent': ResultSummary.total_time_spent + excluded.total_time_spent,
+            'last_time_spent': case((newer, excluded.last_time_spent), else_=ResultSummary.last_time_spent),
+            'last_completed_at': case((newer, excluded.last_completed_at), else_=ResultSummary.last_completed_at)
+        }
+
+    for i in range(0, len(summaries), BATCH_SIZE):
+        upsert(connection, ResultSummary, summaries[i:i + BATCH_SIZE], ['user_id', 'quiz_id'], update=combine)
+
+
+def compact_results(connection, cutoff: datetime, drop: bool = False) -> Dict[str, int]:
+    """
+    Roll results completed before ``cutoff`` (rounded down to the month) into
+    result_summaries and remove them from ``results``. Runs in the caller's
+    transaction; nothing is removed unless everything is summarized.
+    """
+    cutoff = month_start(cutoff)
+    summaries = summarize(connection, cutoff)
+    merge_summaries(connection, summaries)
+
+    archived = []
+    if is_partitioned(connection):
+        for name in sorted(attached_partitions(connection)):
+            month = partition_month(name)
+            if month is None or add_months(month, 1) > cutoff:
+                continue
+            connection.execute(text(f'ALTER TABLE results DETACH PARTITION {name}'))
+            if drop:
+                connection.execute(text(f'DROP TABLE {name}'))
+            else:
+                connection.execute(text(f'ALTER TABLE {name} RENAME TO results_archive_{month:%Y_%m}'))
+            archived.append(name)
+        ensure_partitions(connection, cutoff)
+
+    deleted = connection.execute(Result.__table__.delete().where(Result.completed_at < cutoff)).rowcount
+    return {
+        'summaries': len(summaries),
+        'results': sum(s['attempts'] for s in summaries),
+        'partitions': len(archived),
+        'deleted': deleted
+    }
+
+
+def convert_to_partitioned(connection) -> None:
+    """
+    Replace a plain PostgreSQL results table with a partitioned copy. The
+    whole swap runs in the caller's transaction, so results is locked for
+    the duration of the copy.
+    """
+    connection.execute(text('ALTER TABLE results RENAME TO results_unpartitioned'))
+    inspector = inspect(connection)
+    pk_name = inspector.get_pk_constraint('results_unpartitioned').get('name')
+    if pk_name:
+        connection.execute(text(f'ALTER TABLE results_unpartitioned RENAME CONSTRAINT {pk_name} TO results_unpartitioned_pkey'))
+    for index in inspector.get_indexes('results_unpartitioned'):
+        connection.execute(text(f'ALTER INDEX {index["name"]} RENAME TO {index["name"]}_unpartitioned'))
+    # Part of the new primary key, so it can't be NULL any more
+    connection.execute(text('UPDATE results_unpartitioned SET completed_at = now() WHERE completed_at IS NULL'))
+
+    Result.__table__.create(bind=connection)
+    start = connection.execute(text('SELECT MIN(completed_at) FROM results_unpartitioned')).scalar()
+    ensure_partitions(connection, start or datetime.utcnow())
+
+    old_columns = {c['name'] for c in inspector.get_columns('results_unpartitioned')}
+    columns = ', '.join(c.name for c in Result.__table__.columns if c.name in old_columns)
+    connection.execute(text(f'INSERT INTO results ({columns}) SELECT {columns} FROM results_unpartitioned'))
+    connection.execute(text('DROP TABLE results_unpartitioned'))
@@ -5,6 +5,12 @@ Security utility functions for password validation and security checks
 import re
 from typing import Dict, List
 
+# Compiled once; validation runs on every registration and password change
+UPPERCASE = re.compile(r'[A-Z]')
+LOWERCASE = re.compile(r'[a-z]')
+DIGIT = re.compile(r'\d')
+SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>\-_+=/[\]\';]')
+
 def validate_password_strength(password: str) -> Dict[str, any]:
     """
     Validate password strength according to enterprise security standards.
@@ -27,16 +33,16 @@ def validate_password_strength(password: str) -> Dict[str, any]:
     if len(password) < 8:
         errors.append("Password must be at least 8 characters long")
     
-    if not re.search(r'[A-Z]', password):
+    if not UPPERCASE.search(password):
         errors.append("Password must contain at least one uppercase letter")
     
-    if not re.search(r'[a-z]', password):
+    if not LOWERCASE.search(password):
         errors.append("Password must contain at least one lowercase letter")
     
-    if not re.search(r'\d', password):
+    if not DIGIT.search(password):
         errors.append("Password must contain at least one number")
     
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>\-_+=/[\]\';]', password):
+    if not SPECIAL.search(password):
         errors.append("Password must contain at least one special character (!@#$%^&*(),.?\":{}|<>- _+=/[]';)")
     
     return {
@@ -60,13 +66,13 @@ def get_password_strength_score(password: str) -> Dict[str, any]:
         score += 1
     
     # Complexity score
-    if re.search(r'[A-Z]', password) and re.search(r'[a-z]', password):
+    if UPPERCASE.search(password) and LOWERCASE.search(password):
         score += 1
     
-    if re.search(r'\d', password):
+    if DIGIT.search(password):
         score += 0.5
     
-    if re.search(r'[!@#$%^&*(),.?":{}|<>\-_+=/[\]\';]', password):
+    if SPECIAL.search(password):
         score += 0.5
     
     # Variety score
@@ -0,0 +1,194 @@
+"""
+Slow query logging for SQLAlchemy.
+
+Statements slower than SLOW_QUERY_MS are logged with their normalized
+text and bind parameter shape, aggregated per normalized statement and
+kept in a ring buffer. On PostgreSQL a sampled fraction of slow SELECTs
+(SLOW_QUERY_EXPLAIN_SAMPLE) also gets an ``EXPLAIN (ANALYZE, BUFFERS)``
+plan captured alongside the entry.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('enableu.slow_query')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+# Expanding IN parameters render as __[POSTCOMPILE_x_1], x_2, ... in some dialects
+_POSTCOMPILE = re.compile(r'__\[POSTCOMPILE_\w+\]')
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape: literals and placeholders become ``?``"""
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = _POSTCOMPILE.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('(?...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def bind_shape(parameters: Any, executemany: bool = False) -> str:
+    """Describe bind parameters by type only, never by value"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = bind_shape(parameters[0]) if parameters else '()'
+        return f'{len(parameters)} x {first}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{k}: {type(v).__name__}' for k, v in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(v).__name__ for v in parameters) + ')'
+    return type(parameters).__name__
+
+
+class SlowQueryLog:
+    """Aggregates and recent samples of slow statements for this process"""
+
+    def __init__(self, threshold_ms: float = 200, explain_sample_rate: float = 0.0,
+                 buffer_size: int = 100, max_statements: int = 500):
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.max_statements = max_statements
+        self.recent = deque(maxlen=buffer_size)
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, threshold_ms=None, explain_sample_rate=None, buffer_size=None):
+        with self._lock:
+            if threshold_ms is not None:
+                self.threshold_ms = threshold_ms
+            if explain_sample_rate is not None:
+                self.explain_sample_rate = explain_sample_rate
+            if buffer_size is not None and buffer_size != self.recent.maxlen:
+                self.recent = deque(self.recent, maxlen=buffer_size)
+
+    def record(self, statement: str, shape: str, duration_ms: float, plan: str = None):
+        normalized = normalize_statement(statement)
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self.stats.get(normalized)
+            if entry is None:
+                if len(self.stats) >= self.max_statements:
+                    # Drop the cheapest statement to bound memory
+                    cheapest = min(self.stats, key=lambda k: self.stats[k]['total_ms'])
+                    del self.stats[cheapest]
+                entry = self.stats[normalized] = {
+                    'statement': normalized,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0
+                }
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['bind_shape'] = shape
+            entry['last_seen'] = now
+
+            self.recent.append({
+                'statement': normalized,
+                'bind_shape': shape,
+                'duration_ms': round(duration_ms, 3),
+                'at': now,
+                'plan': plan
+            })
+
+        logger.warning('Slow query (%.1f ms) %s -- binds %s', duration_ms, normalized, shape)
+
+    def top(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self.stats.values(), key=lambda e: e['total_ms'], reverse=True)[:limit]
+            return [dict(e, total_ms=round(e['total_ms'], 3), max_ms=round(e['max_ms'], 3),
+                         avg_ms=round(e['total_ms'] / e['count'], 3)) for e in entries]
+
+    def samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(reversed(self.recent))
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.recent.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _capture_plan(cursor, statement: str, parameters: Any) -> str:
+    """Run EXPLAIN on the raw DBAPI connection inside a savepoint"""
+    explain_cursor = cursor.connection.cursor()
+    try:
+        explain_cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            explain_cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {statement}', parameters)
+            plan = '\n'.join(row[0] for row in explain_cursor.fetchall())
+            explain_cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+            return plan
+        except Exception as e:
+            explain_cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return f'EXPLAIN failed: {e}'
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        explain_cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('slow_query_start')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    log = slow_query_log
+    if duration_ms < log.threshold_ms:
+        return
+
+    plan = None
+    if (log.explain_sample_rate > 0
+            and not executemany
+            and conn.dialect.name == 'postgresql'
+            and statement.lstrip().upper().startswith('SELECT')
+            and random.random() < log.explain_sample_rate):
+        plan = _capture_plan(cursor, statement, parameters)
+
+    log.record(statement, bind_shape(parameters, executemany), duration_ms, plan)
+
+
+def _handle_error(context):
+    conn = context.connection
+    starts = conn.info.get('slow_query_start') if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+_listeners_installed = False
+
+
+def init_slow_query_log(app):
+    """Apply SLOW_QUERY_* settings and install the cursor hooks once"""
+    global _listeners_installed
+
+    slow_query_log.configure(
+        threshold_ms=app.config.get('SLOW_QUERY_MS', 200),
+        explain_sample_rate=app.config.get('SLOW_QUERY_EXPLAIN_SAMPLE', 0.0),
+        buffer_size=app.config.get('SLOW_QUERY_BUFFER', 100)
+    )
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+        _listeners_installed = True
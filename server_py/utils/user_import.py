@@ -0,0 +1,155 @@
+"""
+Bulk user import from CSV for onboarding whole classes or schools.
+
+The upload is read row by row and handled in chunks. Each chunk is
+validated and deduplicated against the rest of the file. One ``IN`` query
+then finds existing emails, so their passwords are never hashed. The
+remaining passwords are hashed in a thread pool, since hashlib releases the
+GIL. Each hash costs roughly 0.1-0.2 s of CPU, so a large file of rows with
+passwords can outlast a proxy's default read timeout; split it or raise the
+timeout for this route. One multi-row ``INSERT ... ON CONFLICT (email) DO NOTHING`` adds the
+users and the chunk is committed. Accounts created concurrently elsewhere
+are reported as skipped, and a failure part-way keeps the earlier chunks.
+
+Columns: ``email`` (required), ``name``, ``role`` (default student) and
+``password``. Rows without a password store UNUSABLE_PASSWORD, which no
+password matches, and ``requires_password_change``, so those users sign in
+through a password reset. They cost no hashing at all.
+"""
+
+import csv
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, IO, Iterator, List, Tuple
+
+from sqlalchemy import select
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User
+from utils.cache_bus import invalidate_on_commit
+from utils.db_compat import upsert
+from utils.security import validate_password_strength
+
+ROLES = ('student', 'teacher', 'admin')
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# Not a werkzeug hash ('method$salt$hash'), so check_password_hash is always False
+UNUSABLE_PASSWORD = '!'
+
+
+def _chunks(iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _validate(row: Dict[str, str]) -> List[str]:
+    errors = []
+    if not EMAIL.match(row['email']) or len(row['email']) > 120:
+        errors.append('Invalid email')
+    if row['role'] not in ROLES:
+        errors.append(f"Invalid role '{row['role']}'")
+    if len(row['name']) > 100:
+        errors.append('Name is longer than 100 characters')
+    if row['password']:
+        errors.extend(validate_password_strength(row['password'])['errors'])
+    return errors
+
+
+def _create_users(pool: ThreadPoolExecutor, candidates: List[Tuple[int, Dict]], record: Callable) -> None:
+    """Insert one chunk's valid rows that don't exist yet, hashing passwords in ``pool``, and commit"""
+    existing = set(db.session.execute(
+        select(User.email).where(User.email.in_([row['email'] for _, row in candidates]))
+    ).scalars())
+    new = []
+    for line, row in candidates:
+        if row['email'] in existing:
+            record(line, row['email'], 'skipped', 'Email already exists')
+        else:
+            new.append((line, row))
+    if not new:
+        return
+
+    with_password = [row['password'] for _, row in new if row['password']]
+    hashes = iter(pool.map(generate_password_hash, with_password))
+    now = datetime.utcnow()
+    values = [{
+        'id': uuid.uuid4(),
+        'email': row['email'],
+        'name': row['name'] or None,
+        'role': row['role'],
+        'password_hash': next(hashes) if row['password'] else UNUSABLE_PASSWORD,
+        'requires_password_change': not row['password'],
+        'last_password_change': now if row['password'] else None
+    } for _, row in new]
+    inserted = set(upsert(db.session, User, values, ['email'], returning=[User.email]).scalars())
+    invalidate_on_commit('leaderboard')
+    db.session.commit()
+
+    for line, row in new:
+        if row['email'] in inserted:
+            record(line, row['email'], 'created')
+        else:
+            # Created concurrently since the existence check
+            record(line, row['email'], 'skipped', 'Email already exists')
+
+
+def import_users(text: IO[str], batch_size: int = 500, workers: int = 4, max_rows: int = 20000) -> Dict:
+    """
+    Import users from CSV text, committing every ``batch_size`` rows.
+
+    Returns counts and a per-row report. ``row`` is the CSV line number, and
+    ``status`` is created, skipped or error. A malformed file stops the
+    import with an 'error' entry. Raises ValueError if there is no email
+    column.
+    """
+    reader = csv.DictReader(text)
+    columns = {name.strip().lower(): name for name in reader.fieldnames or ()}
+    if 'email' not in columns:
+        raise ValueError('CSV must have an email column')
+
+    def cell(raw, column, default=''):
+        return (raw.get(columns.get(column)) or '').strip() or default
+
+    report = {'created': 0, 'skipped': 0, 'failed': 0, 'truncated': False, 'rows': []}
+
+    def record(line, email, status, message=None):
+        entry = {'row': line, 'email': email, 'status': status}
+        if message:
+            entry['message'] = message
+        report['rows'].append(entry)
+        report['failed' if status == 'error' else status] += 1
+
+    seen = set()
+    rows = ((reader.line_num, raw) for raw in reader)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import-hash') as pool:
+            for chunk in _chunks(islice(rows, max_rows), batch_size):
+                candidates = []
+                for line, raw in chunk:
+                    row = {'email': cell(raw, 'email'), 'name': cell(raw, 'name'),
+                           'role': cell(raw, 'role', 'student').lower(), 'password': cell(raw, 'password')}
+                    errors = _validate(row)
+                    if errors:
+                        record(line, row['email'], 'error', '; '.join(errors))
+                    elif row['email'] in seen:
+                        record(line, row['email'], 'skipped', 'Duplicate email in file')
+                    else:
+                        seen.add(row['email'])
+                        candidates.append((line, row))
+                if candidates:
+                    _create_users(pool, candidates, record)
+        report['truncated'] = next(rows, None) is not None
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Earlier chunks stay committed; report how far the file was read
+        db.session.rollback()
+        report['error'] = f'Stopped reading at line {reader.line_num}: {e}'
+
+    report['rows'].sort(key=lambda entry: entry['row'])
+    return report
@@ -0,0 +1,85 @@
+"""
+Substring and fuzzy user lookup by name and email for the admin console.
+
+On PostgreSQL, users.email and users.name have pg_trgm GiST indexes
+(m0008). They serve both ILIKE '%term%' and the ``%`` similarity operator
+(pg_trgm.similarity_threshold, 0.3 by default), so typos ("jonh") still find
+"john" without a scan. Queries need at least three characters, the shortest
+term that has a trigram to look up. Each column contributes its
+CANDIDATES_PER_LIMIT * limit nearest matches in ``<->`` distance order,
+which the index returns directly. Only those candidates are ranked by
+trigram similarity, with a bonus for prefix matches. Other databases only
+match substrings with LIKE, and rank them by the same trigram similarity
+computed in Python (the pg_trgm definition).
+"""
+
+import re
+from typing import List, Set, Tuple
+
+from sqlalchemy import case, func, or_, select, union
+
+from extensions import db
+from models import User
+
+MIN_QUERY_LENGTH = 3
+MAX_QUERY_LENGTH = 120
+PREFIX_BONUS = 1.0
+CANDIDATES_PER_LIMIT = 4
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def trigrams(value: str) -> Set[str]:
+    """pg_trgm's trigrams: each lowercased word padded with two spaces before and one after"""
+    grams = set()
+    for word in _WORD.findall((value or '').lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    """Shared trigrams over all trigrams, like pg_trgm's similarity()"""
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def _like_pattern(term: str) -> str:
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def search_user_ids(query: str, limit: int) -> List[Tuple[object, float]]:
+    """(user id, rank) of the best ``limit`` matches for ``query``, best first"""
+    term = query.lower()
+    pattern = _like_pattern(term)
+    substring = or_(User.email.ilike(pattern, escape='\\'), User.name.ilike(pattern, escape='\\'))
+
+    if db.session.get_bind().dialect.name == 'postgresql':
+        def nearest(column):
+            return (select(User.id)
+                    .where(or_(column.ilike(pattern, escape='\\'), column.op('%')(term)))
+                    .order_by(column.op('<->')(term))
+                    .limit(limit * CANDIDATES_PER_LIMIT))
+
+        candidates = union(nearest(User.email), nearest(User.name)).subquery()
+        prefix = or_(User.email.ilike(pattern[1:], escape='\\'), User.name.ilike(pattern[1:], escape='\\'))
+        rank = (func.greatest(func.similarity(User.email, term), func.coalesce(func.similarity(User.name, term), 0))
+                + case((prefix, PREFIX_BONUS), else_=0))
+        rows = db.session.execute(
+            select(User.id, rank.label('rank'))
+            .where(User.id.in_(select(candidates.c.id)))
+            .order_by(rank.desc(), User.email)
+            .limit(limit)
+        )
+        return [(user_id, float(score)) for user_id, score in rows]
+
+    hits = []
+    for user_id, email, name in db.session.execute(select(User.id, User.email, User.name).where(substring)):
+        score = max(similarity(email, term), similarity(name, term))
+        if email.lower().startswith(term) or (name or '').lower().startswith(term):
+            score += PREFIX_BONUS
+        hits.append((user_id, score, email))
+    hits.sort(key=lambda hit: (-hit[1], hit[2]))
+    return [(user_id, score) for user_id, score, _ in hits[:limit]]
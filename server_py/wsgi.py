@@ -0,0 +1,23 @@
+"""
+Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+from extensions import db
+from utils.lifecycle import register_shutdown_hook
+from utils.progress_buffer import progress_buffer
+
+app = create_app()
+
+# Coalesce progress heartbeats per worker; 0 writes every heartbeat through
+if app.config['PROGRESS_FLUSH_SECONDS'] > 0:
+    progress_buffer.start(app, app.config['PROGRESS_FLUSH_SECONDS'])
+
+
+@register_shutdown_hook
+def dispose_db_pool():
+    """Close pooled connections so Postgres sees a clean disconnect"""
+    with app.app_context():
+        db.engine.dispose()